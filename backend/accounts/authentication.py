@@ -0,0 +1,74 @@
+# Path: E:\it-admin-tool\backend\accounts\authentication.py
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework import permissions
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from tickets.caching import cache_in_memory
+from .models import User
+
+# JWT authentication without a user query on read requests. The token names the
+# user and the rest of the account comes from a short-lived cache, not from the
+# token's role/zone claims alone: those would keep a deactivated or demoted user
+# in for the whole token lifetime. With the cache, such changes apply within
+# AUTH_USER_CACHE_TIMEOUT seconds, and at once wherever the cache is shared, since
+# user saves and deletes drop the entry (see signals.py). Writes always load the
+# user from the database, and so does every request when the cache is not held in
+# memory: a cache read that is itself a query would save nothing.
+
+CACHE_PREFIX = 'accounts:auth_user'
+# Every column but the password hash and last_login, which load on access; in
+# model field order, which User.from_db() expects.
+USER_FIELDS = [field.attname for field in User._meta.concrete_fields if field.attname not in {'password', 'last_login'}]
+
+
+def _cache_key(user_id):
+    return f'{CACHE_PREFIX}:{user_id}'
+
+
+def get_cached_user(user_id):
+    """The user with this primary key, built from the cache (or one query on a miss), or None."""
+    key = _cache_key(user_id)
+    row = cache.get(key)
+    if row is None:
+        row = User.objects.filter(pk=user_id).values_list(*USER_FIELDS).first()
+        if row is None:
+            return None
+        cache.set(key, row, getattr(settings, 'AUTH_USER_CACHE_TIMEOUT', 30))
+    return User.from_db(User.objects.db, USER_FIELDS, row)
+
+
+def invalidate_user(user_id):
+    cache.delete(_cache_key(user_id))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that takes the user of GET, HEAD and OPTIONS requests from
+    get_cached_user(). Other requests, every request when CHECK_REVOKE_TOKEN
+    compares the password hash, and every request when the cache is not held in
+    memory, load the user as JWTAuthentication does.
+    """
+
+    def authenticate(self, request):
+        # DRF creates the authenticators for each request.
+        self.read_only = request.method in permissions.SAFE_METHODS
+        return super().authenticate(request)
+
+    def get_user(self, validated_token):
+        if not getattr(self, 'read_only', False) or api_settings.CHECK_REVOKE_TOKEN or not cache_in_memory():
+            return super().get_user(validated_token)
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+
+        user = get_cached_user(user_id)
+        if user is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        return user
@@ -1,6 +1,7 @@
 # COPY AND PASTE THIS ENTIRE, FINAL, PERFECT BLOCK.
 
 from django.db import models
+from django.db.models.functions import Lower
 from django.contrib.auth.models import AbstractUser
 
 class User(AbstractUser):
@@ -34,6 +35,12 @@ class User(AbstractUser):
     def __str__(self):
         return self.username
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Login looks usernames up case-insensitively (MyTokenObtainPairSerializer).
+            models.Index(Lower('username'), name='accounts_user_username_lower'),
+        ]
+
 class Contact(models.Model):
     circle = models.CharField(max_length=100)
     name = models.CharField(max_length=200)
@@ -4,9 +4,13 @@
 from rest_framework import serializers
 from django.contrib.auth.password_validation import validate_password
 from django.contrib.auth import get_user_model
+from django.contrib.auth.models import update_last_login
+from django.db.models import Value
+from django.db.models.functions import Lower
 from .models import User, Contact
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
 from tickets.activity_logger import log_activity
 
 # Get the custom User model
@@ -19,16 +23,12 @@ class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
 
     @classmethod
     def get_token(cls, user):
-        try:
-            full_user = User.objects.get(id=user.id)
-        except User.DoesNotExist:
-            raise AuthenticationFailed("User not found during token generation.")
-
-        token = super().get_token(full_user)
-        token['user_id'] = full_user.id
-        token['role'] = full_user.role
-        token['must_change_password'] = full_user.must_change_password
-        token['zone'] = full_user.zone
+        # `user` is the full row validate() loaded; no need to fetch it again.
+        token = super().get_token(user)
+        token['user_id'] = user.id
+        token['role'] = user.role
+        token['must_change_password'] = user.must_change_password
+        token['zone'] = user.zone
         return token
 
     def validate(self, attrs):
@@ -37,30 +37,35 @@ class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
         username = attrs.get(self.username_field)
         password = attrs.get("password")
 
-        user = None
-        try:
-            # First, check if a user with the given username exists.
-            user = UserModel.objects.get(username__iexact=username)
-        except UserModel.DoesNotExist:
+        # First, check if a user with the given username exists: exactly as typed,
+        # else in any case (answered by the LOWER(username) index). Should several
+        # usernames differ only in case, the oldest account wins.
+        user = UserModel.objects.filter(username=username).first()
+        if user is None:
+            user = UserModel.objects.alias(username_lower=Lower('username')).filter(username_lower=Lower(Value(username))).order_by('pk').first()
+        if user is None:
             # If the user does not exist, raise a specific error.
             raise AuthenticationFailed("Invalid username. Please try again.")
 
-        # If the user exists, now check if the password is correct.
-        if user and not user.check_password(password):
+        # If the user exists, now check if the password is correct. This is the
+        # only time the password is hashed: TokenObtainSerializer.validate() would
+        # authenticate() again, so the tokens are issued here instead.
+        if not user.check_password(password):
             # If the password is not valid, raise a specific error.
             raise AuthenticationFailed("Incorrect password. Please try again.")
         
         # Now check if the user is active.
-        if not user.is_active:
+        if not api_settings.USER_AUTHENTICATION_RULE(user):
              raise AuthenticationFailed("This user account has been deactivated.")
-        
-        # If both username and password are correct, proceed with the default validation
-        # to generate the tokens.
-        data = super().validate(attrs)
+
+        self.user = user
+        refresh = self.get_token(user)
+        data = {"refresh": str(refresh), "access": str(refresh.access_token)}
+        if api_settings.UPDATE_LAST_LOGIN:
+            update_last_login(None, user)
         
         # Log the successful login action.
-        if hasattr(self, 'user'):
-            log_activity(user=self.user, action='USER_LOGIN', request=self.request, target=self.user.username, details="User logged in successfully.")
+        log_activity(user=user, action='USER_LOGIN', request=self.request, target=user.username, details="User logged in successfully.")
             
         return data
         # --- MODIFICATION END ---
@@ -0,0 +1,13 @@
+# Path: E:\it-admin-tool\backend\accounts\signals.py
+
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .authentication import invalidate_user
+from .models import User
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    # Updates, deactivation (UserRetrieveUpdateDestroyAPIView.perform_destroy),
+    # restores and password changes all save the user.
+    invalidate_user(instance.pk)
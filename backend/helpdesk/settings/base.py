@@ -33,7 +33,7 @@ AUTH_USER_MODEL = 'accounts.User'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'accounts.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -125,4 +125,83 @@ CORS_ALLOWED_ORIGINS = os.environ.get('CORS_ALLOWED_ORIGINS', 'http://localhost:
 CORS_ALLOW_CREDENTIALS = True
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 MEDIA_URL = '/media/'
-MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
\ No newline at end of file
+MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+
+# The cache must answer from memory: every request reads it (authentication, card
+# hierarchy version, dashboard stats), so a database-backed cache would cost more
+# queries than it saves. With REDIS_URL set (needs the redis package) the cache is
+# shared by every gunicorn worker and the export worker, so invalidations and the
+# dashboard hit counters reach all of them. Without it each process keeps its own
+# in-memory cache, which is enough for the single-process development server;
+# with DEBUG off, `manage.py check` fails until a shared cache is configured
+# (tickets/checks.py).
+REDIS_URL = os.environ.get('REDIS_URL')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Seconds a worker may serve its in-memory card hierarchy before rebuilding it.
+CARD_HIERARCHY_MAX_AGE = int(os.environ.get('CARD_HIERARCHY_MAX_AGE', 300))
+# Seconds between a worker's checks of the shared card version token (at most
+# CARD_HIERARCHY_MAX_AGE): edits made through Django reach the other workers
+# within this delay, and requests in between read neither the cache nor the database.
+CARD_HIERARCHY_VERSION_CHECK_INTERVAL = float(os.environ.get('CARD_HIERARCHY_VERSION_CHECK_INTERVAL', 5))
+
+# How log_activity writes entries:
+#   'sync'     - one INSERT inside the request, durable before the response is sent (default).
+#   'request'  - queued and written in one bulk INSERT after the response has been sent;
+#                entries are lost only if the worker dies in between.
+#   'buffered' - held across requests until ACTIVITY_LOG_BUFFER_SIZE entries or
+#                ACTIVITY_LOG_FLUSH_INTERVAL seconds have built up, and flushed at exit;
+#                a crashed worker loses at most that many entries.
+ACTIVITY_LOG_MODE = os.environ.get('ACTIVITY_LOG_MODE', 'sync')
+ACTIVITY_LOG_BUFFER_SIZE = int(os.environ.get('ACTIVITY_LOG_BUFFER_SIZE', 100))
+ACTIVITY_LOG_FLUSH_INTERVAL = float(os.environ.get('ACTIVITY_LOG_FLUSH_INTERVAL', 5))
+
+# On MySQL the activity log is split into partitions of this many months, so that
+# retention drops whole partitions (see maintain_activity_log_partitions).
+ACTIVITY_LOG_PARTITION_MONTHS = int(os.environ.get('ACTIVITY_LOG_PARTITION_MONTHS', 1))
+
+# Where dashboard-stats reads its figures: 'summary' (the TicketStats table, maintained
+# as tickets change; see rebuild_ticket_stats) or 'live' (aggregates over all tickets).
+DASHBOARD_STATS_SOURCE = os.environ.get('DASHBOARD_STATS_SOURCE', 'summary')
+
+# Seconds a dashboard-stats response is cached per scope (see tickets/dashboard_cache.py).
+# Ticket and user changes invalidate it at once; the timeout bounds how stale the
+# time-based SLA figures can get. 0 disables the cache.
+DASHBOARD_STATS_CACHE_TIMEOUT = int(os.environ.get('DASHBOARD_STATS_CACHE_TIMEOUT', 60))
+
+# Ticket and activity-log lists count matches exactly up to this many rows. Beyond it
+# they report the database's estimate (or a cached count) and flag it as approximate.
+PAGINATION_EXACT_COUNT_LIMIT = int(os.environ.get('PAGINATION_EXACT_COUNT_LIMIT', 1000))
+PAGINATION_COUNT_CACHE_TIMEOUT = int(os.environ.get('PAGINATION_COUNT_CACHE_TIMEOUT', 60))
+
+# Seconds a worker may validate assignees against its cached list of technicians
+# (tickets/technicians.py). User changes made through Django drop it at once.
+TECHNICIAN_CACHE_TIMEOUT = int(os.environ.get('TECHNICIAN_CACHE_TIMEOUT', 60))
+
+# Seconds a worker may authenticate read requests against its cached copy of a user
+# (accounts/authentication.py), so how long a deactivation or role change can take
+# to reach workers that do not share the cache. User changes made through Django
+# drop the entry at once.
+AUTH_USER_CACHE_TIMEOUT = int(os.environ.get('AUTH_USER_CACHE_TIMEOUT', 30))
+
+# Export jobs (tickets/export_jobs.py). A job still RUNNING this many seconds after
+# it started is taken to belong to a worker that died, and is queued again; keep it
+# above the longest export. Finished jobs and their files are deleted this many days
+# after they finished.
+EXPORT_JOB_TIMEOUT = int(os.environ.get('EXPORT_JOB_TIMEOUT', 3600))
+EXPORT_RETENTION_DAYS = int(os.environ.get('EXPORT_RETENTION_DAYS', 7))
+
+# The most tickets one bulk request may create or update (tickets/bulk_tickets.py).
+BULK_TICKET_LIMIT = int(os.environ.get('BULK_TICKET_LIMIT', 500))
@@ -7,4 +7,4 @@ DEBUG = True
 
 # Specific settings for local development can go here
 # For example, if you wanted to see emails in the console:
-# EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
\ No newline at end of file
+# EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
@@ -0,0 +1,137 @@
+# Path: E:\it-admin-tool\backend\tickets\activity_log_partitions.py
+
+import datetime
+from django.conf import settings
+from django.db import connection
+
+# The activity log is RANGE-partitioned on `timestamp` when the database is MySQL.
+# Each partition holds ACTIVITY_LOG_PARTITION_MONTHS months and is named after its
+# first month (p202510). A catch-all partition takes anything past the last one.
+TABLE_NAME = 'tickets_activitylog'
+FUTURE_PARTITION = 'p_future'
+
+
+def period_months():
+    return max(1, int(getattr(settings, 'ACTIVITY_LOG_PARTITION_MONTHS', 1)))
+
+
+def _month_index(day):
+    return day.year * 12 + day.month - 1
+
+
+def _from_month_index(index):
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+def periods_ahead(day, count):
+    """The start of the period `count` periods after the one containing `day`."""
+    return _from_month_index(_month_index(period_start(day)) + count * period_months())
+
+
+def period_start(day):
+    """The first day of the partition period containing `day`."""
+    index = _month_index(day)
+    return _from_month_index(index - index % period_months())
+
+
+def next_period(start):
+    return _from_month_index(_month_index(start) + period_months())
+
+
+def partition_name(start):
+    return f'p{start:%Y%m}'
+
+
+def supports_partitioning(conn=connection):
+    return conn.vendor == 'mysql'
+
+
+def _partition_clause(conn, start):
+    return f"PARTITION {conn.ops.quote_name(partition_name(start))} VALUES LESS THAN ('{next_period(start).isoformat()}')"
+
+
+def _future_clause(conn):
+    return f"PARTITION {conn.ops.quote_name(FUTURE_PARTITION)} VALUES LESS THAN (MAXVALUE)"
+
+
+def list_partitions(conn=connection):
+    """
+    Returns [(name, upper_bound)] for the table's partitions in order, where
+    upper_bound is an exclusive date, or None for the catch-all partition.
+    Returns [] when the table is not partitioned.
+    """
+    if not supports_partitioning(conn):
+        return []
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT PARTITION_NAME, PARTITION_DESCRIPTION FROM information_schema.PARTITIONS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND PARTITION_NAME IS NOT NULL "
+            "ORDER BY PARTITION_ORDINAL_POSITION",
+            [TABLE_NAME],
+        )
+        rows = cursor.fetchall()
+    partitions = []
+    for name, description in rows:
+        if description == 'MAXVALUE':
+            partitions.append((name, None))
+        else:
+            partitions.append((name, datetime.date.fromisoformat(description.strip("'")[:10])))
+    return partitions
+
+
+def partition_table(conn, first_day, until):
+    """
+    Converts the unpartitioned table into monthly partitions covering first_day up
+    to `until`, plus the catch-all. MySQL requires the partitioning column in the
+    primary key, so the key becomes (id, timestamp).
+    """
+    table = conn.ops.quote_name(TABLE_NAME)
+    clauses = []
+    start = period_start(first_day)
+    while start <= until:
+        clauses.append(_partition_clause(conn, start))
+        start = next_period(start)
+    clauses.append(_future_clause(conn))
+    with conn.cursor() as cursor:
+        cursor.execute(f"ALTER TABLE {table} DROP PRIMARY KEY, ADD PRIMARY KEY (`id`, `timestamp`)")
+        cursor.execute(f"ALTER TABLE {table} PARTITION BY RANGE COLUMNS(`timestamp`) ({', '.join(clauses)})")
+
+
+def unpartition_table(conn):
+    table = conn.ops.quote_name(TABLE_NAME)
+    with conn.cursor() as cursor:
+        cursor.execute(f"ALTER TABLE {table} REMOVE PARTITIONING")
+        cursor.execute(f"ALTER TABLE {table} DROP PRIMARY KEY, ADD PRIMARY KEY (`id`)")
+
+
+def create_partitions_until(until, conn=connection):
+    """Splits new periods off the catch-all partition up to and including the one containing `until`."""
+    partitions = list_partitions(conn)
+    if not partitions:
+        return []
+    bounded = [upper for _, upper in partitions if upper is not None]
+    start = max(bounded) if bounded else period_start(datetime.date.today())
+    new_starts = []
+    while start <= until:
+        new_starts.append(start)
+        start = next_period(start)
+    if new_starts:
+        clauses = [_partition_clause(conn, start) for start in new_starts] + [_future_clause(conn)]
+        with conn.cursor() as cursor:
+            cursor.execute(
+                f"ALTER TABLE {conn.ops.quote_name(TABLE_NAME)} REORGANIZE PARTITION {conn.ops.quote_name(FUTURE_PARTITION)} "
+                f"INTO ({', '.join(clauses)})"
+            )
+    return [partition_name(start) for start in new_starts]
+
+
+def expired_partitions(cutoff, conn=connection):
+    """The partitions whose rows are all older than `cutoff`."""
+    return [name for name, upper in list_partitions(conn) if upper is not None and upper <= cutoff]
+
+
+def drop_partitions(names, conn=connection):
+    if names:
+        quoted = ', '.join(conn.ops.quote_name(name) for name in names)
+        with conn.cursor() as cursor:
+            cursor.execute(f"ALTER TABLE {conn.ops.quote_name(TABLE_NAME)} DROP PARTITION {quoted}")
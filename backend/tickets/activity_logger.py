@@ -1,9 +1,21 @@
 # Path: E:\it-admin-tool\backend\tickets\activity_logger.py
 # COPY AND PASTE THIS ENTIRE, FINAL, PERFECT BLOCK.
 
+import atexit
+import logging
+import threading
+import time
+from django.conf import settings
 from .models import ActivityLog
 from django.contrib.auth.models import AnonymousUser
 
+logger = logging.getLogger(__name__)
+
+# Entries waiting to be written when ACTIVITY_LOG_MODE is 'request' or 'buffered'.
+_buffer = []
+_buffer_lock = threading.Lock()
+_last_flush = time.monotonic()
+
 def get_client_ip(request):
     """Get the client's real IP address from the request."""
     if not request:
@@ -15,19 +27,63 @@ def get_client_ip(request):
         ip = request.META.get('REMOTE_ADDR')
     return ip
 
-def log_activity(user, action, request=None, target=None, details=""):
-    """
-    The final, correct utility to create an activity log entry.
-    It takes the user and the request separately for maximum flexibility.
-    """
+def build_activity_entry(user, action, request=None, target=None, details=""):
+    """The unsaved ActivityLog entry log_activity() would write, or None for anonymous users. For bulk inserts."""
     if not user or not user.is_authenticated or isinstance(user, AnonymousUser):
-        return
-
-    ActivityLog.objects.create(
+        return None
+    return ActivityLog(
         user=user,
         user_role=user.role,
         ip_address=get_client_ip(request), # Get IP from the optional request
         action=action,
         target_object_id=str(target) if target else None,
         details=details
-    )
\ No newline at end of file
+    )
+
+def log_activity(user, action, request=None, target=None, details=""):
+    """
+    The final, correct utility to create an activity log entry.
+    It takes the user and the request separately for maximum flexibility.
+    Depending on ACTIVITY_LOG_MODE the entry is written now ('sync') or queued
+    for a bulk insert ('request' and 'buffered'); see flush_activity_log().
+    """
+    entry = build_activity_entry(user, action, request, target, details)
+    if entry is None:
+        return
+    mode = getattr(settings, 'ACTIVITY_LOG_MODE', 'sync')
+    if mode == 'sync':
+        entry.save()
+        return
+
+    with _buffer_lock:
+        _buffer.append(entry)
+        size = len(_buffer)
+    if mode == 'buffered' and size >= getattr(settings, 'ACTIVITY_LOG_BUFFER_SIZE', 100):
+        flush_activity_log()
+
+def flush_activity_log():
+    """Writes every queued entry in one bulk INSERT. Safe to call in any mode."""
+    global _last_flush
+    with _buffer_lock:
+        entries = _buffer[:]
+        _buffer.clear()
+        _last_flush = time.monotonic()
+    if not entries:
+        return
+    try:
+        ActivityLog.objects.bulk_create(entries)
+    except Exception:
+        logger.exception("Could not write %d buffered activity log entries.", len(entries))
+
+def flush_if_due():
+    """
+    Called at the end of every request. 'request' mode always flushes; 'buffered'
+    mode flushes once ACTIVITY_LOG_FLUSH_INTERVAL seconds have passed.
+    """
+    mode = getattr(settings, 'ACTIVITY_LOG_MODE', 'sync')
+    if mode == 'request':
+        flush_activity_log()
+    elif mode == 'buffered' and time.monotonic() - _last_flush >= getattr(settings, 'ACTIVITY_LOG_FLUSH_INTERVAL', 5):
+        flush_activity_log()
+
+atexit.register(flush_activity_log)
@@ -0,0 +1,127 @@
+# Path: E:\it-admin-tool\backend\tickets\bulk_tickets.py
+
+from django.db import transaction
+from django.utils import timezone
+from .models import Ticket, Card, Comment, ActivityLog
+from .activity_logger import build_activity_entry
+from .serializers import BulkTicketItemSerializer
+from .search import reindex_tickets
+from .ticket_stats import STATE_LOOKUPS, record_state_changes
+
+# Many tickets in one request, for outages that take out a whole node. Cards are
+# resolved in one query, ticket ids reserved in one block (Ticket.assign_ticket_ids),
+# and the tickets and their activity-log entries written with one bulk INSERT each,
+# in one transaction. Updates change every ticket with one UPDATE per column set.
+# Every item gets its own result, in request order.
+
+# Closing fills in closed_at too, as a ticket update does.
+BULK_TIMESTAMP_FIELDS = {**Ticket.STATUS_TIMESTAMP_FIELDS, 'CLOSED': 'closed_at'}
+
+
+def create_tickets(request, items):
+    """
+    Creates one ticket per valid item for request.user. Returns a result per item:
+    {'index', 'serial_number', 'status': 'created', 'id', 'ticket_id'} or
+    {'index', 'serial_number', 'status': 'failed', 'errors'}.
+    """
+    user = request.user
+    results = []
+    valid = []
+    for index, item in enumerate(items):
+        serializer = BulkTicketItemSerializer(data=item)
+        if serializer.is_valid():
+            valid.append((index, serializer.validated_data))
+        results.append({'index': index, 'serial_number': item.get('serial_number'), 'status': 'failed', 'errors': serializer.errors})
+
+    cards = Card.objects.in_bulk({data['serial_number'] for _, data in valid}, field_name='serial_number')
+    seen = set()
+    tickets = []
+    for index, data in valid:
+        serial_number = data['serial_number']
+        if serial_number not in cards:
+            results[index]['errors'] = {'serial_number': ["A card with this serial number does not exist."]}
+        elif serial_number in seen:
+            results[index]['errors'] = {'serial_number': ["This serial number is listed more than once."]}
+        else:
+            seen.add(serial_number)
+            tickets.append((index, Ticket(
+                card=cards[serial_number],
+                created_by=user,
+                fault_description=data['fault_description'],
+                priority=data['priority'],
+            )))
+    if not tickets:
+        return results
+
+    with transaction.atomic():
+        created = Ticket.objects.bulk_create([ticket for _, ticket in tickets])
+        ActivityLog.objects.bulk_create([
+            build_activity_entry(user=user, request=request, action='TICKET_CREATED', target=ticket.ticket_id, details=f"Created new ticket with priority {ticket.priority}.")
+            for ticket in created
+        ])
+
+    # Not every database returns the primary keys of bulk-inserted rows.
+    if any(ticket.pk is None for ticket in created):
+        pks = dict(Ticket.objects.filter(ticket_id__in=[ticket.ticket_id for ticket in created]).values_list('ticket_id', 'pk'))
+        for ticket in created:
+            ticket.pk = pks[ticket.ticket_id]
+    for index, ticket in tickets:
+        results[index] = {'index': index, 'serial_number': ticket.card.serial_number, 'status': 'created', 'id': ticket.pk, 'ticket_id': ticket.ticket_id}
+    return results
+
+
+def update_tickets(request, queryset, data):
+    """
+    Applies data['status'] (with data['comment']) and/or data['assigned_to'] to
+    those of data['ticket_ids'] that `queryset` lets request.user change. Returns
+    a result per requested id: {'id', 'status': 'updated', 'ticket_id'} or
+    {'id', 'status': 'failed', 'errors'}.
+    """
+    user = request.user
+    ticket_ids = list(dict.fromkeys(data['ticket_ids']))
+    new_status, comment = data.get('status'), data.get('comment')
+    reassign, assignee = 'assigned_to' in data, data.get('assigned_to')
+    assignee_id = assignee.pk if assignee else None
+    now = timezone.now()
+
+    with transaction.atomic():
+        # Lock the rows first, so the states read below are the ones being changed.
+        list(Ticket.objects.select_for_update().filter(pk__in=ticket_ids).order_by('pk').values_list('pk', flat=True))
+        rows = {
+            row[0]: row for row in
+            queryset.filter(pk__in=ticket_ids).order_by().values_list('pk', 'ticket_id', *STATE_LOOKUPS)
+        }
+        states = {pk: (list(row[2:]), list(row[2:])) for pk, row in rows.items()}
+        targets = Ticket.objects.filter(pk__in=list(rows))
+        entries = []
+
+        if new_status:
+            targets.update(status=new_status, updated_at=now)
+            timestamp_field = BULK_TIMESTAMP_FIELDS.get(new_status)
+            if timestamp_field:
+                targets.filter(**{f'{timestamp_field}__isnull': True}).update(**{timestamp_field: now})
+            for pk, (old, new) in states.items():
+                new[3] = new_status
+                if timestamp_field == 'resolved_at' and new[6] is None:
+                    new[6] = now
+                entries.append(build_activity_entry(user=user, request=request, action='STATUS_CHANGED', target=rows[pk][1], details=f"Status changed to {new_status} with comment: '{comment[:50]}...'"))
+
+        if reassign:
+            moving = [pk for pk, (old, new) in states.items() if old[1] != assignee_id]
+            Ticket.objects.filter(pk__in=moving).update(assigned_to=assignee, assigned_at=now if assignee else None, updated_at=now)
+            assignee_name = assignee.username if assignee else "Unassigned"
+            for pk in moving:
+                states[pk][1][1] = assignee_id
+                entries.append(build_activity_entry(user=user, request=request, action='TICKET_ASSIGNED', target=rows[pk][1], details=f"Assigned ticket to {assignee_name}."))
+
+        if comment:
+            Comment.objects.bulk_create([Comment(ticket_id=pk, author=user, text=comment) for pk in rows])
+        ActivityLog.objects.bulk_create(entries)
+        record_state_changes([(tuple(old), tuple(new)) for old, new in states.values()])
+        reindex_tickets(targets)
+
+    return [
+        {'id': pk, 'status': 'updated', 'ticket_id': rows[pk][1]} if pk in rows else
+        {'id': pk, 'status': 'failed', 'errors': {'detail': "No ticket with this id that you can change."}}
+        for pk in ticket_ids
+    ]
@@ -0,0 +1,21 @@
+# Path: E:\it-admin-tool\backend\tickets\caching.py
+
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.cache.backends.memcached import BaseMemcachedCache
+from django.core.cache.backends.redis import RedisCache
+
+# Backends that answer from memory, without a database query, and increment
+# counters atomically. The shared ones are visible to every worker process.
+SHARED_MEMORY_BACKENDS = (RedisCache, BaseMemcachedCache)
+MEMORY_BACKENDS = SHARED_MEMORY_BACKENDS + (LocMemCache,)
+
+
+def cache_in_memory(alias='default'):
+    """Whether the cache answers without touching the database."""
+    return isinstance(caches[alias], MEMORY_BACKENDS)
+
+
+def cache_shared(alias='default'):
+    """Whether every process sees the same cache."""
+    return isinstance(caches[alias], SHARED_MEMORY_BACKENDS)
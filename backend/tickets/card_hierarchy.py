@@ -0,0 +1,140 @@
+# Path: E:\it-admin-tool\backend\tickets\card_hierarchy.py
+
+import hashlib
+import threading
+import time
+import uuid
+from django.conf import settings
+from django.core.cache import cache
+from .models import Card
+
+# The order of the ticket-creation cascade. Every level narrows the one before it.
+HIERARCHY_LEVELS = ['zone', 'state', 'node_type', 'location', 'card_type', 'slot']
+
+VERSION_CACHE_KEY = 'tickets:card_hierarchy:version'
+
+_lock = threading.Lock()
+_hierarchy = None
+
+
+class CardHierarchy:
+    """
+    An in-memory zone -> state -> node_type -> location -> card_type -> slot tree.
+    Each node is a dict whose keys are already in database order, and each slot
+    maps to the id of the first card found at that position.
+    """
+
+    def __init__(self, version, tree, all_states, digest):
+        self.version = version
+        self.tree = tree
+        self.all_states = all_states
+        self.digest = digest
+        self.built_at = time.monotonic()
+        # When the version token was last compared with the cache's.
+        self.checked_at = self.built_at
+
+    @classmethod
+    def build(cls, version):
+        tree = {}
+        digest = hashlib.sha1()
+        rows = Card.objects.order_by(*HIERARCHY_LEVELS, 'pk').values_list(*HIERARCHY_LEVELS, 'pk')
+        for row in rows.iterator(chunk_size=5000):
+            node = tree
+            for value in row[:-2]:
+                node = node.setdefault(value, {})
+            node.setdefault(row[-2], row[-1])
+            digest.update('\x1f'.join(str(value) for value in row).encode())
+            digest.update(b'\x1e')
+        all_states = list(Card.objects.values_list('state', flat=True).distinct().order_by('state'))
+        return cls(version, tree, all_states, digest.hexdigest())
+
+    def node(self, *path):
+        """Returns the subtree below `path`, or None if the path does not exist."""
+        node = self.tree
+        for value in path:
+            if not isinstance(node, dict) or value not in node:
+                return None
+            node = node[value]
+        return node
+
+    def children(self, *path):
+        """Returns the values available at the level below `path`, in database order."""
+        node = self.node(*path)
+        return list(node) if isinstance(node, dict) else []
+
+    def states(self, zone=None):
+        if zone:
+            return self.children(zone)
+        return list(self.all_states)
+
+    def snapshot(self, zone=None):
+        """Returns the whole tree, or only the branch of `zone`, as a nested document."""
+        if not zone:
+            return self.tree
+        node = self.node(zone)
+        return {zone: node} if node is not None else {}
+
+    def etag(self, zone=None):
+        """A strong validator that changes whenever the (zone-scoped) tree changes."""
+        return hashlib.sha1(f"{self.digest}:{zone or ''}".encode()).hexdigest()
+
+
+def get_card_version():
+    """Returns the shared version token of the Card table, creating one if needed."""
+    version = cache.get(VERSION_CACHE_KEY)
+    if version is None:
+        version = uuid.uuid4().hex
+        if not cache.add(VERSION_CACHE_KEY, version, timeout=None):
+            version = cache.get(VERSION_CACHE_KEY, version)
+    return version
+
+
+def invalidate_card_hierarchy():
+    """
+    Marks the hierarchy stale. This worker rebuilds on its next request; others
+    sharing the cache backend within CARD_HIERARCHY_VERSION_CHECK_INTERVAL, and with
+    a per-process cache after CARD_HIERARCHY_MAX_AGE.
+    """
+    global _hierarchy
+    cache.set(VERSION_CACHE_KEY, uuid.uuid4().hex, timeout=None)
+    _hierarchy = None
+
+
+def _max_age():
+    return getattr(settings, 'CARD_HIERARCHY_MAX_AGE', 300)
+
+
+def _check_interval():
+    interval = getattr(settings, 'CARD_HIERARCHY_VERSION_CHECK_INTERVAL', 5)
+    max_age = _max_age()
+    return interval if max_age is None else min(interval, max_age)
+
+
+def _is_fresh(hierarchy, version):
+    if hierarchy is None or hierarchy.version != version:
+        return False
+    max_age = _max_age()
+    return max_age is None or time.monotonic() - hierarchy.built_at < max_age
+
+
+def get_card_hierarchy():
+    """
+    Returns this worker's card hierarchy, rebuilding it when the Card table has
+    changed. The version token is read from the cache at most once per
+    CARD_HIERARCHY_VERSION_CHECK_INTERVAL, so most requests touch neither the
+    cache nor the database.
+    """
+    global _hierarchy
+    hierarchy = _hierarchy
+    if hierarchy is not None and time.monotonic() - hierarchy.checked_at < _check_interval():
+        return hierarchy
+    version = get_card_version()
+    if _is_fresh(hierarchy, version):
+        hierarchy.checked_at = time.monotonic()
+        return hierarchy
+    with _lock:
+        hierarchy = _hierarchy
+        if not _is_fresh(hierarchy, version):
+            hierarchy = CardHierarchy.build(version)
+            _hierarchy = hierarchy
+    return hierarchy
@@ -0,0 +1,200 @@
+# Path: E:\it-admin-tool\backend\tickets\card_import.py
+
+import csv
+import math
+import os
+from itertools import islice
+from openpyxl import load_workbook
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from .models import Card, Ticket
+from .card_hierarchy import invalidate_card_hierarchy
+from .ticket_stats import record_card_type_changes
+from .search import CARD_DOCUMENT_FIELDS, reindex_tickets
+
+# Every Card column except the serial number, which is the import key.
+CARD_FIELDS = [
+    'zone', 'state', 'node_type', 'location', 'card_type', 'slot',
+    'node_name', 'primary_ip', 'aid', 'unit_part_number', 'clei',
+]
+DEFAULT_PRIMARY_IP = '0.0.0.0'
+# Cell values treated as empty, the same markers pandas reads as NaN.
+MISSING_VALUES = {
+    '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+    '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null',
+}
+MAX_REPORTED_ERRORS = 20
+
+
+def normalize_header(header):
+    return str(header).strip().lower().replace(' ', '_')
+
+
+def normalize_value(value):
+    """Turns a spreadsheet cell into the string stored on the Card."""
+    if value is None:
+        return ''
+    if isinstance(value, float):
+        if math.isnan(value):
+            return ''
+        if value.is_integer():
+            value = int(value)
+    value = str(value).strip()
+    return '' if value in MISSING_VALUES else value
+
+
+def clean_card_row(row):
+    """
+    Returns (serial_number, field values) for one sheet row.
+    Raises ValueError with a readable reason if the row cannot be imported.
+    """
+    serial_number = normalize_value(row.get('serial_number'))
+    if not serial_number:
+        raise ValueError('missing serial_number')
+    values = {field: normalize_value(row.get(field)) for field in CARD_FIELDS}
+    values['primary_ip'] = values['primary_ip'] or DEFAULT_PRIMARY_IP
+    try:
+        values['primary_ip'] = Card._meta.get_field('primary_ip').clean(values['primary_ip'], None)
+    except ValidationError:
+        raise ValueError(f"invalid primary_ip '{values['primary_ip']}'")
+    for field in ['serial_number'] + CARD_FIELDS:
+        max_length = Card._meta.get_field(field).max_length
+        value = serial_number if field == 'serial_number' else values[field]
+        if max_length and len(value) > max_length:
+            raise ValueError(f'{field} is longer than {max_length} characters')
+    return serial_number, values
+
+
+def iter_card_rows(file_path, file_format=None):
+    """
+    Yields (row_number, row) for every non-blank data row of an .xlsx or .csv
+    sheet, reading it row by row so memory does not grow with the file.
+    """
+    file_format = (file_format or os.path.splitext(file_path)[1].lstrip('.')).lower()
+    if file_format == 'csv':
+        return _iter_csv_rows(file_path)
+    if file_format in ('xlsx', 'xlsm'):
+        return _iter_xlsx_rows(file_path)
+    raise ValueError(f"Unsupported file format '{file_format}'. Use an .xlsx or .csv file.")
+
+
+def _rows_to_dicts(rows):
+    headers = [normalize_header(header) for header in next(rows, [])]
+    for row_number, values in enumerate(rows, start=2):
+        if all(value is None or value == '' for value in values):
+            continue
+        yield row_number, dict(zip(headers, values))
+
+
+def _iter_csv_rows(file_path):
+    with open(file_path, newline='', encoding='utf-8-sig') as f:
+        yield from _rows_to_dicts(csv.reader(f))
+
+
+def _iter_xlsx_rows(file_path):
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        yield from _rows_to_dicts(workbook.active.iter_rows(values_only=True))
+    finally:
+        workbook.close()
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+class CardImportResult:
+    def __init__(self):
+        self.rows = 0
+        self.created = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.invalid = 0
+        # Rows superseded by a later row for the same serial in the same batch;
+        # each serial of a batch counts once, under created, updated or unchanged.
+        self.duplicates = 0
+        self.errors = []
+
+    def add_error(self, row_number, reason):
+        self.invalid += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(f'Row {row_number}: {reason}')
+
+
+class CardImporter:
+    """
+    Imports (row_number, row) pairs, where each row is a dict keyed by Card
+    field names. Rows are consumed `batch_size` at a time, so only one batch is
+    held in memory. Each batch costs one SELECT to find existing serial numbers
+    plus one bulk INSERT and one bulk UPDATE, and the whole import runs in a
+    single transaction. Cards are matched by serial number; a later row for the
+    same serial wins.
+    """
+
+    def __init__(self, batch_size=1000, dry_run=False):
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        # A dry run writes nothing, so it remembers the cards it would have
+        # created in order to diff later rows for the same serial against them.
+        self.dry_run_created = {}
+
+    def run(self, numbered_rows):
+        result = CardImportResult()
+        with transaction.atomic():
+            for batch in batched(numbered_rows, self.batch_size):
+                self.import_batch(batch, result)
+        if not self.dry_run and (result.created or result.updated):
+            invalidate_card_hierarchy()
+        return result
+
+    def import_batch(self, batch, result):
+        records = {}
+        for row_number, row in batch:
+            result.rows += 1
+            try:
+                serial_number, values = clean_card_row(row)
+            except ValueError as e:
+                result.add_error(row_number, e)
+                continue
+            if serial_number in records:
+                # The earlier row is superseded, as update_or_create would have done.
+                result.duplicates += 1
+            records[serial_number] = values
+
+        existing = Card.objects.in_bulk(list(records), field_name='serial_number')
+        if self.dry_run:
+            existing.update({serial: self.dry_run_created[serial] for serial in records if serial in self.dry_run_created})
+        to_create, to_update = [], []
+        card_type_changes = {}
+        reindexed_cards = []
+        for serial_number, values in records.items():
+            card = existing.get(serial_number)
+            if card is None:
+                to_create.append(Card(serial_number=serial_number, **values))
+            elif any(getattr(card, field) != value for field, value in values.items()):
+                if card.pk and card.card_type != values['card_type']:
+                    card_type_changes[card.pk] = (card.card_type, values['card_type'])
+                if card.pk and any(getattr(card, field) != values[field] for field in CARD_DOCUMENT_FIELDS if field in values):
+                    reindexed_cards.append(card.pk)
+                for field, value in values.items():
+                    setattr(card, field, value)
+                to_update.append(card)
+            else:
+                result.unchanged += 1
+
+        if self.dry_run:
+            self.dry_run_created.update((card.serial_number, card) for card in to_create)
+        else:
+            Card.objects.bulk_create(to_create, batch_size=self.batch_size)
+            Card.objects.bulk_update(to_update, CARD_FIELDS, batch_size=self.batch_size)
+            # bulk_update sends no signals, so update the dashboard summary and search index here.
+            record_card_type_changes(card_type_changes)
+            if reindexed_cards:
+                reindex_tickets(Ticket.objects.filter(card_id__in=reindexed_cards))
+        result.created += len(to_create)
+        result.updated += len(to_update)
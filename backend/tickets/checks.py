@@ -0,0 +1,21 @@
+# Path: E:\it-admin-tool\backend\tickets\checks.py
+
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+from .caching import cache_shared
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    """
+    Outside development the cache has to be Redis or memcached: gunicorn runs
+    several workers, and the card hierarchy, dashboard stats and authentication
+    caches are invalidated through it.
+    """
+    if settings.DEBUG or cache_shared():
+        return []
+    return [Error(
+        'The default cache is not shared between processes.',
+        hint="Set REDIS_URL (see CACHES in helpdesk/settings/base.py), or configure a memcached backend.",
+        id='tickets.E001',
+    )]
@@ -0,0 +1,223 @@
+# Path: E:\it-admin-tool\backend\tickets\dashboard.py
+
+from datetime import timedelta
+from django.conf import settings
+from django.db.models import Count, Avg, F, ExpressionWrapper, DurationField, Q, Sum
+from django.utils import timezone
+from accounts.models import User
+from .models import Ticket, TicketStats
+
+ALL_PRIORITIES = ['CRITICAL', 'HIGH', 'MEDIUM', 'LOW']
+IN_PROGRESS_STATUSES = ['IN_PROGRESS', 'IN_TRANSIT', 'UNDER_REPAIR', 'ON_HOLD']
+SLA_COMPLETE_STATUSES = ['RESOLVED', 'CLOSED']
+SLA_TARGETS = {'CRITICAL': 3, 'HIGH': 7, 'MEDIUM': 14, 'LOW': 21}
+
+
+def scoped_tickets(user, view_as):
+    """The tickets the dashboard covers for this user (and, for admins and observers, view_as)."""
+    base_queryset = Ticket.objects.all()
+    if user.role in [User.ADMIN, User.OBSERVER]:
+        if view_as == 'client':
+            base_queryset = base_queryset.filter(created_by__role=User.CLIENT)
+        elif view_as == 'technician':
+            base_queryset = base_queryset.filter(assigned_to__role=User.TECHNICIAN)
+    elif user.role == User.CLIENT:
+        base_queryset = base_queryset.filter(created_by=user)
+    elif user.role == User.TECHNICIAN:
+        base_queryset = base_queryset.filter(assigned_to=user)
+    return base_queryset
+
+
+def scoped_stats(user, view_as):
+    """The TicketStats buckets that add up to scoped_tickets(user, view_as)."""
+    if user.role in [User.ADMIN, User.OBSERVER]:
+        if view_as == 'client':
+            return TicketStats.objects.filter(scope=TicketStats.CREATED_BY, user__role=User.CLIENT)
+        if view_as == 'technician':
+            return TicketStats.objects.filter(scope=TicketStats.ASSIGNED_TO, user__role=User.TECHNICIAN)
+    elif user.role == User.CLIENT:
+        return TicketStats.objects.filter(scope=TicketStats.CREATED_BY, user=user)
+    elif user.role == User.TECHNICIAN:
+        return TicketStats.objects.filter(scope=TicketStats.ASSIGNED_TO, user=user)
+    return TicketStats.objects.filter(scope=TicketStats.GLOBAL)
+
+
+def dashboard_stats(user, view_as):
+    """The dashboard-stats response body, read from TicketStats or, with DASHBOARD_STATS_SOURCE = 'live', from the Ticket table."""
+    response_data = {}
+    if user.role in [User.ADMIN, User.OBSERVER]:
+        response_data['total_users'] = User.objects.filter(is_active=True).count()
+    base_queryset = scoped_tickets(user, view_as)
+    if getattr(settings, 'DASHBOARD_STATS_SOURCE', 'summary') == 'live':
+        response_data.update(live_ticket_stats(base_queryset))
+    else:
+        response_data.update(summary_ticket_stats(scoped_stats(user, view_as), base_queryset))
+    return response_data
+
+
+def open_breached_counts(base_queryset, now):
+    sla_targets = SLA_TARGETS
+    # No ticket younger than the shortest target can be breached, so skip them via the (status, created_at) index.
+    oldest_allowed = now - timedelta(days=min(sla_targets.values()))
+    return base_queryset.filter(status='OPEN', created_at__lt=oldest_allowed).annotate(
+        age=now - F('created_at')
+    ).aggregate(
+        CRITICAL=Count('id', filter=Q(priority='CRITICAL', age__gt=timedelta(days=sla_targets['CRITICAL']))),
+        HIGH=Count('id', filter=Q(priority='HIGH', age__gt=timedelta(days=sla_targets['HIGH']))),
+        MEDIUM=Count('id', filter=Q(priority='MEDIUM', age__gt=timedelta(days=sla_targets['MEDIUM']))),
+        LOW=Count('id', filter=Q(priority='LOW', age__gt=timedelta(days=sla_targets['LOW'])))
+    )
+
+
+def combine_by_priority(priority_counts_dict, historical_sla_dict, proactive_sla_dict, breached_counts):
+    by_priority_combined = []
+    for priority in ALL_PRIORITIES:
+        by_priority_combined.append({
+            'priority': priority,
+            'count': priority_counts_dict.get(priority, 0),
+            'avg_resolution_days': historical_sla_dict.get(priority, 0),
+            'avg_open_age_days': proactive_sla_dict.get(priority, 0),
+            'sla_target_days': SLA_TARGETS.get(priority, 30),
+            'open_breached_count': breached_counts.get(priority, 0)
+        })
+    return by_priority_combined
+
+
+def _days(duration):
+    return duration.total_seconds() / (3600 * 24) if duration else 0
+
+
+def live_ticket_stats(base_queryset, now=None):
+    """
+    Computes the dashboard figures in two grouped passes over the scoped tickets:
+    per priority (counts, SLA averages and breaches as conditional aggregates) and
+    per status and card type. The averages are taken by the database exactly as
+    reference_ticket_stats does, so the output is the same.
+    """
+    now = now or timezone.now()
+    resolution_duration_expr = ExpressionWrapper(F('resolved_at') - F('created_at'), output_field=DurationField())
+    open_age_duration_expr = ExpressionWrapper(now - F('created_at'), output_field=DurationField())
+    breached = Q()
+    for priority, target in SLA_TARGETS.items():
+        breached |= Q(priority=priority, created_at__lt=now - timedelta(days=target))
+
+    by_priority_rows = base_queryset.order_by().values('priority').annotate(
+        count=Count('id'),
+        avg_resolution_duration=Avg(resolution_duration_expr, filter=Q(status__in=SLA_COMPLETE_STATUSES, resolved_at__isnull=False)),
+        avg_open_age_duration=Avg(open_age_duration_expr, filter=Q(status='OPEN')),
+        open_breached_count=Count('id', filter=Q(status='OPEN') & breached),
+    )
+    priority_counts_dict, historical_sla_dict, proactive_sla_dict, breached_counts = {}, {}, {}, {}
+    for row in by_priority_rows:
+        priority = row['priority']
+        priority_counts_dict[priority] = row['count']
+        breached_counts[priority] = row['open_breached_count']
+        if row['avg_resolution_duration'] is not None:
+            historical_sla_dict[priority] = _days(row['avg_resolution_duration'])
+        if row['avg_open_age_duration'] is not None:
+            proactive_sla_dict[priority] = _days(row['avg_open_age_duration'])
+    by_priority_combined = combine_by_priority(priority_counts_dict, historical_sla_dict, proactive_sla_dict, breached_counts)
+
+    by_status, by_category = {}, {}
+    for row in base_queryset.order_by().values('status', 'card__card_type').annotate(count=Count('id')):
+        by_status[row['status']] = by_status.get(row['status'], 0) + row['count']
+        by_category[row['card__card_type']] = by_category.get(row['card__card_type'], 0) + row['count']
+
+    return {
+        'total_tickets': sum(by_status.values()),
+        'open_tickets': by_status.get('OPEN', 0),
+        'in_progress_tickets': sum(by_status.get(status_name, 0) for status_name in IN_PROGRESS_STATUSES),
+        'resolved_tickets': by_status.get('RESOLVED', 0),
+        'closed_tickets': by_status.get('CLOSED', 0),
+        'by_status': [{'status': status_name, 'count': count} for status_name, count in sorted(by_status.items())],
+        'by_priority': by_priority_combined,
+        'by_category': [
+            {'card_category': card_type, 'count': count}
+            for card_type, count in sorted(by_category.items(), key=lambda item: (-item[1], item[0] or ''))
+        ],
+    }
+
+
+def reference_ticket_stats(base_queryset, now=None):
+    """
+    The original one-query-per-metric computation, kept as the yardstick for
+    live_ticket_stats (see compare_dashboard_stats).
+    """
+    status_counts = base_queryset.aggregate(
+        open_tickets=Count('id', filter=Q(status='OPEN')),
+        in_progress_tickets=Count('id', filter=Q(status__in=IN_PROGRESS_STATUSES)),
+        resolved_tickets=Count('id', filter=Q(status='RESOLVED')),
+        closed_tickets=Count('id', filter=Q(status='CLOSED')),
+        total_tickets=Count('id')
+    )
+
+    now = now or timezone.now()
+    resolution_duration_expr = ExpressionWrapper(F('resolved_at') - F('created_at'), output_field=DurationField())
+    historical_sla_data = base_queryset.filter(status__in=SLA_COMPLETE_STATUSES, resolved_at__isnull=False).values('priority').annotate(avg_resolution_duration=Avg(resolution_duration_expr))
+    historical_sla_dict = { item['priority']: item['avg_resolution_duration'].total_seconds() / (3600 * 24) if item['avg_resolution_duration'] else 0 for item in historical_sla_data }
+
+    open_age_duration_expr = ExpressionWrapper(now - F('created_at'), output_field=DurationField())
+    proactive_sla_data = base_queryset.filter(status='OPEN').values('priority').annotate(avg_open_age_duration=Avg(open_age_duration_expr))
+    proactive_sla_dict = { item['priority']: item['avg_open_age_duration'].total_seconds() / (3600 * 24) if item['avg_open_age_duration'] else 0 for item in proactive_sla_data }
+
+    by_priority_counts_qs = base_queryset.values('priority').annotate(count=Count('id'))
+    priority_counts_dict = {item['priority']: item['count'] for item in by_priority_counts_qs}
+    by_priority_combined = combine_by_priority(priority_counts_dict, historical_sla_dict, proactive_sla_dict, open_breached_counts(base_queryset, now))
+
+    by_status_counts = base_queryset.values('status').annotate(count=Count('id')).order_by('status')
+    by_category_counts = base_queryset.values('card__card_type').annotate(count=Count('id')).order_by('-count')
+    by_category_renamed = [{'card_category': item['card__card_type'], 'count': item['count']} for item in by_category_counts]
+
+    return {
+        'total_tickets': status_counts['total_tickets'], 'open_tickets': status_counts['open_tickets'], 'in_progress_tickets': status_counts['in_progress_tickets'],
+        'resolved_tickets': status_counts['resolved_tickets'], 'closed_tickets': status_counts['closed_tickets'], 'by_status': list(by_status_counts),
+        'by_priority': by_priority_combined,
+        'by_category': by_category_renamed,
+    }
+
+
+def summary_ticket_stats(stats_queryset, base_queryset):
+    """
+    Builds the same figures from the summary buckets. Only the SLA breach counts,
+    which depend on the current time, still query tickets, and only old open ones.
+    """
+    rows = stats_queryset.values('priority', 'status', 'card_type').annotate(
+        tickets=Sum('ticket_count'),
+        resolved=Sum('resolved_count'),
+        resolution_total=Sum('resolution_seconds'),
+        created_at_total=Sum('created_at_seconds'),
+    ).filter(tickets__gt=0)
+
+    now = timezone.now()
+    by_status, by_priority, by_category = {}, {}, {}
+    resolution, open_age = {}, {}
+    for row in rows:
+        priority, status_name = row['priority'], row['status']
+        by_status[status_name] = by_status.get(status_name, 0) + row['tickets']
+        by_priority[priority] = by_priority.get(priority, 0) + row['tickets']
+        by_category[row['card_type']] = by_category.get(row['card_type'], 0) + row['tickets']
+        if status_name in SLA_COMPLETE_STATUSES and row['resolved']:
+            count, seconds = resolution.get(priority, (0, 0))
+            resolution[priority] = (count + row['resolved'], seconds + row['resolution_total'])
+        if status_name == 'OPEN':
+            count, seconds = open_age.get(priority, (0, 0))
+            open_age[priority] = (count + row['tickets'], seconds + row['created_at_total'])
+
+    day = 3600 * 24
+    historical_sla_dict = {priority: seconds / count / day for priority, (count, seconds) in resolution.items()}
+    proactive_sla_dict = {priority: (now.timestamp() - seconds / count) / day for priority, (count, seconds) in open_age.items()}
+    by_priority_combined = combine_by_priority(by_priority, historical_sla_dict, proactive_sla_dict, open_breached_counts(base_queryset, now))
+
+    return {
+        'total_tickets': sum(by_status.values()),
+        'open_tickets': by_status.get('OPEN', 0),
+        'in_progress_tickets': sum(by_status.get(status_name, 0) for status_name in IN_PROGRESS_STATUSES),
+        'resolved_tickets': by_status.get('RESOLVED', 0),
+        'closed_tickets': by_status.get('CLOSED', 0),
+        'by_status': [{'status': status_name, 'count': count} for status_name, count in sorted(by_status.items())],
+        'by_priority': by_priority_combined,
+        'by_category': [
+            {'card_category': card_type, 'count': count}
+            for card_type, count in sorted(by_category.items(), key=lambda item: (-item[1], item[0] or ''))
+        ],
+    }
@@ -0,0 +1,91 @@
+# Path: E:\it-admin-tool\backend\tickets\dashboard_cache.py
+
+import uuid
+from django.conf import settings
+from django.core.cache import cache
+from accounts.models import User
+from .caching import cache_in_memory
+
+# Cached responses live under a version token per invalidation group: 'all' for
+# every scope that covers other people's tickets, and 'user:<id>' for a client's
+# or technician's own dashboard. Dropping a token orphans every response cached
+# under it, which works on any cache backend without deleting keys by pattern.
+CACHE_PREFIX = 'tickets:dashboard_stats'
+ALL_GROUP = 'all'
+# Hit/miss counters live in the same cache, so with a shared cache (see CACHES)
+# they count every worker's lookups. They are only kept on a backend that
+# increments in memory; anywhere else counting a hit would cost more than the hit.
+COUNTERS = ['hits', 'misses']
+
+
+def cache_timeout():
+    return getattr(settings, 'DASHBOARD_STATS_CACHE_TIMEOUT', 60)
+
+
+def cache_scope(user, view_as):
+    """Returns (scope, invalidation group): callers with the same scope get the same response."""
+    if user.role in [User.ADMIN, User.OBSERVER]:
+        return f"staff:{view_as if view_as in ['client', 'technician'] else 'all'}", ALL_GROUP
+    if user.role in [User.CLIENT, User.TECHNICIAN]:
+        return f"{user.role.lower()}:{user.pk}", f'user:{user.pk}'
+    return f'role:{user.role}', ALL_GROUP
+
+
+def _version_key(group):
+    return f'{CACHE_PREFIX}:version:{group}'
+
+
+def _version(group):
+    key = _version_key(group)
+    version = cache.get(key)
+    if version is None:
+        version = uuid.uuid4().hex
+        if not cache.add(key, version, timeout=None):
+            version = cache.get(key, version)
+    return version
+
+
+def _count(name):
+    if not cache_in_memory():
+        return
+    key = f'{CACHE_PREFIX}:{name}'
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, timeout=None)
+        cache.incr(key)
+
+
+def get_dashboard_stats(user, view_as, compute):
+    """
+    Returns (response data, whether it came from the cache). `compute` builds the
+    data on a miss. The version is read before computing, so a response computed
+    from data that changes meanwhile is stored under a token that is already gone.
+    """
+    timeout = cache_timeout()
+    if not timeout:
+        return compute(), False
+    scope, group = cache_scope(user, view_as)
+    key = f'{CACHE_PREFIX}:{scope}:{_version(group)}'
+    data = cache.get(key)
+    if data is not None:
+        _count('hits')
+        return data, True
+    _count('misses')
+    data = compute()
+    cache.set(key, data, timeout)
+    return data, False
+
+
+def invalidate_dashboard_stats(user_ids=()):
+    """Drops the cached responses of the staff scopes and of the given users' own dashboards."""
+    groups = [ALL_GROUP] + [f'user:{user_id}' for user_id in user_ids if user_id]
+    cache.delete_many([_version_key(group) for group in groups])
+
+
+def cache_counters():
+    values = cache.get_many([f'{CACHE_PREFIX}:{name}' for name in COUNTERS])
+    counters = {name: values.get(f'{CACHE_PREFIX}:{name}', 0) for name in COUNTERS}
+    lookups = counters['hits'] + counters['misses']
+    counters['hit_ratio'] = counters['hits'] / lookups if lookups else None
+    return counters
@@ -0,0 +1,140 @@
+# Path: E:\it-admin-tool\backend\tickets\export_jobs.py
+
+import gzip
+import os
+import uuid
+from datetime import timedelta
+from django.conf import settings
+from django.db import connection, transaction
+from django.http import HttpRequest, QueryDict
+from django.utils import timezone
+from rest_framework.request import Request
+from .models import ExportJob
+from .exports import ACTIVITY_LOG_EXPORT_COLUMNS, TICKET_EXPORT_COLUMNS, iter_keyset, render_export
+from .activity_logger import log_activity
+
+EXPORT_DIR = 'exports'
+
+EXPORT_COLUMNS = {
+    ExportJob.TICKETS: TICKET_EXPORT_COLUMNS,
+    ExportJob.ACTIVITY_LOG: ACTIVITY_LOG_EXPORT_COLUMNS,
+}
+
+EXPORT_LOG_ACTIONS = {
+    ExportJob.TICKETS: ('TICKET_EXPORT', 'tickets'),
+    ExportJob.ACTIVITY_LOG: ('ACTIVITY_LOG_EXPORT', 'activity log entries'),
+}
+
+
+def export_queryset(job):
+    """
+    Rebuilds the queryset the requester would have exported synchronously, by
+    replaying the stored query parameters through the list viewset's own
+    permission scoping, filters, search and ordering.
+    """
+    from .views import TicketViewSet, ActivityLogViewSet
+    view_class = TicketViewSet if job.kind == ExportJob.TICKETS else ActivityLogViewSet
+
+    http_request = HttpRequest()
+    http_request.method = 'GET'
+    http_request.GET = QueryDict(mutable=True)
+    for name, values in job.params.items():
+        http_request.GET.setlist(name, values if isinstance(values, list) else [values])
+    request = Request(http_request)
+    request.user = job.requested_by
+
+    view = view_class(request=request, args=(), kwargs={}, format_kwarg=None, action='list')
+    return view.filter_queryset(view.get_queryset())
+
+
+def requeue_stale_jobs():
+    """
+    Queues again the jobs that have been running for longer than EXPORT_JOB_TIMEOUT,
+    whose worker must have died before recording an outcome. Returns how many.
+    """
+    cutoff = timezone.now() - timedelta(seconds=getattr(settings, 'EXPORT_JOB_TIMEOUT', 3600))
+    return ExportJob.objects.filter(status=ExportJob.RUNNING, started_at__lt=cutoff).update(status=ExportJob.PENDING, started_at=None)
+
+
+def claim_next_job():
+    """
+    Marks the oldest pending job as running and returns it, or None if there is none.
+    Stale running jobs are queued again first.
+    """
+    requeue_stale_jobs()
+    with transaction.atomic():
+        jobs = ExportJob.objects.filter(status=ExportJob.PENDING).order_by('created_at')
+        if connection.features.has_select_for_update_skip_locked:
+            jobs = jobs.select_for_update(skip_locked=True)
+        job = jobs.first()
+        if job is None:
+            return None
+        job.status = ExportJob.RUNNING
+        job.started_at = timezone.now()
+        job.save(update_fields=['status', 'started_at'])
+    return job
+
+
+def run_export_job(job):
+    """Writes the job's export as a gzip file under MEDIA_ROOT and records the outcome."""
+    columns = EXPORT_COLUMNS[job.kind]
+    filename = f"{job.kind.lower()}_{job.pk}_{uuid.uuid4().hex}.{job.export_format}.gz"
+    relative_path = f"{EXPORT_DIR}/{filename}"
+    absolute_path = os.path.join(settings.MEDIA_ROOT, EXPORT_DIR, filename)
+    os.makedirs(os.path.dirname(absolute_path), exist_ok=True)
+
+    row_count = 0
+    def counted(rows):
+        nonlocal row_count
+        for row in rows:
+            row_count += 1
+            yield row
+
+    try:
+        rows = counted(iter_keyset(export_queryset(job), [key for _, key in columns]))
+        with gzip.open(absolute_path, 'wt', encoding='utf-8', newline='') as f:
+            for chunk in render_export(rows, columns, job.export_format):
+                f.write(chunk)
+    except Exception as e:
+        if os.path.exists(absolute_path):
+            os.remove(absolute_path)
+        job.status = ExportJob.FAILED
+        job.error = str(e)
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'error', 'finished_at'])
+        raise
+
+    job.file.name = relative_path
+    job.row_count = row_count
+    job.status = ExportJob.COMPLETED
+    job.finished_at = timezone.now()
+    job.save(update_fields=['file', 'row_count', 'status', 'finished_at'])
+
+    action, noun = EXPORT_LOG_ACTIONS[job.kind]
+    log_activity(user=job.requested_by, action=action, target=job.pk, details=f"Exported {row_count} {noun} (export job #{job.pk}).")
+    return job
+
+
+def delete_expired_exports():
+    """
+    Deletes the jobs that finished more than EXPORT_RETENTION_DAYS ago with their
+    files, and export files that old which no job refers to (left behind by a
+    worker that died while writing). Returns (jobs deleted, files deleted).
+    """
+    cutoff = timezone.now() - timedelta(days=getattr(settings, 'EXPORT_RETENTION_DAYS', 7))
+    expired = ExportJob.objects.filter(status__in=[ExportJob.COMPLETED, ExportJob.FAILED], finished_at__lt=cutoff)
+    files_deleted = 0
+    for job in expired.exclude(file='').exclude(file__isnull=True).iterator():
+        job.file.delete(save=False)
+        files_deleted += 1
+    jobs_deleted, _ = expired.delete()
+
+    export_dir = os.path.join(settings.MEDIA_ROOT, EXPORT_DIR)
+    if os.path.isdir(export_dir):
+        referenced = set(ExportJob.objects.exclude(file='').exclude(file__isnull=True).values_list('file', flat=True))
+        for entry in os.scandir(export_dir):
+            if (entry.is_file() and f"{EXPORT_DIR}/{entry.name}" not in referenced
+                    and entry.stat().st_mtime < cutoff.timestamp()):
+                os.remove(entry.path)
+                files_deleted += 1
+    return jobs_deleted, files_deleted
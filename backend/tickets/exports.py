@@ -0,0 +1,161 @@
+# Path: E:\it-admin-tool\backend\tickets\exports.py
+
+import csv
+import json
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+EXPORT_CHUNK_SIZE = 2000
+STREAM_BUFFER_SIZE = 64 * 1024
+
+# (CSV header, values() lookup) pairs. The lookups are also the NDJSON keys.
+TICKET_EXPORT_COLUMNS = [
+    ('Ticket ID', 'ticket_id'),
+    ('Node Name', 'card__node_name'),
+    ('Card Type', 'card__card_type'),
+    ('Other Card Type', 'other_card_type_description'),
+    ('Status', 'status'),
+    ('Priority', 'priority'),
+    ('Zone', 'card__zone'),
+    ('State', 'card__state'),
+    ('Serial Number', 'card__serial_number'),
+    ('Created By', 'created_by__username'),
+    ('Assigned To', 'assigned_to__username'),
+    ('Created At', 'created_at'),
+    ('Closed At', 'closed_at'),
+]
+
+ACTIVITY_LOG_EXPORT_COLUMNS = [
+    ('Timestamp', 'timestamp'),
+    ('User', 'user__username'),
+    ('Role', 'user_role'),
+    ('IP Address', 'ip_address'),
+    ('Action', 'action'),
+    ('Target', 'target_object_id'),
+    ('Details', 'details'),
+]
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+def iter_keyset(queryset, fields, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yields queryset.values(*fields) rows in the queryset's own order, one chunk per
+    query. Each chunk continues after the last row of the previous one (ordering
+    fields plus the primary key), so neither Python nor the database driver ever
+    holds more than `chunk_size` rows. Ordering fields must be non-null columns.
+    """
+    pk_name = queryset.model._meta.pk.attname
+    ordering = []
+    for field in queryset.query.order_by:
+        name = field.lstrip('-')
+        ordering.append(field[:len(field) - len(name)] + (pk_name if name == 'pk' else name))
+    if not any(field.lstrip('-') == pk_name for field in ordering):
+        ordering.append(f'-{pk_name}' if ordering and ordering[-1].startswith('-') else pk_name)
+    keys = [field.lstrip('-') for field in ordering]
+    queryset = queryset.order_by(*ordering).values(*dict.fromkeys(list(fields) + keys))
+
+    last = None
+    while True:
+        chunk = queryset
+        if last is not None:
+            chunk = chunk.filter(keyset_condition(ordering, last))
+        rows = list(chunk[:chunk_size])
+        yield from rows
+        if len(rows) < chunk_size:
+            return
+        last = rows[-1]
+
+
+def keyset_condition(ordering, row):
+    """The keyset condition selecting rows that sort after `row`."""
+    condition = Q()
+    equal = Q()
+    for field in ordering:
+        name = field.lstrip('-')
+        lookup = 'lt' if field.startswith('-') else 'gt'
+        condition |= equal & Q(**{f'{name}__{lookup}': row[name]})
+        equal &= Q(**{name: row[name]})
+    return condition
+
+
+class Echo:
+    """A file-like object whose write() returns the value, for streaming csv.writer output."""
+    def write(self, value):
+        return value
+
+
+def _buffered(chunks, size=STREAM_BUFFER_SIZE):
+    """
+    Joins small string chunks so the server writes roughly `size` bytes at a time.
+    The first chunk (the CSV header) is sent on its own so the download starts at once.
+    """
+    chunks = iter(chunks)
+    for chunk in chunks:
+        yield chunk
+        break
+    buffer = []
+    length = 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        length += len(chunk)
+        if length >= size:
+            yield ''.join(buffer)
+            buffer = []
+            length = 0
+    if buffer:
+        yield ''.join(buffer)
+
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+def iter_csv(rows, columns):
+    writer = csv.writer(Echo())
+    yield writer.writerow([header for header, _ in columns])
+    for row in rows:
+        yield writer.writerow([_csv_value(row[key]) for _, key in columns])
+
+
+def iter_ndjson(rows, columns):
+    keys = [key for _, key in columns]
+    for row in rows:
+        yield json.dumps({key: row[key] for key in keys}, cls=DjangoJSONEncoder) + '\n'
+
+
+def render_export(rows, columns, export_format):
+    """Returns the chunks of an export in the given format ('csv' or 'ndjson')."""
+    if export_format == 'ndjson':
+        return _buffered(iter_ndjson(rows, columns))
+    return _buffered(iter_csv(rows, columns))
+
+
+def _counted(rows, on_finish):
+    """Passes rows through and calls on_finish(count) once the stream ends or is aborted."""
+    count = 0
+    try:
+        for row in rows:
+            count += 1
+            yield row
+    finally:
+        on_finish(count)
+
+
+def streaming_export_response(queryset, columns, export_format, filename_prefix, on_finish=None):
+    rows = iter_keyset(queryset, [key for _, key in columns])
+    if on_finish:
+        rows = _counted(rows, on_finish)
+    response = StreamingHttpResponse(render_export(rows, columns, export_format), content_type=EXPORT_FORMATS[export_format])
+    filename = f"{filename_prefix}_{timezone.now():%Y-%m-%d_%H-%M}.{export_format}"
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
@@ -0,0 +1,79 @@
+# Path: E:\it-admin-tool\backend\tickets\fieldsets.py
+
+from rest_framework import serializers
+
+# Sparse fieldsets for the ticket endpoints.
+#   ?fields=id,ticket_id,status,card     only these keys, in the representation's own order
+#   ?fields=card.serial_number           a related object narrowed to these keys (its id is always kept)
+#   ?expand=created_by,card              related objects rendered in full; the others come back as ids
+# Without either parameter the representation is unchanged, with every related object in full.
+# On the list, ?compact=true additionally sends each expanded object once, in an
+# `included` table keyed by id, and leaves only its id in the rows.
+
+FIELDS_PARAM = 'fields'
+EXPAND_PARAM = 'expand'
+COMPACT_PARAM = 'compact'
+
+
+def _names(value):
+    return [name.strip() for name in value.split(',') if name.strip()] if value else []
+
+
+class Fieldset:
+    """
+    The parsed fields/expand/compact parameters for one representation.
+    `fields` holds the top-level keys to render, `nested` the keys of every related
+    object to render as an object ({relation: keys}); a relation in `fields` but not
+    in `nested` is rendered as its id.
+    """
+
+    def __init__(self, fields, nested, compact=False, sparse=False):
+        self.fields = fields
+        self.nested = nested
+        self.compact = compact
+        self.sparse = sparse
+
+    def __repr__(self):
+        return f'Fieldset(fields={self.fields!r}, nested={self.nested!r}, compact={self.compact!r})'
+
+
+def parse_fieldset(query_params, available, relations, allow_compact=False):
+    """
+    Reads a Fieldset from the request's query parameters. `available` lists the
+    representation's keys in order and `relations` maps each related-object key
+    to the keys of its own representation. Unknown names raise a ValidationError.
+    """
+    requested, expand = _names(query_params.get(FIELDS_PARAM)), _names(query_params.get(EXPAND_PARAM))
+    compact = allow_compact and query_params.get(COMPACT_PARAM) in ['1', 'true']
+    if not requested and not expand:
+        return Fieldset(list(available), {name: list(keys) for name, keys in relations.items() if name in available}, compact)
+
+    errors = []
+    selected, subfields = set(), {}
+    for name in requested:
+        head, _, tail = name.partition('.')
+        if head not in available:
+            errors.append(f"Unknown field '{head}'.")
+        elif tail and tail not in relations.get(head, []):
+            errors.append(f"Unknown field '{name}'.")
+        else:
+            selected.add(head)
+            if tail:
+                subfields.setdefault(head, set()).add(tail)
+    for name in expand:
+        if name not in relations:
+            errors.append(f"'{name}' cannot be expanded.")
+    if errors:
+        raise serializers.ValidationError({FIELDS_PARAM: errors})
+
+    expand = set(expand)
+    selected = (selected | expand) if requested else set(available)
+    nested = {}
+    for name, keys in relations.items():
+        if name not in selected:
+            continue
+        if name in subfields:
+            nested[name] = [key for key in keys if key == 'id' or key in subfields[name]]
+        elif name in expand:
+            nested[name] = list(keys)
+    return Fieldset([name for name in available if name in selected], nested, compact, sparse=True)
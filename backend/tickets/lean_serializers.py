@@ -0,0 +1,170 @@
+# Path: E:\it-admin-tool\backend\tickets\lean_serializers.py
+
+from operator import itemgetter
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+from .fieldsets import parse_fieldset
+from .models import Card
+
+# A read-only fast path for TicketListSerializer. Rows come from one values() query
+# and are turned into the same dicts, key for key, by functions built once per
+# fieldset, so no serializer or field objects are created per row. Datetimes are
+# formatted as DRF's DateTimeField would, with its settings resolved once per list.
+
+USER_FIELDS = ['id', 'username', 'email', 'first_name', 'last_name', 'full_name', 'phone_number', 'role', 'is_active', 'must_change_password', 'zone']
+CARD_FIELDS = [field.name for field in Card._meta.concrete_fields]
+
+_datetime_field = serializers.DateTimeField()
+
+
+def datetime_formatter():
+    """
+    Returns DateTimeField.to_representation with the output format and current
+    timezone looked up once, for formatting many values in a row.
+    """
+    output_format = getattr(_datetime_field, 'format', api_settings.DATETIME_FORMAT)
+    field_timezone = _datetime_field.default_timezone()
+    if output_format is None or output_format.lower() != ISO_8601 or field_timezone is None:
+        return _datetime_field.to_representation
+    def to_representation(value):
+        if not value:
+            return None
+        if timezone.is_naive(value):
+            return _datetime_field.to_representation(value)
+        value = value.astimezone(field_timezone).isoformat()
+        return value[:-6] + 'Z' if value.endswith('+00:00') else value
+    return to_representation
+
+
+def _getter(keys):
+    """itemgetter that always returns a tuple, even for a single key."""
+    if len(keys) == 1:
+        key = keys[0]
+        return lambda row: (row[key],)
+    return itemgetter(*keys)
+
+
+def _user_builder(prefix, fields=USER_FIELDS):
+    """Returns a function building a UserSerializer dict (narrowed to `fields`) from a values() row, and its lookups."""
+    stored = [field for field in fields if field != 'full_name']
+    lookups = [f'{prefix}__{field}' for field in stored]
+    get = _getter(lookups)
+    id_key = f'{prefix}__id'
+    if 'full_name' not in fields:
+        def build(row):
+            if row[id_key] is None:
+                return None
+            return dict(zip(fields, get(row)))
+        return build, lookups
+
+    full_name_at = fields.index('full_name')
+    first_name_key, last_name_key = f'{prefix}__first_name', f'{prefix}__last_name'
+    def build(row):
+        if row[id_key] is None:
+            return None
+        values = list(get(row))
+        # AbstractUser.get_full_name().
+        values.insert(full_name_at, f'{row[first_name_key]} {row[last_name_key]}'.strip())
+        return dict(zip(fields, values))
+    return build, list(dict.fromkeys(lookups + [first_name_key, last_name_key]))
+
+
+def _card_builder(prefix, fields=CARD_FIELDS):
+    lookups = [f'{prefix}__{field}' for field in fields]
+    get = _getter(lookups)
+    id_key = f'{prefix}__id'
+    def build(row):
+        if row[id_key] is None:
+            return None
+        card = dict(zip(fields, get(row)))
+        if card.get('primary_ip') is not None:
+            card['primary_ip'] = str(card['primary_ip'])
+        return card
+    return build, lookups
+
+
+TICKET_LIST_FIELDS = ['id', 'ticket_id', 'created_by', 'assigned_to', 'card', 'status', 'priority', 'created_at', 'closed_at']
+TICKET_LIST_RELATIONS = {'created_by': USER_FIELDS, 'assigned_to': USER_FIELDS, 'card': CARD_FIELDS}
+# The related objects' builders, and the `included` table compact responses collect them in.
+RELATION_BUILDERS = {'created_by': (_user_builder, 'users'), 'assigned_to': (_user_builder, 'users'), 'card': (_card_builder, 'cards')}
+DATETIME_FIELDS = ['created_at', 'closed_at']
+# Always selected: the keyset pagination cursor is built from these.
+CURSOR_LOOKUPS = ['id', 'created_at']
+
+
+class TicketListFormat:
+    """
+    The TicketListSerializer representation narrowed to a Fieldset, built from
+    values() rows. Everything that depends only on the fieldset (lookups, getters,
+    builders) is worked out once here rather than per row.
+    """
+
+    def __init__(self, fieldset):
+        self.fieldset = fieldset
+        self.compact = fieldset.compact
+        nested = dict(fieldset.nested)
+        if self.compact:
+            # Users are sent once whichever side of the ticket they are on, so both sides share one set of keys.
+            user_fields = [field for field in USER_FIELDS if any(field in nested.get(name, []) for name in ['created_by', 'assigned_to'])]
+            nested.update({name: user_fields for name in ['created_by', 'assigned_to'] if name in nested})
+
+        lookups = list(CURSOR_LOOKUPS)
+        self.objects = {}
+        for name in fieldset.fields:
+            if name in nested:
+                make_builder, table = RELATION_BUILDERS[name]
+                build, relation_lookups = make_builder(name, nested[name])
+                self.objects[name] = (build, f'{name}__id', table)
+                lookups += [f'{name}__id'] + relation_lookups
+            else:
+                lookups.append(name)
+        self.lookups = list(dict.fromkeys(lookups))
+
+    def rows(self, queryset):
+        """Projects a Ticket queryset onto the columns this format needs."""
+        return queryset.values(*self.lookups)
+
+    def column(self, name, format_datetime, included):
+        """Returns the function reading one key of the representation from a row."""
+        if name in self.objects:
+            build, id_key, table = self.objects[name]
+            if included is None:
+                return build
+            objects = included[table]
+            def side_load(row):
+                key = row[id_key]
+                if key is not None and key not in objects:
+                    objects[key] = build(row)
+                return key
+            return side_load
+        if name in DATETIME_FIELDS:
+            return lambda row: format_datetime(row[name])
+        return itemgetter(name)
+
+    def serialize(self, rows):
+        """Returns (list of ticket dicts, the `included` tables or None when not compact)."""
+        included = {table: {} for _, _, table in self.objects.values()} if self.compact else None
+        format_datetime = datetime_formatter()
+        columns = [(name, self.column(name, format_datetime, included)) for name in self.fieldset.fields]
+        return [{name: get(row) for name, get in columns} for row in rows], included
+
+
+def ticket_list_format(fieldset):
+    return DEFAULT_FORMAT if not fieldset.sparse and not fieldset.compact else TicketListFormat(fieldset)
+
+
+def ticket_list_fieldset(query_params):
+    return parse_fieldset(query_params, TICKET_LIST_FIELDS, TICKET_LIST_RELATIONS, allow_compact=True)
+
+
+DEFAULT_FORMAT = TicketListFormat(ticket_list_fieldset({}))
+
+
+def ticket_list_rows(queryset):
+    """Projects a Ticket queryset onto the columns the full list representation needs."""
+    return DEFAULT_FORMAT.rows(queryset)
+
+
+def serialize_ticket_list(rows):
+    return DEFAULT_FORMAT.serialize(rows)[0]
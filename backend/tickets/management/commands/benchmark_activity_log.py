@@ -0,0 +1,108 @@
+# E:\it-admin-tool\backend\tickets\management\commands\benchmark_activity_log.py
+
+import statistics
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.core.signals import request_finished
+from django.db import connection
+from django.test.utils import override_settings
+from rest_framework.test import APIClient
+from accounts.models import User
+from tickets import activity_logger
+from tickets.models import ActivityLog, Card, Ticket
+from tickets.signals import flush_activity_log_after_request
+
+MODES = ['sync', 'request', 'buffered']
+# The run must not read or fill the cache the site uses: user ids in the run's database are not the site's.
+RUN_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'benchmark-activity-log'}}
+
+class Command(BaseCommand):
+    help = (
+        'Times write requests that log activity (adding a comment, changing a status) under '
+        'each ACTIVITY_LOG_MODE, in a test database that is dropped afterwards. Reports the '
+        'latency up to the response, the work done after it (where request mode writes its '
+        'entries), and how many INSERTs wrote the log.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=300, help='Write requests per mode.')
+        parser.add_argument('--modes', default=','.join(MODES), help='Comma-separated modes to measure.')
+        parser.add_argument('--buffer-size', type=int, default=100, help='ACTIVITY_LOG_BUFFER_SIZE for buffered mode.')
+
+    def handle(self, *args, **options):
+        modes = [mode.strip() for mode in options['modes'].split(',') if mode.strip()]
+        unknown = set(modes) - set(MODES)
+        if unknown:
+            raise CommandError(f"Unknown mode(s): {', '.join(sorted(unknown))}. Choose from {', '.join(MODES)}.")
+        if options['requests'] < 1 or options['buffer_size'] < 1:
+            raise CommandError('--requests and --buffer-size must be positive.')
+
+        # Like check_query_budgets, the run writes to a database of its own.
+        database = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        # The flush that runs when a response is closed is timed separately, as it
+        # runs after the client has its response.
+        request_finished.disconnect(flush_activity_log_after_request)
+        try:
+            with override_settings(ALLOWED_HOSTS=['testserver'], CACHES=RUN_CACHES):
+                card, users = self.create_fixtures()
+                for mode in modes:
+                    with override_settings(ACTIVITY_LOG_MODE=mode, ACTIVITY_LOG_BUFFER_SIZE=options['buffer_size'], ACTIVITY_LOG_FLUSH_INTERVAL=5):
+                        self.run_mode(mode, card, users, options['requests'])
+        finally:
+            request_finished.connect(flush_activity_log_after_request)
+            activity_logger.flush_activity_log()
+            connection.creation.destroy_test_db(database, verbosity=0)
+        self.stdout.write(self.style.SUCCESS('Benchmark complete.'))
+
+    def create_fixtures(self):
+        def make_user(name, role):
+            return User.objects.create_user(f'bench_{name}', f'bench_{name}@example.com', 'Bench-Pass-42', role=role,
+                                            first_name='Bench', last_name=name.title(), phone_number='5550100')
+        users = {'admin': make_user('admin', User.ADMIN), 'client': make_user('client', User.CLIENT)}
+        card = Card.objects.create(zone='ZONE', state='STATE', node_type='TYPE', location='LOCATION', card_type='CARD', slot='1',
+                                   node_name='NODE', primary_ip='10.0.0.1', aid='AID', unit_part_number='UPN', clei='CLEI', serial_number='BENCH000001')
+        return card, users
+
+    def run_mode(self, mode, card, users, count):
+        # A ticket per mode, so that no mode pays for the comments the others added.
+        ticket = Ticket.objects.create(card=card, created_by=users['client'], fault_description=f'Activity log benchmark ({mode})')
+        clients = {}
+        for name, user in users.items():
+            clients[name] = APIClient()
+            clients[name].force_authenticate(user)
+        inserts = []
+        def count_inserts(execute, sql, params, many, execute_context):
+            if sql.startswith('INSERT') and ActivityLog._meta.db_table in sql:
+                inserts.append(sql)
+            return execute(sql, params, many, execute_context)
+
+        before = ActivityLog.objects.count()
+        latencies, after_response = [], []
+        with connection.execute_wrapper(count_inserts):
+            for i in range(count):
+                started = time.perf_counter()
+                if i % 2:
+                    status = 'IN_PROGRESS' if i % 4 == 1 else 'OPEN'
+                    response = clients['admin'].patch(f'/api/tickets/{ticket.pk}/', {'status': status}, format='json')
+                else:
+                    response = clients['client'].post(f'/api/tickets/{ticket.pk}/comments/', {'text': f'Benchmark comment {i}'}, format='json')
+                responded = time.perf_counter()
+                activity_logger.flush_if_due()
+                after_response.append(time.perf_counter() - responded)
+                latencies.append(responded - started)
+                if response.status_code >= 400:
+                    raise CommandError(f'{mode}: request {i} failed with status {response.status_code}: {response.data}')
+            pending = len(activity_logger._buffer)
+            activity_logger.flush_activity_log()
+        written = ActivityLog.objects.count() - before
+
+        latencies = sorted(duration * 1000 for duration in latencies)
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        self.stdout.write(
+            f'{mode:<9} median {statistics.median(latencies):.2f} ms, p95 {p95:.2f} ms to the response; '
+            f'{sum(after_response) * 1000 / count:.2f} ms after it per request; '
+            f'{written} entries in {len(inserts)} INSERTs ({pending} still buffered at the end).'
+        )
+        if written != count:
+            raise CommandError(f'{mode}: {count} requests wrote {written} log entries.')
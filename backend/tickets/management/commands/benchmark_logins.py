@@ -0,0 +1,106 @@
+# E:\it-admin-tool\backend\tickets\management\commands\benchmark_logins.py
+
+import random
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.test import APIClient
+from accounts.models import User
+from tickets.management.commands.check_query_budgets import run_caches
+
+LOGIN_URL = '/api/auth/token/'
+PASSWORD = 'Shift-Change-Pass-42'
+
+class Command(BaseCommand):
+    help = (
+        'Simulates a shift-change login storm: creates users, logs them in through the '
+        'token endpoint from several threads at once, and reports logins per second, '
+        'latency percentiles and queries per login. It runs in a test database that is '
+        'dropped afterwards, so no benchmark account ever exists in the configured database. '
+        'Password hashing holds the interpreter lock, '
+        'so threads show the cost of one login rather than what several server processes '
+        'can sustain together.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=200, help='Users to create; each logs in at least once.')
+        parser.add_argument('--logins', type=int, default=400, help='Logins in total.')
+        parser.add_argument('--workers', type=int, default=8, help='Concurrent logins. SQLite serialises the writes, so use a server database for realistic figures.')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed for the login order.')
+
+    def handle(self, *args, **options):
+        if options['users'] < 1 or options['logins'] < 1 or options['workers'] < 1:
+            raise CommandError('--users, --logins and --workers must be positive.')
+        rng = random.Random(options['seed'])
+        # Like check_query_budgets, the run gets a database of its own.
+        database = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            with override_settings(ALLOWED_HOSTS=['testserver'], CACHES=run_caches()):
+                order = self.create_users(options, rng)
+                self.report_queries(order[0])
+                self.storm(order, options['workers'])
+        finally:
+            connection.creation.destroy_test_db(database, verbosity=0)
+
+    def create_users(self, options, rng):
+        prefix = f'Bench.Login.{rng.randrange(10**8):08d}'
+        # One hash for every user: creating them must not take as long as the storm.
+        password = make_password(PASSWORD)
+        User.objects.bulk_create([
+            User(username=f'{prefix}.{i}', email=f'{prefix}.{i}@example.com'.lower(), password=password,
+                 first_name='Bench', last_name=str(i), role=User.TECHNICIAN)
+            for i in range(options['users'])
+        ], batch_size=500)
+        users = User.objects.filter(username__startswith=prefix)
+        # Usernames are typed in any case; logging in lower-case goes through the case-insensitive lookup.
+        usernames = [username.lower() for username in users.values_list('username', flat=True)]
+        order = (usernames * (options['logins'] // len(usernames) + 1))[:options['logins']]
+        rng.shuffle(order)
+        return order
+
+    def report_queries(self, username):
+        with CaptureQueriesContext(connection) as queries:
+            response = APIClient().post(LOGIN_URL, {'username': username, 'password': PASSWORD}, format='json')
+        if response.status_code != 200:
+            raise CommandError(f'Login failed with status {response.status_code}: {response.data}')
+        self.stdout.write(f'One login issues {len(queries)} queries:')
+        for query in queries.captured_queries:
+            self.stdout.write(f"    {query['sql'][:120]}")
+
+    def storm(self, order, workers):
+        local = threading.local()
+        thread_connections = []
+        def login(username):
+            # One client per thread; each thread has its own database connection.
+            if not hasattr(local, 'client'):
+                local.client = APIClient()
+                thread_connections.append(connections['default'])
+            started = time.perf_counter()
+            response = local.client.post(LOGIN_URL, {'username': username, 'password': PASSWORD}, format='json')
+            return time.perf_counter() - started, response.status_code
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(login, order))
+        elapsed = time.perf_counter() - started
+        # The test database cannot be dropped while the threads' connections are open.
+        for thread_connection in thread_connections:
+            thread_connection.inc_thread_sharing()
+            thread_connection.close()
+            thread_connection.dec_thread_sharing()
+
+        latencies = sorted(duration * 1000 for duration, status in results if status == 200)
+        failures = len(results) - len(latencies)
+        self.stdout.write(f'{len(results)} logins from {workers} workers in {elapsed:.1f} s: {len(results) / elapsed:.1f} logins/sec.')
+        if latencies:
+            p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+            self.stdout.write(f'Latency: median {statistics.median(latencies):.0f} ms, p95 {p95:.0f} ms, max {latencies[-1]:.0f} ms.')
+        if failures:
+            raise CommandError(f'{failures} logins failed.')
+        self.stdout.write(self.style.SUCCESS('Benchmark complete.'))
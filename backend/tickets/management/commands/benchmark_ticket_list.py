@@ -0,0 +1,60 @@
+# E:\it-admin-tool\backend\tickets\management\commands\benchmark_ticket_list.py
+
+import time
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+from tickets.models import Ticket
+from tickets.serializers import TicketListSerializer
+from tickets.lean_serializers import ticket_list_rows, serialize_ticket_list, ticket_list_fieldset, ticket_list_format
+
+class Command(BaseCommand):
+    help = (
+        'Checks that the values()-based ticket list path renders byte-identical JSON to '
+        'TicketListSerializer, and compares the rows per second of both. With --fields, '
+        '--expand or --compact it also measures that narrowed list format.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000, help='How many of the newest tickets to serialize.')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per path; the best is reported.')
+        parser.add_argument('--fields', default='', help='A ?fields= value to measure as well.')
+        parser.add_argument('--expand', default='', help='A ?expand= value to measure as well.')
+        parser.add_argument('--compact', action='store_true', help='Measure the compact, side-loaded format as well.')
+
+    def handle(self, *args, **options):
+        queryset = Ticket.objects.select_related('created_by', 'assigned_to', 'card').order_by('-created_at', '-id')[:options['rows']]
+        renderer = JSONRenderer()
+
+        def serializer_path():
+            return renderer.render(TicketListSerializer(queryset, many=True).data)
+
+        def lean_path():
+            return renderer.render(serialize_ticket_list(ticket_list_rows(queryset)))
+
+        expected, actual = serializer_path(), lean_path()
+        if expected != actual:
+            raise CommandError(f'The lean path renders different JSON ({len(actual)} bytes, expected {len(expected)}).')
+        row_count = queryset.count()
+        self.stdout.write(f'Both paths render identical JSON for {row_count} tickets ({len(expected)} bytes).')
+        if not row_count:
+            return
+
+        paths = [('TicketListSerializer', serializer_path), ('values() path', lean_path)]
+        if options['fields'] or options['expand'] or options['compact']:
+            params = {'fields': options['fields'], 'expand': options['expand'], 'compact': 'true' if options['compact'] else ''}
+            list_format = ticket_list_format(ticket_list_fieldset(params))
+            def sparse_path():
+                results, included = list_format.serialize(list_format.rows(queryset))
+                return renderer.render(results if included is None else {'results': results, 'included': included})
+            self.stdout.write(f'Narrowed format: {len(sparse_path())} bytes ({params}).')
+            paths.append(('narrowed format', sparse_path))
+
+        for label, path in paths:
+            best = min(self.timed(path) for _ in range(max(1, options['repeat'])))
+            self.stdout.write(f'{label}: {best * 1000:.1f} ms, {row_count / best:,.0f} rows/sec (query included).')
+        self.stdout.write(self.style.SUCCESS('Benchmark complete.'))
+
+    def timed(self, path):
+        started = time.perf_counter()
+        path()
+        return time.perf_counter() - started
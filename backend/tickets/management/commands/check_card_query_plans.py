@@ -0,0 +1,99 @@
+# E:\it-admin-tool\backend\tickets\management\commands\check_card_query_plans.py
+
+import re
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from rest_framework.test import APIRequestFactory, force_authenticate
+from accounts.models import User
+from tickets.models import Card
+from tickets.card_hierarchy import HIERARCHY_LEVELS, CardHierarchy
+from tickets.views import CardAutofillView, FilteredCardDataView
+
+FILTERED_CARD_FIELDS = ['node_name', 'primary_ip', 'aid', 'unit_part_number', 'clei']
+
+class Command(BaseCommand):
+    help = 'Runs EXPLAIN on the queries behind the card hierarchy, autofill and card-data endpoints and fails if any of them does a full table scan.'
+
+    def handle(self, *args, **options):
+        sample = Card.objects.order_by('pk').values(*HIERARCHY_LEVELS).first()
+        if sample is None:
+            raise CommandError('The Card table is empty; seed it before checking query plans.')
+
+        failures = []
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                # The planner prefers sequential scans on small tables; this makes
+                # it fall back to one only when no usable index exists.
+                cursor.execute('SET enable_seqscan = off')
+            try:
+                for label, sql, params in self.get_queries(sample):
+                    plan = self.explain(sql, params)
+                    if options['verbosity'] > 1:
+                        self.stdout.write(f'--- {label} ---\n{plan}')
+                    if self.is_full_scan(plan):
+                        failures.append(label)
+                        self.stdout.write(self.style.ERROR(f'FULL SCAN: {label}'))
+                    else:
+                        self.stdout.write(self.style.SUCCESS(f'OK: {label}'))
+            finally:
+                if connection.vendor == 'postgresql':
+                    cursor.execute('RESET enable_seqscan')
+
+        if failures:
+            raise CommandError(f'{len(failures)} card queries fall back to a full table scan: {", ".join(failures)}')
+        self.stdout.write(self.style.SUCCESS('All card queries use an index.'))
+
+    def get_queries(self, sample):
+        """
+        Runs the code behind the card hierarchy, autofill and card-data endpoints
+        with real values, and returns (label, sql, params) for each Card query it issues.
+        The hierarchy build reads every card; it passes when it reads them from the
+        cascade index, in index order, rather than from the table.
+        """
+        user = User(role=User.ADMIN)
+        factory = APIRequestFactory()
+        def call_view(view, params, **kwargs):
+            request = factory.get('/', params)
+            force_authenticate(request, user=user)
+            view.as_view()(request, **kwargs).render()
+
+        runs = [
+            ('card hierarchy build', lambda: CardHierarchy.build(version='query-plans')),
+            ('card autofill', lambda: call_view(CardAutofillView, sample)),
+        ]
+        location_filters = {key: sample[key] for key in HIERARCHY_LEVELS[:4]}
+        for field_name in FILTERED_CARD_FIELDS:
+            runs.append((f'{field_name} card data', lambda field_name=field_name: call_view(FilteredCardDataView, location_filters, field_name=field_name)))
+
+        queries = []
+        for label, run in runs:
+            captured = []
+            def capture(execute, sql, params, many, context):
+                captured.append((sql, params))
+                return execute(sql, params, many, context)
+            with connection.execute_wrapper(capture):
+                run()
+            card_queries = [(sql, params) for sql, params in captured if Card._meta.db_table in sql]
+            for number, (sql, params) in enumerate(card_queries, start=1):
+                queries.append((label if len(card_queries) == 1 else f'{label} ({number})', sql, params))
+        return queries
+
+    def explain(self, sql, params):
+        prefix = connection.ops.explain_query_prefix(format='JSON' if connection.vendor == 'mysql' else None)
+        with connection.cursor() as cursor:
+            cursor.execute(f'{prefix} {sql}', params)
+            rows = cursor.fetchall()
+        if connection.vendor == 'sqlite':
+            # EXPLAIN QUERY PLAN rows are (id, parent, unused, detail).
+            return '\n'.join(str(row[-1]) for row in rows)
+        return '\n'.join(' '.join(str(value) for value in row) for row in rows)
+
+    def is_full_scan(self, plan):
+        table = Card._meta.db_table
+        if connection.vendor == 'postgresql':
+            return f'Seq Scan on {table}' in plan
+        if connection.vendor == 'mysql':
+            return re.search(r'"access_type":\s*"ALL"', plan) is not None
+        if connection.vendor == 'sqlite':
+            return re.search(rf'SCAN {table}(?! USING (COVERING )?INDEX)', plan) is not None
+        return False
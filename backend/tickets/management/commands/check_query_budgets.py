@@ -0,0 +1,248 @@
+# E:\it-admin-tool\backend\tickets\management\commands\check_query_budgets.py
+
+import logging
+import random
+import re
+import statistics
+import time
+from collections import Counter
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from accounts.models import User, Contact
+from tickets.models import ActivityLog, Card, Comment, ExportJob, Ticket
+from tickets.caching import cache_in_memory
+from tickets.query_budgets import BUDGETS
+
+STATUSES = [status for status, _ in Ticket.STATUS_CHOICES]
+PRIORITIES = [priority for priority, _ in Ticket.PRIORITY_CHOICES]
+BUDGET_PASSWORD = 'Budget-Check-Pass-42'
+BATCH_SIZE = 1000
+
+class Command(BaseCommand):
+    help = (
+        'Creates a test database, generates realistic data in it, calls every API endpoint '
+        'against it, and fails when one issues more queries or takes longer than its budget '
+        'in tickets/query_budgets.py. The test database is dropped afterwards; the configured '
+        'database is never written to. Requests use the configured cache backend, under a key '
+        'prefix of their own.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cards', type=int, default=2000, help='Cards to generate.')
+        parser.add_argument('--tickets', type=int, default=3000, help='Tickets to generate.')
+        parser.add_argument('--comments', type=int, default=3000, help='Comments to generate; a quarter go on the ticket the detail endpoints use.')
+        parser.add_argument('--logs', type=int, default=10000, help='Activity log entries to generate.')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed for the generated data.')
+        parser.add_argument('--repeat', type=int, default=3, help='Measured requests per endpoint; the median time is checked.')
+        parser.add_argument('--time-scale', type=float, default=1.0, help='Multiplies every wall-clock budget, for slower machines.')
+        parser.add_argument('--no-time', action='store_true', help='Check query budgets only.')
+        parser.add_argument('--only', default='', help='Check only the endpoints whose name contains this text.')
+        parser.add_argument('--show-queries', action='store_true', help='List the queries of every endpoint, not just the ones over budget.')
+
+    def handle(self, *args, **options):
+        budgets = [budget for budget in BUDGETS if options['only'].lower() in budget.name.lower()]
+        if not budgets:
+            raise CommandError(f"No endpoint name contains '{options['only']}'.")
+        if not cache_in_memory():
+            raise CommandError(
+                f"The default cache ({settings.CACHES['default']['BACKEND']}) is not held in memory, so every "
+                'cache read is a query the budgets do not allow for. Configure Redis, memcached or LocMemCache.'
+            )
+        failures = []
+        # The 4xx responses some budgets expect would otherwise be logged as warnings.
+        request_logger = logging.getLogger('django.request')
+        level = request_logger.level
+        request_logger.setLevel(logging.ERROR)
+        # The write endpoints change tickets, users and the ticket number sequence, so
+        # the run gets a database of its own (test_<name>, as the test runner uses)
+        # rather than a rolled-back transaction on the live one. Requests go through the
+        # configured cache backend, so its cost is measured, but under a key prefix of
+        # their own: user ids in the run's database are not the site's.
+        database = connection.settings_dict['NAME']
+        started = time.perf_counter()
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        self.stdout.write(f"Created test database {connection.settings_dict['NAME']} in {time.perf_counter() - started:.1f} s.")
+        try:
+            with override_settings(ALLOWED_HOSTS=['testserver'], CACHES=run_caches()):
+                started = time.perf_counter()
+                context = self.create_fixtures(options, random.Random(options['seed']))
+                self.stdout.write(f'Generated fixtures in {time.perf_counter() - started:.1f} s.')
+                for budget in budgets:
+                    failures += self.check_budget(budget, context, options)
+        finally:
+            request_logger.setLevel(level)
+            connection.creation.destroy_test_db(database, verbosity=0)
+        if failures:
+            raise CommandError(f"{len(failures)} budget(s) exceeded:\n  " + '\n  '.join(failures))
+        self.stdout.write(self.style.SUCCESS(f'All {len(budgets)} endpoints are within their budgets.'))
+
+    def check_budget(self, budget, context, options):
+        with override_settings(**budget.settings):
+            return self.measure(budget, context, options)
+
+    def measure(self, budget, context, options):
+        # Errors come back as 500 responses and fail the status check, instead of stopping the run.
+        client = APIClient(raise_request_exception=False)
+        if budget.user:
+            client.credentials(HTTP_AUTHORIZATION=f"Bearer {context['tokens'][budget.user]}")
+
+        # One unmeasured request first, so that per-process caches are warm.
+        self.request(client, budget, context)
+        timings, queries, response = [], [], None
+        for _ in range(max(1, options['repeat'])):
+            path, data = budget.resolve(context)
+            data = format_data(data, context)
+            captured = []
+            def capture(execute, sql, params, many, execute_context):
+                captured.append(sql)
+                return execute(sql, params, many, execute_context)
+            with connection.execute_wrapper(capture):
+                started = time.perf_counter()
+                response = self.send(client, budget.method, path, data)
+                timings.append((time.perf_counter() - started) * 1000)
+            queries = captured
+
+        failures = []
+        elapsed = statistics.median(timings)
+        ms_budget = budget.ms * options['time_scale']
+        status_ok = response.status_code == budget.status if budget.status else response.status_code < 400
+        if not status_ok:
+            failures.append(f'{budget.name}: status {response.status_code}')
+        if len(queries) > budget.queries:
+            failures.append(f'{budget.name}: {len(queries)} queries (budget {budget.queries})')
+        if not options['no_time'] and elapsed > ms_budget:
+            failures.append(f'{budget.name}: {elapsed:.0f} ms (budget {ms_budget:.0f} ms)')
+
+        line = f'{budget.name:<34} {response.status_code}  {len(queries):>3}/{budget.queries:<3} queries  {elapsed:>7.1f}/{ms_budget:.0f} ms'
+        self.stdout.write(self.style.ERROR(f'{line}  OVER') if failures else f'{line}  ok')
+        if failures or options['show_queries']:
+            self.report_queries(queries)
+        return failures
+
+    def request(self, client, budget, context):
+        path, data = budget.resolve(context)
+        return self.send(client, budget.method, path, format_data(data, context))
+
+    def send(self, client, method, path, data):
+        response = getattr(client, method)(path, data, format='json') if data is not None else getattr(client, method)(path)
+        if response.streaming:
+            # Streaming responses run their queries while the body is read.
+            b''.join(response.streaming_content)
+        return response
+
+    def report_queries(self, queries):
+        """Lists each distinct statement once, with how often it ran; repeats are where N+1s show."""
+        shapes = Counter(normalise_sql(sql) for sql in queries)
+        for shape, count in shapes.most_common():
+            self.stdout.write(f'    {count:>4} x {shape[:160]}')
+
+    def create_fixtures(self, options, rng):
+        suffix = f'{rng.randrange(10**8):08d}'
+        now = timezone.now()
+
+        def make_user(name, role, **extra):
+            return User.objects.create_user(
+                f'budget_{name}_{suffix}', f'budget_{name}_{suffix}@example.com', BUDGET_PASSWORD,
+                role=role, first_name='Budget', last_name=name.title(), phone_number='5550100', **extra,
+            )
+        users = {
+            'admin': make_user('admin', User.ADMIN, is_staff=True),
+            'observer': make_user('observer', User.OBSERVER),
+            'tech': make_user('tech', User.TECHNICIAN),
+            'tech2': make_user('tech2', User.TECHNICIAN),
+            'client': make_user('client', User.CLIENT),
+        }
+        extra_users = User.objects.bulk_create([
+            User(username=f'budget_user_{i}_{suffix}', email=f'budget_user_{i}_{suffix}@example.com', password='!', role=role)
+            for i, role in enumerate([User.CLIENT, User.TECHNICIAN] * 25)
+        ])
+        extra_users = list(User.objects.filter(username__in=[user.username for user in extra_users]))
+        clients = [users['client']] + [user for user in extra_users if user.role == User.CLIENT]
+        technicians = [users['tech'], users['tech2']] + [user for user in extra_users if user.role == User.TECHNICIAN]
+
+        Card.objects.bulk_create([
+            Card(zone=f'ZONE_{i % 4}', state=f'STATE_{i % 7}', node_type=f'TYPE_{i % 3}', location=f'LOCATION_{i % 11}',
+                 card_type=f'CARD_{i % 13}', slot=str(i % 17), node_name=f'NODE_{i % 97}', primary_ip=f'10.{i % 250}.{i % 199}.1',
+                 aid=f'AID-{i}', unit_part_number=f'UPN-{i % 50}', clei=f'CLEI{i % 300}', serial_number=f'BGT{suffix}{i:06d}')
+            for i in range(max(options['cards'], 250))
+        ], batch_size=BATCH_SIZE)
+        cards = list(Card.objects.filter(serial_number__startswith=f'BGT{suffix}').order_by('pk'))
+
+        tickets = []
+        for i in range(max(options['tickets'], 200)):
+            status = rng.choice(STATUSES)
+            created_at = now - timedelta(seconds=rng.randrange(90 * 24 * 3600))
+            tickets.append(Ticket(
+                created_by=users['client'] if i % 5 == 0 else rng.choice(clients),
+                assigned_to=users['tech'] if i % 4 == 0 else rng.choice(technicians + [None]),
+                card=rng.choice(cards), fault_description=f'Generated fault {i} on node', priority=rng.choice(PRIORITIES), status=status,
+                created_at=created_at, resolved_at=created_at + timedelta(hours=rng.randrange(1, 500)) if status in ['RESOLVED', 'CLOSED'] else None,
+            ))
+        for start in range(0, len(tickets), BATCH_SIZE):
+            Ticket.objects.bulk_create(tickets[start:start + BATCH_SIZE])
+        ticket_ids = list(Ticket.objects.filter(fault_description__startswith='Generated fault').order_by('pk').values_list('pk', flat=True))
+        busy_ticket = Ticket.objects.filter(pk__in=ticket_ids, assigned_to=users['tech'], created_by=users['client']).order_by('pk').first()
+
+        authors = [users['client'], users['tech'], users['admin']] + extra_users[:10]
+        Comment.objects.bulk_create([
+            Comment(ticket_id=busy_ticket.pk if i % 4 == 0 else rng.choice(ticket_ids), author=rng.choice(authors), text=f'Generated comment {i}')
+            for i in range(options['comments'])
+        ], batch_size=BATCH_SIZE)
+        ActivityLog.objects.bulk_create([
+            ActivityLog(user=rng.choice(authors), user_role=User.ADMIN, action=rng.choice(['TICKET_CREATED', 'STATUS_CHANGED', 'USER_LOGIN']),
+                        timestamp=now - timedelta(seconds=rng.randrange(90 * 24 * 3600)), target_object_id=str(rng.choice(ticket_ids)), details='Generated entry.')
+            for _ in range(options['logs'])
+        ], batch_size=BATCH_SIZE)
+        Contact.objects.bulk_create([
+            Contact(circle=f'Circle {i % 20}', name=f'Budget Contact {i}', mobile_number='5550100', email=f'contact{i}_{suffix}@example.com')
+            for i in range(200)
+        ])
+        job = ExportJob.objects.create(requested_by=users['admin'], kind=ExportJob.TICKETS)
+
+        card = cards[0]
+        self.stdout.write(f'Generated {len(cards)} cards, {len(ticket_ids)} tickets, {options["comments"]} comments and {options["logs"]} log entries.')
+        return {
+            'suffix': suffix,
+            'password': BUDGET_PASSWORD,
+            'users': users,
+            'tokens': {name: str(AccessToken.for_user(user)) for name, user in users.items()},
+            'ticket': busy_ticket.pk,
+            'ticket_serial': busy_ticket.card.serial_number,
+            'ticket_ids': ticket_ids[:200],
+            'serials': [card.serial_number for card in cards[:200]],
+            'serial': card.serial_number,
+            'card_id': card.pk,
+            'zone': card.zone, 'state': card.state, 'node_type': card.node_type, 'location': card.location, 'card_type': card.card_type, 'slot': card.slot,
+            'client_id': users['client'].pk,
+            'job': job.pk,
+        }
+
+
+def run_caches():
+    """The configured caches, with keys kept apart from the site's."""
+    return {
+        alias: {**config, 'KEY_PREFIX': f"{config.get('KEY_PREFIX', '')}query-budgets"}
+        for alias, config in settings.CACHES.items()
+    }
+
+
+def format_data(data, context):
+    """Fills the fixture context into the string values of a request body."""
+    if isinstance(data, dict):
+        return {key: format_data(value, context) for key, value in data.items()}
+    if isinstance(data, str):
+        return data.format(**context)
+    return data
+
+
+def normalise_sql(sql):
+    """Replaces literals, so that the same statement with different values counts as one."""
+    sql = re.sub(r"'[^']*'", '?', sql)
+    sql = re.sub(r'\b\d+\b', '?', sql)
+    return re.sub(r'\((?:\s*(?:\?|%s)\s*,)+\s*(?:\?|%s)\s*\)', '(...)', sql)
@@ -0,0 +1,131 @@
+# E:\it-admin-tool\backend\tickets\management\commands\compare_dashboard_stats.py
+
+import random
+import statistics
+import time
+from datetime import timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+from accounts.models import User
+from tickets.models import Card, Ticket
+from tickets.dashboard import ALL_PRIORITIES, live_ticket_stats, reference_ticket_stats, scoped_tickets
+
+STATUSES = [status for status, _ in Ticket.STATUS_CHOICES]
+
+class Rollback(Exception):
+    pass
+
+class Command(BaseCommand):
+    help = (
+        'Checks that the two-pass dashboard aggregation returns exactly what the original '
+        'per-metric queries return, for every dashboard scope, and times both.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fixtures',
+            type=int,
+            default=0,
+            help='Compare over this many randomized tickets (plus their users and cards) created in a transaction that is rolled back afterwards.',
+        )
+        parser.add_argument('--seed', type=int, default=0, help='Random seed for --fixtures.')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per scope and path.')
+        parser.add_argument('--users', type=int, default=3, help='Clients and technicians to check their own dashboards for.')
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                if options['fixtures']:
+                    self.create_fixtures(options['fixtures'], random.Random(options['seed']))
+                failures = self.compare(options['repeat'], options['users'])
+                if options['fixtures']:
+                    raise Rollback()
+        except Rollback:
+            pass
+        if failures:
+            raise CommandError(f'{failures} scopes returned different dashboard stats.')
+        self.stdout.write(self.style.SUCCESS('Both paths returned identical dashboard stats for every scope.'))
+
+    def scopes(self, user_count):
+        staff = User.objects.filter(role__in=[User.ADMIN, User.OBSERVER]).first() or User(role=User.ADMIN)
+        scopes = [(f'staff view_as={view_as}', staff, view_as) for view_as in [None, 'client', 'technician']]
+        for role in [User.CLIENT, User.TECHNICIAN]:
+            for user in User.objects.filter(role=role).order_by('pk')[:user_count]:
+                scopes.append((f'{role.lower()} {user.username}', user, None))
+        return scopes
+
+    def compare(self, repeat, user_count):
+        failures = 0
+        for label, user, view_as in self.scopes(user_count):
+            base_queryset = scoped_tickets(user, view_as)
+            now = timezone.now()
+            expected = reference_ticket_stats(base_queryset, now)
+            actual = live_ticket_stats(base_queryset, now)
+            if normalised(actual) != normalised(expected):
+                failures += 1
+                self.stdout.write(self.style.ERROR(f'{label}: MISMATCH\n  reference: {expected}\n  two-pass:  {actual}'))
+                continue
+            reference_ms, reference_queries = self.benchmark(reference_ticket_stats, base_queryset, repeat)
+            live_ms, live_queries = self.benchmark(live_ticket_stats, base_queryset, repeat)
+            self.stdout.write(
+                f'{label}: identical ({expected["total_tickets"]} tickets). '
+                f'reference {reference_ms:.1f} ms / {reference_queries} queries, '
+                f'two-pass {live_ms:.1f} ms / {live_queries} queries.'
+            )
+        return failures
+
+    def benchmark(self, compute, base_queryset, repeat):
+        timings = []
+        queries = 0
+        def count_queries(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+            return execute(sql, params, many, context)
+        for _ in range(max(1, repeat)):
+            queries = 0
+            with connection.execute_wrapper(count_queries):
+                started = time.perf_counter()
+                compute(base_queryset)
+                timings.append((time.perf_counter() - started) * 1000)
+        return statistics.median(timings), queries
+
+    def create_fixtures(self, count, rng):
+        suffix = f'{rng.randrange(10**8):08d}'
+        users = {
+            role: [
+                User.objects.create_user(f'cmp_{role.lower()}_{i}_{suffix}', f'cmp_{role.lower()}_{i}_{suffix}@example.com', None, role=role, first_name='Compare', last_name=str(i))
+                for i in range(3)
+            ]
+            for role in [User.CLIENT, User.TECHNICIAN, User.ADMIN]
+        }
+        cards = Card.objects.bulk_create([
+            Card(zone='Z', state='S', node_type='N', location='L', card_type=f'TYPE_{i % 6}', slot=str(i), node_name=f'NODE_{i}',
+                 primary_ip='10.0.0.1', aid='-', unit_part_number='-', clei='-', serial_number=f'CMP{suffix}{i:05d}')
+            for i in range(20)
+        ])
+        now = timezone.now()
+        for _ in range(count):
+            status = rng.choice(STATUSES)
+            created_at = now - timedelta(seconds=rng.randrange(60 * 24 * 3600))
+            resolved_at = None
+            if status in ['RESOLVED', 'CLOSED'] and rng.random() < 0.9:
+                resolved_at = created_at + timedelta(seconds=rng.randrange(1, 40 * 24 * 3600), microseconds=rng.randrange(10**6))
+            Ticket(
+                created_by=rng.choice(users[User.CLIENT] + users[User.ADMIN]),
+                assigned_to=rng.choice(users[User.TECHNICIAN] + [None]),
+                card=rng.choice(cards + [None]),
+                fault_description='Randomized dashboard comparison fixture.',
+                priority=rng.choice(ALL_PRIORITIES),
+                status=status,
+                created_at=created_at,
+                resolved_at=resolved_at,
+            ).save()
+        self.stdout.write(f'Created {count} randomized tickets (rolled back when done).')
+
+
+def normalised(data):
+    """by_category is ordered by count only, so rows with equal counts may come back in either order."""
+    data = dict(data)
+    data['by_category'] = sorted(data['by_category'], key=lambda item: (-item['count'], str(item['card_category'])))
+    return data
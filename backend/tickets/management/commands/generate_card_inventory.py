@@ -0,0 +1,47 @@
+# E:\it-admin-tool\backend\tickets\management\commands\generate_card_inventory.py
+
+import csv
+import random
+from django.core.management.base import BaseCommand
+from openpyxl import Workbook
+
+HEADERS = ['Zone', 'State', 'Node Type', 'Location', 'Card Type', 'Slot', 'Node Name', 'Primary Ip', 'Aid', 'Unit Part Number', 'CLEI', 'Serial Number']
+ZONES = ['EAST', 'WEST', 'NORTH', 'SOUTH']
+NODE_TYPES = ['1830 PSS-32', '1830 PSS-16II', '1830 PSS-12X', '1830 PSS-8']
+CARD_TYPES = ['2UX200', '2UX500', '5MX500', '20AX200', 'IR9', '8EC2', '32EC2', '12XCEC2', 'XST12T', 'PF']
+
+class Command(BaseCommand):
+    help = 'Writes a synthetic card inventory (.xlsx or .csv) in the card_list.xlsx layout, for benchmarking seed_card_data.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help='Path of the .xlsx or .csv file to write.')
+        parser.add_argument('--rows', type=int, default=500000, help='Number of cards to generate.')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed, so runs are reproducible.')
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        rows = self.generate_rows(rng, options['rows'])
+        if options['output'].lower().endswith('.csv'):
+            with open(options['output'], 'w', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(HEADERS)
+                writer.writerows(rows)
+        else:
+            workbook = Workbook(write_only=True)
+            sheet = workbook.create_sheet()
+            sheet.append(HEADERS)
+            for row in rows:
+                sheet.append(row)
+            workbook.save(options['output'])
+        self.stdout.write(self.style.SUCCESS(f"Wrote {options['rows']} cards to {options['output']}."))
+
+    def generate_rows(self, rng, count):
+        for i in range(count):
+            zone = rng.choice(ZONES)
+            location = f'{zone[:2]}_LOC_{rng.randrange(2000):04d}'
+            yield [
+                zone, f'STATE_{rng.randrange(30):02d}', rng.choice(NODE_TYPES), location,
+                rng.choice(CARD_TYPES), rng.randrange(1, 33), f'{location}_OTN{rng.randrange(1, 5)}_001',
+                f'10.{rng.randrange(256)}.{rng.randrange(256)}.{rng.randrange(1, 255)}', '-',
+                f'3TD{rng.randrange(10**8):08d}', f'WO{rng.randrange(10**8):08d}', f'SYN{i:09d}',
+            ]
@@ -0,0 +1,71 @@
+# E:\it-admin-tool\backend\tickets\management\commands\maintain_activity_log_partitions.py
+
+import datetime
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+from datetime import timedelta
+from tickets.models import ActivityLog
+from tickets import activity_log_partitions as partitions
+
+class Command(BaseCommand):
+    help = 'Pre-creates future activity log partitions and enforces retention by dropping whole expired partitions.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=90,
+            help='Drop partitions whose entries are all older than this many days.',
+        )
+        parser.add_argument(
+            '--premake',
+            type=int,
+            default=3,
+            help='Number of future partition periods to keep created ahead of time.',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report what would be created and dropped without changing anything.',
+        )
+
+    def handle(self, *args, **options):
+        today = timezone.now().date()
+        cutoff = today - timedelta(days=options['days'])
+        dry_run = options['dry_run']
+
+        if not partitions.list_partitions():
+            self.purge_unpartitioned(cutoff, options['days'], dry_run)
+            return
+
+        future = partitions.periods_ahead(today, options['premake'])
+        if dry_run:
+            self.stdout.write(f'Would create partitions up to the period starting {future}.')
+        else:
+            created = partitions.create_partitions_until(future)
+            if created:
+                self.stdout.write(self.style.SUCCESS(f'Created partitions: {", ".join(created)}.'))
+
+        expired = partitions.expired_partitions(cutoff)
+        if not expired:
+            self.stdout.write(self.style.SUCCESS('No expired activity log partitions to drop.'))
+        elif dry_run:
+            self.stdout.write(f'Would drop partitions: {", ".join(expired)}.')
+        else:
+            partitions.drop_partitions(expired)
+            self.stdout.write(self.style.SUCCESS(f'Dropped partitions older than {options["days"]} days: {", ".join(expired)}.'))
+
+    def purge_unpartitioned(self, cutoff, days, dry_run):
+        """
+        Fallback for databases without partitioning: deletes the same rows that
+        dropping partitions would, i.e. everything before the period containing the cutoff.
+        """
+        boundary = datetime.datetime.combine(partitions.period_start(cutoff), datetime.time.min, tzinfo=datetime.timezone.utc)
+        self.stdout.write(self.style.WARNING(f'The activity log is not partitioned on {connection.vendor}; deleting entries before {boundary:%Y-%m-%d} instead.'))
+        logs_to_delete = ActivityLog.objects.filter(timestamp__lt=boundary)
+        if dry_run:
+            self.stdout.write(f'Would delete {logs_to_delete.count()} activity log entries.')
+            return
+        count, _ = logs_to_delete.delete()
+        self.stdout.write(self.style.SUCCESS(f'Purged {count} activity log entries older than {days} days.'))
@@ -1,9 +1,18 @@
 # COPY AND PASTE THIS ENTIRE, FINAL, PERFECT BLOCK.
 
-from django.core.management.base import BaseCommand
+import gzip
+import json
+import os
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from datetime import timedelta
 from tickets.models import ActivityLog
+from tickets.exports import iter_keyset
+
+ARCHIVE_FIELDS = [field.attname for field in ActivityLog._meta.concrete_fields]
 
 class Command(BaseCommand):
     help = 'Purges activity log entries older than a specified number of days.'
@@ -15,16 +24,115 @@ class Command(BaseCommand):
             default=90,
             help='Delete log entries older than this many days.',
         )
+        parser.add_argument(
+            '--before',
+            help='Delete log entries older than this ISO timestamp instead of using --days. Use it to resume an interrupted purge with the same cutoff.',
+        )
+        parser.add_argument(
+            '--chunked',
+            action='store_true',
+            help='Delete in primary-key ranges of --batch-size rows instead of one large DELETE.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Rows deleted per statement in chunked mode.',
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=0.5,
+            help='Seconds to pause between batches in chunked mode, to let the live app through.',
+        )
+        parser.add_argument(
+            '--archive',
+            help='Append the purged entries to this gzip-compressed NDJSON file before deleting them. Each batch is on disk before its delete runs; an interrupted purge may archive some entries twice, never lose one.',
+        )
 
     def handle(self, *args, **options):
-        days = options['days']
-        cutoff_date = timezone.now() - timedelta(days=days)
-        
+        if options['before']:
+            cutoff_date = parse_datetime(options['before'])
+            if cutoff_date is None:
+                raise CommandError(f"--before must be an ISO timestamp, got '{options['before']}'.")
+            if timezone.is_naive(cutoff_date):
+                cutoff_date = timezone.make_aware(cutoff_date)
+            description = f'before {cutoff_date.isoformat()}'
+        else:
+            days = options['days']
+            cutoff_date = timezone.now() - timedelta(days=days)
+            description = f'older than {days} days'
+
         logs_to_delete = ActivityLog.objects.filter(timestamp__lt=cutoff_date)
-        count = logs_to_delete.count()
-        
+        archive = options['archive']
+        if options['chunked']:
+            count = self.purge_in_chunks(logs_to_delete, cutoff_date, archive, options['batch_size'], options['sleep'])
+        else:
+            count = self.purge_at_once(logs_to_delete, archive)
+
         if count > 0:
-            logs_to_delete.delete()
-            self.stdout.write(self.style.SUCCESS(f'Successfully purged {count} activity log entries older than {days} days.'))
+            self.stdout.write(self.style.SUCCESS(f'Successfully purged {count} activity log entries {description}.'))
         else:
-            self.stdout.write(self.style.SUCCESS('No old activity log entries to purge.'))
\ No newline at end of file
+            self.stdout.write(self.style.SUCCESS('No old activity log entries to purge.'))
+
+    def purge_at_once(self, logs_to_delete, archive):
+        if archive:
+            last_pk = self.write_archive(archive, iter_keyset(logs_to_delete.order_by('pk'), ARCHIVE_FIELDS))
+            if last_pk is None:
+                return 0
+            # Only what reached the archive.
+            logs_to_delete = logs_to_delete.filter(pk__lte=last_pk)
+        count, _ = logs_to_delete.delete()
+        return count
+
+    def purge_in_chunks(self, logs_to_delete, cutoff_date, archive, batch_size, sleep):
+        """
+        Deletes expired entries one primary-key range at a time, so each statement
+        holds its locks briefly. Each batch is appended to the archive and synced to
+        disk before its DELETE runs, and every DELETE commits on its own, so an
+        interrupted purge resumes by running again with the same --before cutoff.
+        """
+        total = 0
+        last_pk = 0
+        started = time.monotonic()
+        try:
+            while True:
+                pks = list(logs_to_delete.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:batch_size])
+                if not pks:
+                    break
+                batch = logs_to_delete.filter(pk__gt=last_pk, pk__lte=pks[-1])
+                if archive:
+                    self.write_archive(archive, batch.order_by('pk').values(*ARCHIVE_FIELDS))
+                deleted, _ = batch.delete()
+                total += deleted
+                last_pk = pks[-1]
+                elapsed = time.monotonic() - started
+                self.stdout.write(f'Deleted {total} entries so far (last purged id {last_pk}, {total / max(elapsed, 1e-9):.0f} rows/sec).')
+                if len(pks) < batch_size:
+                    break
+                time.sleep(sleep)
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING(
+                f'Interrupted after purging {total} entries (last purged id {last_pk}). To resume, run the same '
+                f'command again with --before {cutoff_date.isoformat()}'
+            ))
+            return total
+        if total:
+            self.stdout.write(f'Last purged id: {last_pk}.')
+        return total
+
+    def write_archive(self, path, rows):
+        """
+        Appends the rows to the archive as one complete gzip member and syncs it to
+        disk, so a failure part-way leaves every earlier batch readable. Returns the
+        id of the last row written, or None if there were none.
+        """
+        last_pk = None
+        with open(path, 'ab') as raw:
+            with gzip.GzipFile(fileobj=raw, mode='wb') as archive:
+                for row in rows:
+                    archive.write((json.dumps(row, cls=DjangoJSONEncoder) + '\n').encode('utf-8'))
+                    last_pk = row['id']
+            raw.flush()
+            os.fsync(raw.fileno())
+        return last_pk
@@ -0,0 +1,37 @@
+# E:\it-admin-tool\backend\tickets\management\commands\rebuild_ticket_stats.py
+
+from django.core.management.base import BaseCommand, CommandError
+from tickets.ticket_stats import VALUE_FIELDS, rebuild_ticket_stats, verify_ticket_stats
+
+class Command(BaseCommand):
+    help = 'Recomputes the dashboard summary table (TicketStats) from the tickets, or with --verify checks it against them.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verify',
+            action='store_true',
+            help='Only compare the summary with the tickets and report any bucket that differs.',
+        )
+
+    def handle(self, *args, **options):
+        if not options['verify']:
+            count = rebuild_ticket_stats()
+            self.stdout.write(self.style.SUCCESS(f'Successfully rebuilt {count} dashboard summary buckets.'))
+            return
+
+        mismatches = verify_ticket_stats()
+        if not mismatches:
+            self.stdout.write(self.style.SUCCESS('The dashboard summary matches the tickets.'))
+            return
+        for key, stored, expected in mismatches:
+            scope, user_id, priority, status, card_type = key
+            self.stdout.write(
+                f'{scope} user={user_id} {priority}/{status}/{card_type}: '
+                f'stored {self.describe(stored)}, expected {self.describe(expected)}'
+            )
+        raise CommandError(f'{len(mismatches)} dashboard summary buckets differ from the tickets. Run rebuild_ticket_stats to fix them.')
+
+    def describe(self, values):
+        if values is None:
+            return 'nothing'
+        return ', '.join(f'{field}={value}' for field, value in zip(VALUE_FIELDS, values))
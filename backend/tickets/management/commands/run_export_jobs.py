@@ -0,0 +1,62 @@
+# E:\it-admin-tool\backend\tickets\management\commands\run_export_jobs.py
+
+import time
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from tickets.export_jobs import claim_next_job, delete_expired_exports, run_export_job
+from tickets.activity_logger import flush_activity_log
+
+# Seconds between retention sweeps (see EXPORT_RETENTION_DAYS).
+SWEEP_INTERVAL = 3600
+
+class Command(BaseCommand):
+    help = (
+        'Processes queued export jobs. Run it as its own service so exports never occupy a gunicorn worker. '
+        'Once an hour it also deletes the export jobs and files older than EXPORT_RETENTION_DAYS.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Process the jobs that are currently queued, then exit.',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=5.0,
+            help='Seconds to wait between checks when the queue is empty.',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.SUCCESS('Export worker started.'))
+        last_sweep = None
+        while True:
+            close_old_connections()
+            if last_sweep is None or time.monotonic() - last_sweep >= SWEEP_INTERVAL:
+                self.sweep()
+                last_sweep = time.monotonic()
+            job = claim_next_job()
+            if job is None:
+                if options['once']:
+                    break
+                time.sleep(options['poll_interval'])
+                continue
+
+            self.stdout.write(f'Running {job}...')
+            try:
+                run_export_job(job)
+                self.stdout.write(self.style.SUCCESS(f'Export job #{job.pk} completed with {job.row_count} rows.'))
+            except Exception as e:
+                self.stdout.write(self.style.ERROR(f'Export job #{job.pk} failed: {e}'))
+            # Outside a request nothing else flushes a buffered activity log.
+            flush_activity_log()
+
+    def sweep(self):
+        try:
+            jobs_deleted, files_deleted = delete_expired_exports()
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f'Deleting expired exports failed: {e}'))
+            return
+        if jobs_deleted or files_deleted:
+            self.stdout.write(f'Deleted {jobs_deleted} expired export jobs and {files_deleted} files.')
@@ -1,73 +1,67 @@
 # COPY AND PASTE THIS ENTIRE, FINAL, PERFECT, NON-DESTRUCTIVE BLOCK.
 
-import pandas as pd
+import time
 from django.core.management.base import BaseCommand
 from django.conf import settings
 import os
-from tickets.models import Card
+from tickets.card_import import CardImporter, iter_card_rows
 
 class Command(BaseCommand):
-    help = 'Safely seeds the database with card data from an Excel file. Adds new cards and updates existing ones without deleting any data.'
+    help = 'Safely seeds the database with card data from an Excel or CSV file. Adds new cards and updates existing ones without deleting any data.'
 
-    def handle(self, *args, **kwargs):
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--file',
+            default=os.path.join(settings.BASE_DIR, 'card_list.xlsx'),
+            help='Path of the inventory sheet to import. Defaults to card_list.xlsx in the backend directory.',
+        )
+        parser.add_argument(
+            '--format',
+            choices=['xlsx', 'csv'],
+            help='File format. Detected from the file extension when omitted.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of rows looked up and written per bulk query.',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report what would change without writing to the database.',
+        )
+
+    def handle(self, *args, **options):
         self.stdout.write(self.style.SUCCESS('Starting safe data seeding process...'))
-        
-        file_path = os.path.join(settings.BASE_DIR, 'card_list.xlsx')
-        
-        try:
-            df = pd.read_excel(file_path)
-            self.stdout.write(f'Successfully loaded {len(df)} rows from {file_path}')
 
-            # Clean up column names to be safe
-            df.columns = [str(col).strip().lower().replace(' ', '_') for col in df.columns]
-            
-            # --- THIS IS THE FIX ---
-            #
-            # The DESTRUCTIVE lines have been REMOVED.
-            # We no longer delete any Ticket or Card objects.
-            #
-            # --- Ticket.objects.all().delete()  <-- REMOVED
-            # --- Card.objects.all().delete()    <-- REMOVED
-            #
-            # Instead, we will use `update_or_create` which is SAFE.
-            # It will match cards by `serial_number`. If a card exists, it updates it.
-            # If it doesn't exist, it creates it.
-            
-            created_count = 0
-            updated_count = 0
+        file_path = options['file']
 
-            for index, row in df.iterrows():
-                # Skip rows where serial number is missing, as it's our unique key
-                if pd.isna(row.get('serial_number')):
-                    continue
+        try:
+            # The sheet is streamed row by row, so memory stays bounded by the
+            # batch size however large the inventory is. Cards are matched by
+            # `serial_number`: existing cards are updated, new ones are created,
+            # and nothing is ever deleted.
+            rows = iter_card_rows(file_path, options['format'])
+            self.stdout.write(f'Reading cards from {file_path}')
+            importer = CardImporter(batch_size=options['batch_size'], dry_run=options['dry_run'])
 
-                # Safely update an existing card or create a new one
-                card, created = Card.objects.update_or_create(
-                    serial_number=row['serial_number'],
-                    defaults={
-                        'zone': row.get('zone', ''),
-                        'state': row.get('state', ''),
-                        'node_type': row.get('node_type', ''),
-                        'location': row.get('location', ''),
-                        'card_type': row.get('card_type', ''),
-                        'slot': str(row.get('slot', '')), # Ensure slot is a string
-                        'node_name': row.get('node_name', ''),
-                        'primary_ip': row.get('primary_ip', '0.0.0.0'),
-                        'aid': row.get('aid', ''),
-                        'unit_part_number': row.get('unit_part_number', ''),
-                        'clei': row.get('clei', ''),
-                    }
-                )
-                if created:
-                    created_count += 1
-                else:
-                    updated_count += 1
+            started = time.monotonic()
+            result = importer.run(rows)
+            elapsed = time.monotonic() - started
 
-            self.stdout.write(self.style.SUCCESS(f'Seeding complete. New cards created: {created_count}. Existing cards updated: {updated_count}.'))
+            for error in result.errors:
+                self.stdout.write(self.style.WARNING(error))
+            prefix = 'Dry run complete (no changes written).' if options['dry_run'] else 'Seeding complete.'
+            self.stdout.write(self.style.SUCCESS(
+                f'{prefix} Created: {result.created}. Updated: {result.updated}. '
+                f'Unchanged: {result.unchanged}. Duplicates: {result.duplicates}. Invalid: {result.invalid}.'
+            ))
+            self.stdout.write(f'Processed {result.rows} rows in {elapsed:.2f}s ({result.rows / max(elapsed, 1e-9):.0f} rows/sec).')
 
         except FileNotFoundError:
-            self.stdout.write(self.style.ERROR(f'Error: The file was not found at {file_path}. Please ensure it is in the backend directory.'))
-        except KeyError as e:
-            self.stdout.write(self.style.ERROR(f"A required column is missing in the Excel file: {e}"))
+            self.stdout.write(self.style.ERROR(f'Error: The file was not found at {file_path}. Please check the path.'))
+        except ValueError as e:
+            self.stdout.write(self.style.ERROR(f'Error: {e}'))
         except Exception as e:
-            self.stdout.write(self.style.ERROR(f'An unexpected error occurred: {e}'))
\ No newline at end of file
+            self.stdout.write(self.style.ERROR(f'An unexpected error occurred: {e}'))
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.5 on 2026-10-18 06:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0014_activitylog_user_role'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='card',
+            index=models.Index(fields=['zone', 'state', 'node_type', 'location', 'card_type', 'slot'], name='tickets_card_cascade_idx'),
+        ),
+    ]
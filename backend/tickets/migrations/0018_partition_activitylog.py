@@ -0,0 +1,40 @@
+# Generated by Django 5.2.5 on 2026-10-18 07:07
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+from tickets.activity_log_partitions import periods_ahead, partition_table, supports_partitioning, unpartition_table
+
+def partition_activity_log(apps, schema_editor):
+    """
+    On MySQL, splits the existing activity log into monthly partitions covering its
+    oldest entry up to three periods ahead. Other databases keep a plain table.
+    """
+    if not supports_partitioning(schema_editor.connection):
+        return
+    ActivityLog = apps.get_model('tickets', 'ActivityLog')
+    today = timezone.now().date()
+    oldest = ActivityLog.objects.order_by('timestamp').values_list('timestamp', flat=True).first()
+    partition_table(schema_editor.connection, oldest.date() if oldest else today, periods_ahead(today, 3))
+
+def unpartition_activity_log(apps, schema_editor):
+    if supports_partitioning(schema_editor.connection):
+        unpartition_table(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0017_exportjob'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='activitylog',
+            name='user',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='activities', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.RunPython(partition_activity_log, unpartition_activity_log),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.5 on 2026-10-18 07:11
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0018_partition_activitylog'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TicketStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.CharField(max_length=40, unique=True)),
+                ('scope', models.CharField(choices=[('GLOBAL', 'All tickets'), ('CREATED_BY', 'Created by user'), ('ASSIGNED_TO', 'Assigned to user')], max_length=20)),
+                ('priority', models.CharField(max_length=10)),
+                ('status', models.CharField(max_length=20)),
+                ('card_type', models.CharField(blank=True, max_length=100, null=True)),
+                ('ticket_count', models.IntegerField(default=0)),
+                ('resolved_count', models.IntegerField(default=0)),
+                ('resolution_seconds', models.BigIntegerField(default=0)),
+                ('created_at_seconds', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['status', 'created_at'], name='tickets_ticket_status_idx'),
+        ),
+        migrations.AddField(
+            model_name='ticketstats',
+            name='user',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='ticketstats',
+            index=models.Index(fields=['scope', 'user'], name='tickets_tic_scope_1a9721_idx'),
+        ),
+    ]
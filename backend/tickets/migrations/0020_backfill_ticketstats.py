@@ -0,0 +1,35 @@
+# Generated by Django 5.2.5 on 2026-10-18 07:12
+
+from django.db import migrations
+
+def backfill_ticket_stats(apps, schema_editor):
+    """
+    Fills the dashboard summary from the existing tickets, so dashboard-stats
+    is correct as soon as the migration has run.
+    """
+    from tickets.ticket_stats import STATE_LOOKUPS, VALUE_FIELDS, StatsDelta, bucket_digest
+    Ticket = apps.get_model('tickets', 'Ticket')
+    TicketStats = apps.get_model('tickets', 'TicketStats')
+    delta = StatsDelta()
+    for state in Ticket.objects.values_list(*STATE_LOOKUPS).iterator(chunk_size=2000):
+        delta.add(state)
+    TicketStats.objects.bulk_create(
+        [
+            TicketStats(
+                bucket=bucket_digest(*key), scope=key[0], user_id=key[1], priority=key[2], status=key[3], card_type=key[4],
+                **dict(zip(VALUE_FIELDS, values)),
+            )
+            for key, values in delta.buckets.items()
+        ],
+        batch_size=1000,
+    )
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0019_ticketstats_ticket_tickets_ticket_status_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_ticket_stats, migrations.RunPython.noop),
+    ]
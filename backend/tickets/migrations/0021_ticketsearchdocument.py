@@ -0,0 +1,88 @@
+# Generated by Django 5.2.5 on 2026-10-18 07:17
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# The document format and index statements as of this migration. They are copied
+# here rather than imported from tickets.search, which may change after it.
+DOCUMENT_TABLE = 'tickets_ticketsearchdocument'
+FTS_TABLE = 'tickets_ticketsearch_fts'
+DOCUMENT_LOOKUPS = [
+    'ticket_id', 'status', 'priority', 'card__node_name', 'card__serial_number', 'card__clei',
+    'created_by__username', 'assigned_to__username', 'fault_description',
+]
+FULLTEXT_INDEX_SQL = {
+    'mysql': (
+        [f"CREATE FULLTEXT INDEX tickets_ticketsearch_document_ft ON {DOCUMENT_TABLE} (document)"],
+        [f"DROP INDEX tickets_ticketsearch_document_ft ON {DOCUMENT_TABLE}"],
+    ),
+    'postgresql': (
+        [f"CREATE INDEX tickets_ticketsearch_document_gin ON {DOCUMENT_TABLE} USING GIN (to_tsvector('simple', document))"],
+        ["DROP INDEX tickets_ticketsearch_document_gin"],
+    ),
+    'sqlite': (
+        [
+            f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(document, content='{DOCUMENT_TABLE}', content_rowid='ticket_id')",
+            f"CREATE TRIGGER {FTS_TABLE}_ai AFTER INSERT ON {DOCUMENT_TABLE} BEGIN "
+            f"INSERT INTO {FTS_TABLE}(rowid, document) VALUES (new.ticket_id, new.document); END",
+            f"CREATE TRIGGER {FTS_TABLE}_ad AFTER DELETE ON {DOCUMENT_TABLE} BEGIN "
+            f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, document) VALUES ('delete', old.ticket_id, old.document); END",
+            f"CREATE TRIGGER {FTS_TABLE}_au AFTER UPDATE ON {DOCUMENT_TABLE} BEGIN "
+            f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, document) VALUES ('delete', old.ticket_id, old.document); "
+            f"INSERT INTO {FTS_TABLE}(rowid, document) VALUES (new.ticket_id, new.document); END",
+            f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+        ],
+        [
+            f"DROP TRIGGER {FTS_TABLE}_au",
+            f"DROP TRIGGER {FTS_TABLE}_ad",
+            f"DROP TRIGGER {FTS_TABLE}_ai",
+            f"DROP TABLE {FTS_TABLE}",
+        ],
+    ),
+}
+
+
+def build_document(values):
+    return ' '.join(str(value).replace('_', ' ') for value in values if value)
+
+
+def backfill_search_documents(apps, schema_editor):
+    Ticket = apps.get_model('tickets', 'Ticket')
+    TicketSearchDocument = apps.get_model('tickets', 'TicketSearchDocument')
+    documents = []
+    for row in Ticket.objects.values_list('pk', *DOCUMENT_LOOKUPS).iterator(chunk_size=2000):
+        documents.append(TicketSearchDocument(ticket_id=row[0], document=build_document(row[1:])))
+        if len(documents) >= 1000:
+            TicketSearchDocument.objects.bulk_create(documents)
+            documents = []
+    TicketSearchDocument.objects.bulk_create(documents)
+
+
+def create_fulltext_index(apps, schema_editor):
+    for statement in FULLTEXT_INDEX_SQL.get(schema_editor.connection.vendor, ([], []))[0]:
+        schema_editor.execute(statement)
+
+
+def drop_fulltext_index(apps, schema_editor):
+    for statement in FULLTEXT_INDEX_SQL.get(schema_editor.connection.vendor, ([], []))[1]:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0020_backfill_ticketstats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TicketSearchDocument',
+            fields=[
+                ('ticket', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_document', serialize=False, to='tickets.ticket')),
+                ('document', models.TextField()),
+            ],
+        ),
+        migrations.RunPython(backfill_search_documents, migrations.RunPython.noop),
+        migrations.RunPython(create_fulltext_index, drop_fulltext_index),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.5 on 2026-10-18 07:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0021_ticketsearchdocument'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TicketSequence',
+            fields=[
+                ('year', models.PositiveIntegerField(primary_key=True, serialize=False)),
+                ('next_number', models.PositiveBigIntegerField()),
+            ],
+        ),
+    ]
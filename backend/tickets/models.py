@@ -1,11 +1,18 @@
 # Path: E:\it-admin-tool\backend\tickets\models.py
 # COPY AND PASTE THIS ENTIRE, FINAL, PERFECT BLOCK.
 
-from django.db import models
+from django.db import models, transaction, IntegrityError
+from django.db.models import F
+from django.db.models.functions import Length
+from django.dispatch import Signal
 from django.conf import settings
 from django.utils import timezone
 from accounts.models import User
 
+# Sent after Ticket.objects.bulk_create() with the created tickets, since bulk
+# inserts send no post_save (see signals.py).
+tickets_bulk_created = Signal()
+
 class Card(models.Model):
     zone = models.CharField(max_length=100)
     state = models.CharField(max_length=100)
@@ -23,9 +30,64 @@ class Card(models.Model):
     def __str__(self):
         return f"{self.node_name} - {self.serial_number}"
 
+    class Meta:
+        indexes = [
+            # Matches the ticket-creation cascade, so every prefix of it
+            # (zone; zone+state; ... down to the slot) is an index lookup.
+            models.Index(fields=['zone', 'state', 'node_type', 'location', 'card_type', 'slot'], name='tickets_card_cascade_idx'),
+        ]
+
 def ticket_image_upload_path(instance, filename):
     return f"tickets/{instance.ticket_id}/{filename}"
 
+class TicketSequence(models.Model):
+    """
+    The next ticket number of each year. Numbers are reserved by incrementing the
+    row, which locks it until the reserving transaction ends, so concurrent
+    workers never hand out the same number.
+    """
+    year = models.PositiveIntegerField(primary_key=True)
+    next_number = models.PositiveBigIntegerField()
+
+    def __str__(self):
+        return f"{self.year}: next {self.next_number}"
+
+    @classmethod
+    def reserve(cls, year, count=1):
+        """Reserves `count` consecutive ticket numbers for `year`; returns the first one."""
+        with transaction.atomic():
+            if not cls.objects.filter(year=year).update(next_number=F('next_number') + count):
+                try:
+                    with transaction.atomic():
+                        cls.objects.create(year=year, next_number=cls.first_free_number(year) + count)
+                except IntegrityError:
+                    # Another worker started the year first.
+                    cls.objects.filter(year=year).update(next_number=F('next_number') + count)
+            return cls.objects.get(year=year).next_number - count
+
+    @staticmethod
+    def first_free_number(year):
+        """One past the highest number already used in `year`, so the sequence continues after existing tickets."""
+        latest = (
+            Ticket.objects.filter(ticket_id__startswith=f"TKT-{year}-")
+            .order_by(Length('ticket_id').desc(), '-ticket_id')
+            .values_list('ticket_id', flat=True)
+            .first()
+        )
+        suffix = latest.rsplit('-', 1)[-1] if latest else ''
+        return int(suffix) + 1 if suffix.isdigit() else 1
+
+class TicketQuerySet(models.QuerySet):
+    def bulk_create(self, objs, *args, **kwargs):
+        """Fills in the ticket_id of each new ticket before inserting them all, then sends tickets_bulk_created."""
+        objs = list(objs)
+        Ticket.assign_ticket_ids(objs)
+        created = super().bulk_create(objs, *args, **kwargs)
+        # With conflict handling there is no telling which rows were actually inserted.
+        if not kwargs.get('ignore_conflicts') and not kwargs.get('update_conflicts'):
+            tickets_bulk_created.send(sender=Ticket, tickets=created)
+        return created
+
 class Ticket(models.Model):
     STATUS_CHOICES = [
         ('OPEN', 'Open'), 
@@ -37,6 +99,11 @@ class Ticket(models.Model):
         ('ON_HOLD', 'On Hold'),
     ]
     PRIORITY_CHOICES = [('CRITICAL', 'Critical'), ('HIGH', 'High'), ('MEDIUM', 'Medium'), ('LOW', 'Low')]
+    # The timestamp each status change fills in, when it is still empty.
+    STATUS_TIMESTAMP_FIELDS = {
+        'IN_PROGRESS': 'in_progress_at', 'IN_TRANSIT': 'in_transit_at',
+        'UNDER_REPAIR': 'under_repair_at', 'ON_HOLD': 'on_hold_at', 'RESOLVED': 'resolved_at',
+    }
 
     ticket_id = models.CharField(max_length=20, unique=True, editable=False)
     created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='submitted_tickets')
@@ -65,16 +132,70 @@ class Ticket(models.Model):
         elif self.priority == 'LOW': return 21
         return 30
 
+    # The fields the dashboard summary (TicketStats) is bucketed and summed by.
+    STATS_FIELDS = ['created_by_id', 'assigned_to_id', 'priority', 'status', 'card_id', 'created_at', 'resolved_at']
+    # The fields of this row that make up its search document (TicketSearchDocument).
+    SEARCH_FIELDS = ['ticket_id', 'status', 'priority', 'card_id', 'created_by_id', 'assigned_to_id', 'fault_description']
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember what the row looked like when it was loaded. Saves and deletes
+        # replace this with the row as re-read under a lock (remember_ticket_state).
+        if all(field in instance.__dict__ for field in cls.STATS_FIELDS):
+            instance._stats_state = tuple(instance.__dict__[field] for field in cls.STATS_FIELDS)
+        # Likewise for the search document, which only needs rewriting when one of these changed.
+        if all(field in instance.__dict__ for field in cls.SEARCH_FIELDS):
+            instance._search_state = tuple(instance.__dict__[field] for field in cls.SEARCH_FIELDS)
+        return instance
+
+    objects = TicketQuerySet.as_manager()
+
     def save(self, *args, **kwargs):
-        if not self.pk:
-            super().save(*args, **kwargs)
-            self.ticket_id = f"TKT-{self.created_at.year}-{self.id:005d}"
-            kwargs['force_insert'] = False
-        super(Ticket, self).save(*args, **kwargs)
+        if not self.pk and not self.ticket_id:
+            Ticket.assign_ticket_ids([self])
+        # One transaction with the pre_save row lock and the post_save summary update (see signals.py).
+        with transaction.atomic(savepoint=False):
+            super(Ticket, self).save(*args, **kwargs)
+
+    @staticmethod
+    def assign_ticket_ids(tickets):
+        """
+        Gives every ticket without one a TKT-YYYY-NNNNN id from its year's
+        TicketSequence, reserving one block of numbers per year.
+        """
+        by_year = {}
+        for ticket in tickets:
+            if not ticket.ticket_id:
+                by_year.setdefault(ticket.created_at.year, []).append(ticket)
+        for year, new_tickets in by_year.items():
+            first = TicketSequence.reserve(year, len(new_tickets))
+            for number, ticket in enumerate(new_tickets, start=first):
+                ticket.ticket_id = f"TKT-{year}-{number:05d}"
 
     def __str__(self):
         return self.ticket_id
 
+    class Meta:
+        indexes = [
+            # The default list and export order; lets exports walk tickets in chunks.
+            models.Index(fields=['created_at', 'id'], name='tickets_ticket_created_idx'),
+            # The dashboard's SLA breach count, which looks only at old open tickets.
+            models.Index(fields=['status', 'created_at'], name='tickets_ticket_status_idx'),
+        ]
+
+class TicketSearchDocument(models.Model):
+    """
+    The searchable text of one ticket: its id, status and priority, its card's node
+    name, serial number and CLEI, its creator's and assignee's usernames and the fault
+    description, in one column with a full-text index (see tickets/search.py).
+    """
+    ticket = models.OneToOneField(Ticket, on_delete=models.CASCADE, primary_key=True, related_name='search_document')
+    document = models.TextField()
+
+    def __str__(self):
+        return f"Search document for {self.ticket_id}"
+
 class Comment(models.Model):
     text = models.TextField()
     ticket = models.ForeignKey(Ticket, on_delete=models.CASCADE, related_name='comments')
@@ -87,9 +208,15 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ['created_at']
+        indexes = [
+            # A ticket's thread in order, so a page of it (detail or comments endpoint) is an index range.
+            models.Index(fields=['ticket', 'created_at', 'id'], name='tickets_comment_thread_idx'),
+        ]
 
 class ActivityLog(models.Model):
-    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='activities')
+    # No database-level constraint: MySQL cannot partition a table that has foreign keys
+    # (see activity_log_partitions.py). Deleting a user still cascades through the ORM.
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='activities', db_constraint=False)
     action = models.CharField(max_length=50)
     timestamp = models.DateTimeField(default=timezone.now)
     target_object_id = models.CharField(max_length=100, null=True, blank=True)
@@ -108,4 +235,73 @@ class ActivityLog(models.Model):
             models.Index(fields=['user']),
             models.Index(fields=['action']),
             models.Index(fields=['timestamp']),
-        ]
\ No newline at end of file
+        ]
+
+class ExportJob(models.Model):
+    TICKETS = 'TICKETS'
+    ACTIVITY_LOG = 'ACTIVITY_LOG'
+    KIND_CHOICES = [(TICKETS, 'Tickets'), (ACTIVITY_LOG, 'Activity Log')]
+
+    PENDING = 'PENDING'
+    RUNNING = 'RUNNING'
+    COMPLETED = 'COMPLETED'
+    FAILED = 'FAILED'
+    STATUS_CHOICES = [(PENDING, 'Pending'), (RUNNING, 'Running'), (COMPLETED, 'Completed'), (FAILED, 'Failed')]
+
+    FORMAT_CHOICES = [('csv', 'CSV'), ('ndjson', 'NDJSON')]
+
+    requested_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='export_jobs')
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    export_format = models.CharField(max_length=10, choices=FORMAT_CHOICES, default='csv')
+    # The list endpoint's query parameters, replayed by the worker: {name: [values]}.
+    params = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=PENDING)
+    file = models.FileField(upload_to='exports/', blank=True, null=True)
+    row_count = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.get_kind_display()} export #{self.pk} ({self.status})"
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+
+class TicketStats(models.Model):
+    """
+    Dashboard counters for the tickets in one bucket: a scope (all tickets, or one
+    user's created or assigned tickets) and a priority/status/card type. Kept up to
+    date by tickets/ticket_stats.py; rebuild_ticket_stats recomputes it from scratch.
+    """
+    GLOBAL = 'GLOBAL'
+    CREATED_BY = 'CREATED_BY'
+    ASSIGNED_TO = 'ASSIGNED_TO'
+    SCOPE_CHOICES = [(GLOBAL, 'All tickets'), (CREATED_BY, 'Created by user'), (ASSIGNED_TO, 'Assigned to user')]
+
+    # A digest of the bucket's key columns. The key includes nullable columns, which a
+    # composite unique constraint would not deduplicate, so concurrent upserts use this.
+    bucket = models.CharField(max_length=40, unique=True)
+    scope = models.CharField(max_length=20, choices=SCOPE_CHOICES)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    priority = models.CharField(max_length=10)
+    status = models.CharField(max_length=20)
+    card_type = models.CharField(max_length=100, null=True, blank=True)
+    ticket_count = models.IntegerField(default=0)
+    # Tickets with resolved_at set, and the sum of their resolved_at - created_at in seconds.
+    resolved_count = models.IntegerField(default=0)
+    resolution_seconds = models.BigIntegerField(default=0)
+    # Sum of created_at as Unix seconds, from which the average open age is derived.
+    created_at_seconds = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.scope} {self.user_id or ''} {self.priority}/{self.status}/{self.card_type}: {self.ticket_count}"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['scope', 'user']),
+        ]
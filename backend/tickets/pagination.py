@@ -0,0 +1,246 @@
+# Path: E:\it-admin-tool\backend\tickets\pagination.py
+
+import base64
+import hashlib
+import json
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.paginator import EmptyPage, Page, Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from .exports import keyset_condition
+
+COUNT_CACHE_PREFIX = 'tickets:list_count'
+
+
+def _planner_estimate(queryset):
+    """The database's own estimate of how many rows the queryset returns, or None where there is none (SQLite)."""
+    vendor = connections[queryset.db].vendor
+    if vendor not in ['mysql', 'postgresql']:
+        return None
+    try:
+        plan = json.loads(queryset.order_by().explain(format='JSON'))
+    except Exception:
+        return None
+    if vendor == 'postgresql':
+        return int(plan[0]['Plan']['Plan Rows'])
+    # MySQL: the rows produced by the last table joined is the size of the result.
+    estimates = []
+    def walk(node):
+        if isinstance(node, dict):
+            if 'rows_produced_per_join' in node:
+                estimates.append(node['rows_produced_per_join'])
+            for value in node.values():
+                walk(value)
+        elif isinstance(node, list):
+            for value in node:
+                walk(value)
+    walk(plan)
+    return int(estimates[-1]) if estimates else None
+
+
+def count_rows(queryset):
+    """
+    Returns (count, whether it is approximate) for a list endpoint. Up to
+    PAGINATION_EXACT_COUNT_LIMIT rows are counted exactly, with a COUNT that stops
+    there. Larger results use the planner's estimate where the database gives one,
+    or else one full COUNT. Either is cached per query for PAGINATION_COUNT_CACHE_TIMEOUT
+    seconds, and cached or estimated counts are flagged approximate.
+    """
+    limit = getattr(settings, 'PAGINATION_EXACT_COUNT_LIMIT', 1000)
+    bounded = queryset.order_by()[:limit + 1].count()
+    if bounded <= limit:
+        return bounded, False
+
+    sql, params = queryset.order_by().query.sql_with_params()
+    key = f"{COUNT_CACHE_PREFIX}:{hashlib.sha1(f'{sql}|{params!r}'.encode()).hexdigest()}"
+    cached = cache.get(key)
+    if cached is not None:
+        return cached, True
+
+    estimate = _planner_estimate(queryset)
+    count, approximate = (max(estimate, bounded), True) if estimate is not None else (queryset.count(), False)
+    cache.set(key, count, getattr(settings, 'PAGINATION_COUNT_CACHE_TIMEOUT', 60))
+    return count, approximate
+
+
+class EstimatedPage(Page):
+    """A page of a list whose count is an estimate: whether a next page exists is read from the rows, not the count."""
+
+    def __init__(self, object_list, number, paginator, has_more):
+        super().__init__(object_list, number, paginator)
+        self.has_more = has_more
+
+    def has_next(self):
+        return self.has_more
+
+
+class CountingPaginator(Paginator):
+    """
+    A Paginator whose count comes from count_rows(), so large lists skip the exact
+    COUNT(*). An estimated count can be off either way, so it does not bound the
+    page numbers: any page from 1 on is served (empty past the last row), and a page
+    links to the next one only when a row follows it.
+    """
+
+    @cached_property
+    def count_result(self):
+        return count_rows(self.object_list)
+
+    @cached_property
+    def count(self):
+        return self.count_result[0]
+
+    def validate_number(self, number):
+        try:
+            return super().validate_number(number)
+        except EmptyPage:
+            if self.count_result[1] and int(number) > self.num_pages:
+                return int(number)
+            raise
+
+    def page(self, number):
+        if not self.count_result[1]:
+            return super().page(number)
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        # One row past the page says whether there is another.
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        return EstimatedPage(rows[:self.per_page], number, self, len(rows) > self.per_page)
+
+
+class StandardResultsSetPagination(PageNumberPagination):
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class ApproximateCountPagination(StandardResultsSetPagination):
+    """Page-number pagination with count_rows() counts, and a count_is_approximate flag next to the count."""
+    django_paginator_class = CountingPaginator
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        response.data['count_is_approximate'] = self.page.paginator.count_result[1]
+        return response
+
+
+class KeysetPaginationMixin:
+    """
+    Adds an opt-in cursor mode to a page-number paginator. Requests with
+    ?pagination=cursor (or a ?cursor= from a previous response) get
+    {next, previous, results} pages that continue after the last row seen,
+    ordered by `keyset_ordering`, instead of counting and OFFSET-scanning. A page's
+    cursor stays valid however many rows are added or removed before it.
+    ?include_count=true adds the total to cursor pages too.
+    """
+    keyset_ordering = None
+    cursor_query_param = 'cursor'
+    mode_query_param = 'pagination'
+    count_query_param = 'include_count'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = request.query_params.get(self.mode_query_param) == 'cursor' or self.cursor_query_param in request.query_params
+        if not self.keyset:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.model = queryset.model
+        self.keyset_page_size = self.get_page_size(request)
+        self.keyset_count = count_rows(queryset) if request.query_params.get(self.count_query_param) in ['1', 'true'] else None
+        position, reverse = self.decode_cursor(request.query_params.get(self.cursor_query_param))
+
+        ordering = list(self.keyset_ordering)
+        if reverse:
+            ordering = [field[1:] if field.startswith('-') else f'-{field}' for field in ordering]
+        page = queryset.order_by(*ordering)
+        if position is not None:
+            page = page.filter(keyset_condition(ordering, position))
+        rows = list(page[:self.keyset_page_size + 1])
+        has_more = len(rows) > self.keyset_page_size
+        rows = rows[:self.keyset_page_size]
+        if reverse:
+            rows.reverse()
+
+        self.keyset_rows = rows
+        # Walking forward there is a way back from any cursor; walking back there is always a way forward.
+        self.has_next = bool(rows) and (reverse or has_more)
+        self.has_previous = bool(rows) and (has_more if reverse else position is not None)
+        return rows
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return super().get_paginated_response(data)
+        response = {}
+        if self.keyset_count is not None:
+            response['count'], response['count_is_approximate'] = self.keyset_count
+        response.update({
+            'next': self.keyset_link(self.keyset_rows[-1], False) if self.has_next else None,
+            'previous': self.keyset_link(self.keyset_rows[0], True) if self.has_previous else None,
+            'results': data,
+        })
+        return Response(response)
+
+    def keyset_link(self, row, reverse):
+        url = remove_query_param(self.request.build_absolute_uri(), self.page_query_param)
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(row, reverse))
+
+    def continuation_link(self, request, path, row):
+        """
+        A link to the cursor page of `path` (a list with this pagination) that
+        continues after `row`, for the first rows of a list shown elsewhere.
+        """
+        self.model = type(row)
+        return replace_query_param(request.build_absolute_uri(path), self.cursor_query_param, self.encode_cursor(row, False))
+
+    def encode_cursor(self, row, reverse):
+        names = [field.lstrip('-') for field in self.keyset_ordering]
+        # Rows are model instances, or dicts when the view paginates a values() queryset.
+        values = [row[name] if isinstance(row, dict) else getattr(row, self.attname(name)) for name in names]
+        # isoformat() keeps the microseconds, which DjangoJSONEncoder would round off.
+        values = [value.isoformat() if hasattr(value, 'isoformat') else value for value in values]
+        return base64.urlsafe_b64encode(json.dumps({'v': values, 'r': reverse}).encode()).decode()
+
+    def decode_cursor(self, cursor):
+        """Returns ({field: value} for the row the page continues from, whether to walk backwards)."""
+        if not cursor:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            names = [field.lstrip('-') for field in self.keyset_ordering]
+            values = [self.model._meta.get_field(name).to_python(value) for name, value in zip(names, payload['v'])]
+            if len(values) != len(names):
+                raise ValueError('wrong number of cursor values')
+            return dict(zip(names, values)), bool(payload['r'])
+        except (TypeError, ValueError, KeyError, ValidationError):
+            raise NotFound('Invalid cursor.')
+
+    def attname(self, name):
+        return self.model._meta.get_field(name).attname
+
+
+class TicketPagination(KeysetPaginationMixin, ApproximateCountPagination):
+    keyset_ordering = ['-created_at', '-id']
+
+
+class ActivityLogPagination(KeysetPaginationMixin, ApproximateCountPagination):
+    keyset_ordering = ['-timestamp', '-id']
+
+
+class CommentPagination(KeysetPaginationMixin, StandardResultsSetPagination):
+    """
+    A ticket's comments, oldest first. Opt-in: without ?page=, ?page_size= or the
+    cursor parameters the endpoint still returns every comment as a plain list.
+    """
+    keyset_ordering = ['created_at', 'id']
+
+    def paginate_queryset(self, queryset, request, view=None):
+        params = [self.page_query_param, self.page_size_query_param, self.cursor_query_param, self.mode_query_param]
+        if not any(param in request.query_params for param in params):
+            return None
+        return super().paginate_queryset(queryset, request, view)
@@ -0,0 +1,140 @@
+# Path: E:\it-admin-tool\backend\tickets\query_budgets.py
+
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+from accounts.models import User
+from .models import Ticket
+
+# Query-count and wall-clock budgets for every endpoint in tickets/urls.py and
+# accounts/urls.py, checked by `manage.py check_query_budgets` against generated
+# data. A budget is the most queries one request may issue and the median time it
+# may take; the query budget does not grow with the data, so an N+1 fails it.
+# Add an entry here with every new endpoint. Read requests authenticate from the
+# user cache (accounts/authentication.py), which the unmeasured first request fills,
+# so their budgets hold no user query; writes load the user and count it.
+# A ticket write costs that user query, BEGIN, one locking SELECT of the ticket and
+# its UPDATE, plus the comments its response renders; a change of assignee, status
+# or priority adds the summary buckets it moves between, the search document and
+# the activity log entry.
+#
+# `path` and `data` are format strings / dicts over the fixture context (see
+# check_query_budgets.fixture_context), or functions of it that run before each
+# measured request, for requests that use something up (a refresh token, a ticket
+# to delete).
+
+
+class Budget:
+    def __init__(self, name, method, path, user='admin', data=None, queries=0, ms=0, status=None, settings=None):
+        self.name = name
+        self.method = method
+        self.path = path
+        self.user = user
+        self.data = data
+        self.queries = queries
+        self.ms = ms
+        # None accepts any status below 400.
+        self.status = status
+        # Settings overridden while this endpoint is measured.
+        self.settings = settings or {}
+
+    def resolve(self, context):
+        path = self.path(context) if callable(self.path) else self.path.format(**context)
+        data = self.data(context) if callable(self.data) else self.data
+        return path, data
+
+
+def _fresh_ticket(context):
+    ticket = Ticket.objects.create(created_by=context['users']['client'], card_id=context['card_id'], fault_description='Budget ticket', priority='LOW')
+    return f"/api/tickets/{ticket.pk}/"
+
+
+def _fresh_user(context, active=True):
+    context['fresh_users'] = context.get('fresh_users', 0) + 1
+    username = f"budget_fresh_{context['fresh_users']}_{context['suffix']}"
+    return User.objects.create(username=username, email=f'{username}@example.com', role=User.CLIENT, is_active=active)
+
+
+def _reassign(context):
+    # Alternates between the two technicians, so that every request changes the assignee.
+    context['reassigned'] = not context.get('reassigned')
+    return {'assigned_to': context['users']['tech2' if context['reassigned'] else 'tech'].pk}
+
+
+def _refresh_token(context):
+    return {'refresh': str(RefreshToken.for_user(context['users']['client']))}
+
+
+def _logout_token(context):
+    return {'refresh_token': str(RefreshToken.for_user(context['users']['client']))}
+
+
+TICKET_BUDGETS = [
+    Budget('zones', 'get', '/api/tickets/zones/', queries=0, ms=50),
+    Budget('states', 'get', '/api/tickets/states/?zone={zone}', queries=0, ms=50),
+    Budget('node types', 'get', '/api/tickets/node-types/?zone={zone}&state={state}', queries=0, ms=50),
+    Budget('locations', 'get', '/api/tickets/locations/?zone={zone}&state={state}&node_type={node_type}', queries=0, ms=50),
+    Budget('card types', 'get', '/api/tickets/card-types/?zone={zone}&state={state}&node_type={node_type}&location={location}', queries=0, ms=50),
+    Budget('slots', 'get', '/api/tickets/slots/?zone={zone}&state={state}&node_type={node_type}&location={location}&card_type={card_type}', queries=0, ms=50),
+    Budget('card hierarchy', 'get', '/api/tickets/card-hierarchy/', queries=0, ms=300),
+    Budget('card autofill', 'get', '/api/tickets/card-autofill/?zone={zone}&state={state}&node_type={node_type}&location={location}&card_type={card_type}&slot={slot}', queries=1, ms=50),
+    Budget('card data', 'get', '/api/tickets/card-data/node_name/?zone={zone}&state={state}', queries=1, ms=50),
+    # Computed (cache off) and served from the cache the unmeasured first request fills.
+    Budget('dashboard stats', 'get', '/api/tickets/dashboard-stats/', queries=5, ms=200, settings={'DASHBOARD_STATS_CACHE_TIMEOUT': 0}),
+    Budget('dashboard stats (technician)', 'get', '/api/tickets/dashboard-stats/', user='tech', queries=5, ms=200, settings={'DASHBOARD_STATS_CACHE_TIMEOUT': 0}),
+    Budget('dashboard stats (cached)', 'get', '/api/tickets/dashboard-stats/', queries=0, ms=50),
+    Budget('dashboard stats (tech, cached)', 'get', '/api/tickets/dashboard-stats/', user='tech', queries=0, ms=50),
+    Budget('dashboard cache counters', 'get', '/api/tickets/dashboard-stats/cache/', queries=0, ms=50),
+    Budget('ticket list', 'get', '/api/tickets/', queries=2, ms=100),
+    Budget('ticket list (client)', 'get', '/api/tickets/', user='client', queries=2, ms=100),
+    Budget('ticket list (search)', 'get', '/api/tickets/?search={ticket_serial}', queries=3, ms=200),
+    Budget('ticket list (cursor)', 'get', '/api/tickets/?pagination=cursor', queries=1, ms=100),
+    Budget('ticket list (compact)', 'get', '/api/tickets/?fields=ticket_id,status,card.serial_number&compact=true', queries=2, ms=100),
+    Budget('export all', 'get', '/api/tickets/export-all/', queries=3, ms=3000),
+    Budget('export stream', 'get', '/api/tickets/export-stream/', queries=3, ms=3000),
+    Budget('ticket detail', 'get', '/api/tickets/{ticket}/', queries=2, ms=200),
+    Budget('ticket detail (comments page)', 'get', '/api/tickets/{ticket}/?comments_page_size=20', queries=2, ms=50),
+    Budget('ticket create', 'post', '/api/tickets/', user='client', data={'serial_number': '{serial}', 'fault_description': 'Budget check', 'priority': 'LOW'}, queries=16, ms=200),
+    Budget('ticket update', 'patch', '/api/tickets/{ticket}/', data={'fault_description': 'Budget check'}, queries=5, ms=200),
+    Budget('ticket reassign', 'patch', '/api/tickets/{ticket}/', data=_reassign, queries=9, ms=200),
+    Budget('ticket delete', 'delete', _fresh_ticket, queries=8, ms=200),
+    Budget('edit timestamps', 'patch', '/api/tickets/{ticket}/edit-timestamps/', data={'on_hold_at': '2024-01-01T00:00:00Z'}, queries=6, ms=200),
+    Budget('update status with comment', 'post', '/api/tickets/{ticket}/update-status-with-comment/', user='tech', data={'status': 'IN_PROGRESS', 'comment': 'Budget check'}, queries=7, ms=200),
+    Budget('bulk create', 'post', '/api/tickets/bulk-create/', user='client', data=lambda context: {'serial_numbers': context['serials'], 'fault_description': 'Budget outage'}, queries=50, ms=1500),
+    Budget('bulk update', 'post', '/api/tickets/bulk-update/', data=lambda context: {'ticket_ids': context['ticket_ids'], 'status': 'ON_HOLD', 'comment': 'Budget check'}, queries=20, ms=1500),
+    Budget('comments', 'get', '/api/tickets/{ticket}/comments/', queries=1, ms=200),
+    Budget('comments (page)', 'get', '/api/tickets/{ticket}/comments/?page=3', queries=2, ms=50),
+    Budget('comments (cursor)', 'get', '/api/tickets/{ticket}/comments/?pagination=cursor', queries=1, ms=50),
+    Budget('comment create', 'post', '/api/tickets/{ticket}/comments/', data={'text': 'Budget check'}, queries=4, ms=100),
+    Budget('activity log', 'get', '/api/tickets/activity-log/', queries=2, ms=100),
+    Budget('activity log (cursor)', 'get', '/api/tickets/activity-log/?pagination=cursor', queries=1, ms=100),
+    Budget('activity log export', 'get', '/api/tickets/activity-log/export/', queries=3, ms=5000),
+    Budget('export jobs', 'get', '/api/tickets/export-jobs/', queries=2, ms=100),
+    Budget('export job create', 'post', '/api/tickets/export-jobs/', data={'kind': 'TICKETS'}, queries=2, ms=100),
+    Budget('export job detail', 'get', '/api/tickets/export-jobs/{job}/', queries=1, ms=50),
+    Budget('export job download (not ready)', 'get', '/api/tickets/export-jobs/{job}/download/', queries=1, ms=50, status=409),
+]
+
+ACCOUNT_BUDGETS = [
+    Budget('login', 'post', '/api/auth/token/', user=None, data={'username': 'budget_client_{suffix}', 'password': '{password}'}, queries=3, ms=1500),
+    Budget('token refresh', 'post', '/api/auth/token/refresh/', user=None, data=_refresh_token, queries=13, ms=100),
+    Budget('logout', 'post', '/api/auth/logout/', user='client', data=_logout_token, queries=9, ms=100),
+    Budget('users', 'get', '/api/auth/users/', queries=2, ms=100),
+    Budget('users export', 'get', '/api/auth/users/?export=true', queries=1, ms=500),
+    Budget('user create', 'post', '/api/auth/users/', data=lambda context: {
+        'username': f"budget_new_{timezone.now().timestamp()}", 'password': context['password'], 'password2': context['password'],
+        'email': f"new_{timezone.now().timestamp()}@example.com", 'first_name': 'New', 'last_name': 'User', 'phone_number': '5550101', 'role': User.CLIENT,
+    }, queries=8, ms=3000),
+    Budget('user detail', 'get', '/api/auth/users/{client_id}/', queries=1, ms=50),
+    Budget('user update', 'patch', '/api/auth/users/{client_id}/', data={'first_name': 'Budget'}, queries=6, ms=100),
+    Budget('user deactivate', 'delete', lambda context: f"/api/auth/users/{_fresh_user(context).pk}/", queries=6, ms=100),
+    Budget('user restore', 'post', lambda context: f"/api/auth/users/{_fresh_user(context, active=False).pk}/restore/", queries=6, ms=100),
+    Budget('admin password reset', 'post', '/api/auth/users/{client_id}/reset-password/', data={'password': '{password}'}, queries=6, ms=3000),
+    Budget('me', 'get', '/api/auth/me/', user='client', queries=0, ms=50),
+    Budget('technicians', 'get', '/api/auth/technicians/', queries=1, ms=100),
+    Budget('change password', 'patch', '/api/auth/change-password/', user='tech2', data={'new_password': '{password}'}, queries=4, ms=3000),
+    Budget('validate user details', 'post', '/api/auth/validate-user-details/', user=None, data={'username': 'budget_client_{suffix}', 'email': 'budget_client_{suffix}@example.com', 'phone_number': '5550100'}, queries=1, ms=50),
+    Budget('contacts', 'get', '/api/auth/contacts/', queries=1, ms=200),
+    Budget('contacts export', 'get', '/api/auth/contacts/export/', queries=1, ms=200),
+]
+
+BUDGETS = TICKET_BUDGETS + ACCOUNT_BUDGETS
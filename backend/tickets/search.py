@@ -0,0 +1,185 @@
+# Path: E:\it-admin-tool\backend\tickets\search.py
+
+import re
+from django.db import connection
+from django.db.models import FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+from rest_framework import filters
+from .models import Ticket, TicketSearchDocument
+
+# Ticket list search runs against TicketSearchDocument.document, which has a
+# full-text index built by migration 0021 for the database in use (the migration
+# holds its own copy of the statements and of the document format):
+#   MySQL       FULLTEXT index, queried with MATCH ... AGAINST in boolean mode
+#   PostgreSQL  GIN index on to_tsvector('simple', document)
+#   SQLite      an FTS5 table kept in step with the documents by triggers
+# Any other database falls back to substring matching on the single column.
+# The engines match whole words and word prefixes only, so 'ode2' does not find
+# 'node2' there; when the index finds no ticket at all, the search is retried as
+# substring matching, so such searches still work (slowly, scanning every document).
+DOCUMENT_TABLE = TicketSearchDocument._meta.db_table
+FTS_TABLE = 'tickets_ticketsearch_fts'
+
+# Ticket.values() lookups that make up a document, in order.
+DOCUMENT_LOOKUPS = [
+    'ticket_id', 'status', 'priority', 'card__node_name', 'card__serial_number', 'card__clei',
+    'created_by__username', 'assigned_to__username', 'fault_description',
+]
+# The Card and User fields whose changes have to be copied into their tickets' documents.
+CARD_DOCUMENT_FIELDS = ['node_name', 'serial_number', 'clei']
+
+# InnoDB ignores words shorter than innodb_ft_min_token_size (3) and these stopwords;
+# such terms are matched as substrings instead.
+MYSQL_MIN_TOKEN_SIZE = 3
+MYSQL_STOPWORDS = {
+    'a', 'about', 'an', 'are', 'as', 'at', 'be', 'by', 'com', 'de', 'en', 'for', 'from', 'how', 'i', 'in', 'is',
+    'it', 'la', 'of', 'on', 'or', 'that', 'the', 'this', 'to', 'was', 'what', 'when', 'where', 'who', 'will',
+    'with', 'und', 'www',
+}
+INDEX_BATCH_SIZE = 1000
+
+
+def build_document(values):
+    """Joins one ticket's searchable values. Underscores become spaces so that ON_HOLD matches 'hold'."""
+    return ' '.join(str(value).replace('_', ' ') for value in values if value)
+
+
+def ticket_document(ticket):
+    card = ticket.card
+    return build_document([
+        ticket.ticket_id, ticket.status, ticket.priority,
+        card.node_name if card else None, card.serial_number if card else None, card.clei if card else None,
+        ticket.created_by.username if ticket.created_by_id else None,
+        ticket.assigned_to.username if ticket.assigned_to_id else None,
+        ticket.fault_description,
+    ])
+
+
+def index_ticket(ticket):
+    document = ticket_document(ticket)
+    if not TicketSearchDocument.objects.filter(ticket_id=ticket.pk).update(document=document):
+        TicketSearchDocument.objects.create(ticket_id=ticket.pk, document=document)
+
+
+def index_ticket_if_changed(ticket, created):
+    """
+    Called after a save. Rewrites the ticket's document unless the ticket was
+    loaded from the database and none of Ticket.SEARCH_FIELDS has changed since.
+    """
+    state = tuple(getattr(ticket, field) for field in Ticket.SEARCH_FIELDS)
+    if created or getattr(ticket, '_search_state', None) != state:
+        index_ticket(ticket)
+        ticket._search_state = state
+
+
+def reindex_tickets(tickets):
+    """Rewrites the documents of the tickets in the given queryset; returns how many were written."""
+    count = 0
+    rows = tickets.order_by('pk').values_list('pk', *DOCUMENT_LOOKUPS)
+    batch = []
+    for row in rows.iterator(chunk_size=INDEX_BATCH_SIZE):
+        batch.append(TicketSearchDocument(ticket_id=row[0], document=build_document(row[1:])))
+        if len(batch) >= INDEX_BATCH_SIZE:
+            count += _write_documents(batch)
+            batch = []
+    if batch:
+        count += _write_documents(batch)
+    return count
+
+
+def _write_documents(documents):
+    existing = set(TicketSearchDocument.objects.filter(ticket_id__in=[d.ticket_id for d in documents]).values_list('ticket_id', flat=True))
+    TicketSearchDocument.objects.bulk_update([d for d in documents if d.ticket_id in existing], ['document'])
+    TicketSearchDocument.objects.bulk_create([d for d in documents if d.ticket_id not in existing])
+    return len(documents)
+
+
+def search_terms(query):
+    """Splits a search string into lowercase words, dropping the punctuation every engine treats as a separator."""
+    return re.findall(r'[^\W_]+', query.lower())
+
+
+def _backend_query(terms):
+    """
+    Returns (engine query string, terms to match as substrings instead) for the
+    current database. Every term is required and matched as a word prefix.
+    """
+    vendor = connection.vendor
+    if vendor == 'mysql':
+        indexed = [term for term in terms if len(term) >= MYSQL_MIN_TOKEN_SIZE and term not in MYSQL_STOPWORDS]
+        return ' '.join(f'+{term}*' for term in indexed), [term for term in terms if term not in indexed]
+    if vendor == 'postgresql':
+        return ' & '.join(f'{term}:*' for term in terms), []
+    if vendor == 'sqlite':
+        return ' '.join(f'"{term}"*' for term in terms), []
+    return '', terms
+
+
+def _match_sql(engine_query):
+    """Returns (SQL selecting the matching ticket ids, SQL ranking one ticket by relevance) for the current database."""
+    quote = connection.ops.quote_name
+    ticket = f"{quote(Ticket._meta.db_table)}.{quote('id')}"
+    if connection.vendor == 'mysql':
+        match = f"MATCH({quote('document')}) AGAINST (%s IN BOOLEAN MODE)"
+        return (
+            f"SELECT {quote('ticket_id')} FROM {quote(DOCUMENT_TABLE)} WHERE {match}",
+            f"(SELECT {match} FROM {quote(DOCUMENT_TABLE)} WHERE {quote('ticket_id')} = {ticket})",
+        )
+    if connection.vendor == 'postgresql':
+        vector = f"to_tsvector('simple', {quote('document')})"
+        query = "to_tsquery('simple', %s)"
+        return (
+            f"SELECT {quote('ticket_id')} FROM {quote(DOCUMENT_TABLE)} WHERE {vector} @@ {query}",
+            f"(SELECT ts_rank({vector}, {query}) FROM {quote(DOCUMENT_TABLE)} WHERE {quote('ticket_id')} = {ticket})",
+        )
+    # SQLite: bm25() is lower for better matches.
+    return (
+        f"SELECT rowid FROM {quote(FTS_TABLE)} WHERE {quote(FTS_TABLE)} MATCH %s",
+        f"(SELECT -bm25({quote(FTS_TABLE)}) FROM {quote(FTS_TABLE)} WHERE {quote(FTS_TABLE)} MATCH %s AND rowid = {ticket})",
+    )
+
+
+def search_tickets(queryset, query):
+    """
+    Narrows a Ticket queryset to the tickets matching every word of `query` and
+    annotates each with `search_rank` (higher is more relevant). Words the index
+    cannot find as words or prefixes are matched as substrings if nothing else matches.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return queryset
+    engine_query, substring_terms = _backend_query(terms)
+    if not engine_query:
+        return _substring_search(queryset, substring_terms)
+    narrowed = queryset
+    for term in substring_terms:
+        narrowed = narrowed.filter(search_document__document__icontains=term)
+    matching_sql, rank_sql = _match_sql(engine_query)
+    narrowed = narrowed.filter(pk__in=RawSQL(matching_sql, [engine_query]))
+    if not narrowed.exists():
+        return _substring_search(queryset, terms)
+    return narrowed.annotate(search_rank=RawSQL(rank_sql, [engine_query], output_field=FloatField()))
+
+
+def _substring_search(queryset, terms):
+    for term in terms:
+        queryset = queryset.filter(search_document__document__icontains=term)
+    return queryset.annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+
+class TicketSearchFilter(filters.SearchFilter):
+    """
+    The `search` query parameter, answered from the full-text index. Results are
+    ranked by relevance unless the request asks for an explicit `ordering`.
+    Listed after OrderingFilter, so the rank takes precedence over the default order.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '').strip()
+        if not query:
+            return queryset
+        queryset = search_tickets(queryset, query)
+        if 'search_rank' in queryset.query.annotations and not request.query_params.get(filters.OrderingFilter.ordering_param):
+            queryset = queryset.order_by('-search_rank', *queryset.query.order_by)
+        return queryset
+
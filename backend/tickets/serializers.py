@@ -2,11 +2,16 @@
 # COPY AND PASTE THIS ENTIRE, FINAL, PERFECT BLOCK.
 
 from rest_framework import serializers
+from django.conf import settings
+from django.urls import reverse
 from django.utils import timezone
-from .models import Ticket, Comment, Card, ActivityLog
+from .models import Ticket, Comment, Card, ActivityLog, ExportJob
 from accounts.models import User
 from .activity_logger import log_activity
 from accounts.serializers import UserSerializer
+from .fieldsets import parse_fieldset
+from .lean_serializers import USER_FIELDS, CARD_FIELDS
+from .technicians import TechnicianField
 
 class CardSerializer(serializers.ModelSerializer):
     class Meta:
@@ -93,10 +98,83 @@ class TicketCreateSerializer(serializers.ModelSerializer):
         ticket = Ticket.objects.create(**ticket_data)
         return ticket
 
-class TicketDetailSerializer(serializers.ModelSerializer):
+class SparseFieldsetMixin:
+    """
+    Narrows the representation to the Fieldset given as context['fieldset']:
+    unselected fields are dropped, related objects in `sparse_relations` that are
+    not expanded become their primary key, and expanded ones keep only the
+    requested keys.
+    """
+    sparse_relations = {}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        fieldset = self.context.get('fieldset')
+        if fieldset is None or not fieldset.sparse:
+            return
+        for name in list(self.fields):
+            if name not in fieldset.fields:
+                self.fields.pop(name)
+            elif name in fieldset.nested:
+                nested = self.fields[name]
+                for key in list(nested.fields):
+                    if key not in fieldset.nested[name]:
+                        nested.fields.pop(key)
+            elif name in self.sparse_relations:
+                source = self.fields[name].source
+                self.fields[name] = serializers.PrimaryKeyRelatedField(read_only=True, **({'source': source} if source != name else {}))
+
+class BulkTicketItemSerializer(serializers.Serializer):
+    """One ticket of a bulk creation request; see tickets/bulk_tickets.py."""
+    serial_number = serializers.CharField()
+    fault_description = serializers.CharField()
+    priority = serializers.ChoiceField(choices=Ticket.PRIORITY_CHOICES, default='LOW')
+
+class BulkTicketCreateSerializer(serializers.Serializer):
+    """
+    A bulk creation request: `serial_numbers` (one ticket per card) and/or `items`
+    ({serial_number, fault_description, priority} each), with `fault_description`
+    and `priority` as defaults for every item.
+    """
+    serial_numbers = serializers.ListField(child=serializers.CharField(allow_blank=True), required=False)
+    items = serializers.ListField(child=serializers.DictField(), required=False)
+    fault_description = serializers.CharField(required=False)
+    priority = serializers.ChoiceField(choices=Ticket.PRIORITY_CHOICES, required=False)
+
+    def validate(self, attrs):
+        items = list(attrs.get('items', [])) + [{'serial_number': serial} for serial in attrs.get('serial_numbers', [])]
+        if not items:
+            raise serializers.ValidationError("Provide serial_numbers or items.")
+        limit = getattr(settings, 'BULK_TICKET_LIMIT', 500)
+        if len(items) > limit:
+            raise serializers.ValidationError(f"At most {limit} tickets can be created in one request.")
+        defaults = {key: attrs[key] for key in ['fault_description', 'priority'] if key in attrs}
+        return {'items': [{**defaults, **item} for item in items]}
+
+class BulkTicketUpdateSerializer(serializers.Serializer):
+    """
+    A bulk update request: `ticket_ids`, and a `status` (which needs a `comment`,
+    as on a single ticket), an `assigned_to` technician (or null), or both.
+    """
+    ticket_ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False)
+    status = serializers.ChoiceField(choices=Ticket.STATUS_CHOICES, required=False)
+    comment = serializers.CharField(required=False, min_length=1)
+    assigned_to = TechnicianField(allow_null=True, required=False)
+
+    def validate(self, attrs):
+        if 'status' not in attrs and 'assigned_to' not in attrs:
+            raise serializers.ValidationError("Provide a status, an assigned_to, or both.")
+        if 'status' in attrs and not attrs.get('comment'):
+            raise serializers.ValidationError({'comment': ["A comment is required to change the status."]})
+        limit = getattr(settings, 'BULK_TICKET_LIMIT', 500)
+        if len(attrs['ticket_ids']) > limit:
+            raise serializers.ValidationError({'ticket_ids': [f"At most {limit} tickets can be updated in one request."]})
+        return attrs
+
+class TicketDetailSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     created_by = UserSerializer(read_only=True)
     assigned_to_details = UserSerializer(source='assigned_to', read_only=True)
-    assigned_to = serializers.PrimaryKeyRelatedField(queryset=User.objects.filter(role=User.TECHNICIAN), allow_null=True, required=False)
+    assigned_to = TechnicianField(allow_null=True, required=False)
     card = CardSerializer(read_only=True)
     comments = CommentSerializer(many=True, read_only=True)
     
@@ -110,6 +188,30 @@ class TicketDetailSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['id', 'ticket_id', 'created_by', 'assigned_to_details', 'card', 'comments', 'created_at', 'updated_at']
 
+    sparse_relations = {'created_by': USER_FIELDS, 'assigned_to_details': USER_FIELDS, 'card': CARD_FIELDS}
+
+def ticket_detail_fieldset(query_params):
+    return parse_fieldset(query_params, TicketDetailSerializer.Meta.fields, TicketDetailSerializer.sparse_relations)
+
+def ticket_detail_queryset(queryset, fieldset):
+    """Narrows a Ticket queryset to the joins and columns a sparse TicketDetailSerializer reads."""
+    if not fieldset.sparse:
+        return queryset
+    model_fields = {'assigned_to_details': 'assigned_to', 'sla_days': 'priority'}
+    columns, joins = ['id'], []
+    for name in fieldset.fields:
+        if name == 'comments':
+            continue
+        field = model_fields.get(name, name)
+        columns.append(field)
+        if name in fieldset.nested:
+            joins.append(field)
+            keys = [key for key in fieldset.nested[name] if key != 'full_name']
+            if 'full_name' in fieldset.nested[name]:
+                keys += ['first_name', 'last_name']
+            columns += [f'{field}__{key}' for key in keys]
+    return queryset.select_related(None).select_related(*joins).only(*dict.fromkeys(columns))
+
 class StatusUpdateWithCommentSerializer(serializers.Serializer):
     status = serializers.ChoiceField(choices=Ticket.STATUS_CHOICES)
     comment = serializers.CharField(write_only=True, required=True, min_length=1)
@@ -133,11 +235,7 @@ class StatusUpdateWithCommentSerializer(serializers.Serializer):
 
         Comment.objects.create(ticket=ticket, author=user, text=comment_text)
         ticket.status = new_status
-        timestamp_field_map = {
-            'IN_PROGRESS': 'in_progress_at', 'IN_TRANSIT': 'in_transit_at',
-            'UNDER_REPAIR': 'under_repair_at', 'ON_HOLD': 'on_hold_at', 'RESOLVED': 'resolved_at',
-        }
-        timestamp_field = timestamp_field_map.get(new_status)
+        timestamp_field = Ticket.STATUS_TIMESTAMP_FIELDS.get(new_status)
         if timestamp_field and not getattr(ticket, timestamp_field):
             setattr(ticket, timestamp_field, timezone.now())
         ticket.save()
@@ -148,4 +246,28 @@ class ActivityLogSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = ActivityLog
-        fields = ['id', 'user', 'user_role', 'ip_address', 'action', 'timestamp', 'target_object_id', 'details']
\ No newline at end of file
+        fields = ['id', 'user', 'user_role', 'ip_address', 'action', 'timestamp', 'target_object_id', 'details']
+
+class ExportJobSerializer(serializers.ModelSerializer):
+    # The same query parameters the synchronous export accepts, e.g. {"status": "OPEN,CLOSED", "search": "node"}.
+    filters = serializers.DictField(source='params', required=False)
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ExportJob
+        fields = ['id', 'kind', 'export_format', 'filters', 'status', 'row_count', 'error', 'created_at', 'started_at', 'finished_at', 'download_url']
+        read_only_fields = ['status', 'row_count', 'error', 'created_at', 'started_at', 'finished_at']
+
+    def validate_filters(self, value):
+        params = {}
+        for name, values in value.items():
+            values = values if isinstance(values, list) else [values]
+            if not all(isinstance(item, (str, int, float)) for item in values):
+                raise serializers.ValidationError(f"Filter '{name}' must be a string or a list of strings.")
+            params[name] = [str(item) for item in values]
+        return params
+
+    def get_download_url(self, obj):
+        if obj.status != ExportJob.COMPLETED:
+            return None
+        return reverse('export-job-download', kwargs={'pk': obj.pk})
@@ -0,0 +1,85 @@
+# Path: E:\it-admin-tool\backend\tickets\signals.py
+
+from django.core.signals import request_finished
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
+from django.db.models import Q
+from django.dispatch import receiver
+from accounts.models import User
+from .models import Card, Ticket, tickets_bulk_created
+from .card_hierarchy import invalidate_card_hierarchy
+from .activity_logger import flush_if_due
+from .dashboard_cache import invalidate_dashboard_stats
+from .technicians import invalidate_technicians
+from .ticket_stats import remember_ticket_state, record_ticket_saved, record_tickets_created, record_ticket_deleted, record_card_type_changes
+from .search import CARD_DOCUMENT_FIELDS, index_ticket_if_changed, reindex_tickets
+
+@receiver(pre_save, sender=Card)
+def card_saving(sender, instance, **kwargs):
+    if not instance._state.adding:
+        instance._previous_values = Card.objects.filter(pk=instance.pk).values('card_type', *CARD_DOCUMENT_FIELDS).first()
+
+@receiver(post_save, sender=Card)
+@receiver(post_delete, sender=Card)
+def card_changed(sender, instance, **kwargs):
+    invalidate_card_hierarchy()
+    previous = getattr(instance, '_previous_values', None)
+    if previous is not None:
+        record_card_type_changes({instance.pk: (previous['card_type'], instance.card_type)})
+        if any(previous[field] != getattr(instance, field) for field in CARD_DOCUMENT_FIELDS):
+            reindex_tickets(Ticket.objects.filter(card=instance))
+        instance._previous_values = None
+
+@receiver(pre_save, sender=Ticket)
+def ticket_saving(sender, instance, **kwargs):
+    remember_ticket_state(instance)
+
+@receiver(post_save, sender=Ticket)
+def ticket_saved(sender, instance, created, **kwargs):
+    record_ticket_saved(instance, created)
+    index_ticket_if_changed(instance, created)
+
+@receiver(tickets_bulk_created, sender=Ticket)
+def tickets_bulk_saved(sender, tickets, **kwargs):
+    record_tickets_created(tickets)
+    # Not every database returns the primary keys of bulk-inserted rows; the ticket ids are known up front.
+    reindex_tickets(Ticket.objects.filter(ticket_id__in=[ticket.ticket_id for ticket in tickets]))
+
+@receiver(pre_delete, sender=Ticket)
+def ticket_deleting(sender, instance, **kwargs):
+    remember_ticket_state(instance)
+
+@receiver(post_delete, sender=Ticket)
+def ticket_deleted(sender, instance, **kwargs):
+    record_ticket_deleted(instance)
+
+@receiver(request_finished)
+def flush_activity_log_after_request(sender, **kwargs):
+    flush_if_due()
+
+@receiver(pre_save, sender=User)
+def user_saving(sender, instance, **kwargs):
+    if not instance._state.adding:
+        instance._previous_username = User.objects.filter(pk=instance.pk).values_list('username', flat=True).first()
+
+@receiver(pre_delete, sender=User)
+def user_deleting(sender, instance, **kwargs):
+    # Deleting the user clears assigned_to with a plain UPDATE, which sends no ticket
+    # signals; note the tickets now, so that their documents lose the username afterwards.
+    instance._assigned_ticket_ids = list(Ticket.objects.filter(assigned_to=instance).values_list('pk', flat=True))
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    # The staff dashboard counts active users and groups tickets by role. A login
+    # only touches last_login, which changes neither.
+    if kwargs.get('update_fields') != frozenset(['last_login']):
+        invalidate_dashboard_stats([instance.pk])
+        invalidate_technicians()
+    previous_username = getattr(instance, '_previous_username', None)
+    if previous_username is not None and previous_username != instance.username:
+        reindex_tickets(Ticket.objects.filter(Q(created_by=instance) | Q(assigned_to=instance)))
+    instance._previous_username = None
+    assigned_ticket_ids = getattr(instance, '_assigned_ticket_ids', None)
+    if assigned_ticket_ids:
+        reindex_tickets(Ticket.objects.filter(pk__in=assigned_ticket_ids))
+    instance._assigned_ticket_ids = None
@@ -0,0 +1,58 @@
+# Path: E:\it-admin-tool\backend\tickets\technicians.py
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import serializers
+from accounts.models import User
+
+# Every technician's row, cached so that validating an assignee costs no query.
+# User saves and deletes drop the cache (see signals.py); TECHNICIAN_CACHE_TIMEOUT
+# bounds how long workers with their own cache backend can lag behind.
+CACHE_KEY = 'tickets:technicians'
+# What UserSerializer and the activity log read from an assignee; other fields load on access.
+# Kept in model field order, which User.from_db() expects.
+TECHNICIAN_FIELDS = [
+    field.attname for field in User._meta.concrete_fields
+    if field.attname in {'id', 'username', 'email', 'first_name', 'last_name', 'phone_number', 'role', 'is_active', 'must_change_password', 'zone'}
+]
+
+
+def technician_rows():
+    """{user id: row of TECHNICIAN_FIELDS} for every technician."""
+    rows = cache.get(CACHE_KEY)
+    if rows is None:
+        rows = {row[0]: row for row in User.objects.filter(role=User.TECHNICIAN).values_list(*TECHNICIAN_FIELDS)}
+        cache.set(CACHE_KEY, rows, getattr(settings, 'TECHNICIAN_CACHE_TIMEOUT', 60))
+    return rows
+
+
+def get_technician(pk):
+    """The technician with this primary key, built from the cache, or None."""
+    row = technician_rows().get(pk)
+    if row is None:
+        return None
+    return User.from_db(User.objects.db, TECHNICIAN_FIELDS, row)
+
+
+def invalidate_technicians():
+    cache.delete(CACHE_KEY)
+
+
+class TechnicianField(serializers.PrimaryKeyRelatedField):
+    """A technician's primary key, checked against the cached technicians instead of with a query."""
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault('queryset', User.objects.filter(role=User.TECHNICIAN))
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            pk = int(data)
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        technician = get_technician(pk)
+        if technician is None:
+            self.fail('does_not_exist', pk_value=data)
+        return technician
@@ -0,0 +1,231 @@
+# Path: E:\it-admin-tool\backend\tickets\ticket_stats.py
+
+import hashlib
+import json
+from collections import defaultdict
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from .models import Card, Ticket, TicketStats
+from .exports import iter_keyset
+from .dashboard_cache import invalidate_dashboard_stats
+
+# TicketStats columns summed per bucket, in the order contribution() returns them.
+VALUE_FIELDS = ['ticket_count', 'resolved_count', 'resolution_seconds', 'created_at_seconds']
+
+
+def bucket_digest(scope, user_id, priority, status, card_type):
+    return hashlib.sha1(json.dumps([scope, user_id, priority, status, card_type]).encode()).hexdigest()
+
+
+def contribution(created_by_id, assigned_to_id, priority, status, card_type, created_at, resolved_at):
+    """Returns [(bucket key, values)] for one ticket: its global bucket and its creator's and assignee's."""
+    values = (
+        1,
+        1 if resolved_at else 0,
+        int((resolved_at - created_at).total_seconds()) if resolved_at else 0,
+        int(created_at.timestamp()),
+    )
+    keys = [(TicketStats.GLOBAL, None, priority, status, card_type)]
+    if created_by_id:
+        keys.append((TicketStats.CREATED_BY, created_by_id, priority, status, card_type))
+    if assigned_to_id:
+        keys.append((TicketStats.ASSIGNED_TO, assigned_to_id, priority, status, card_type))
+    return [(key, values) for key in keys]
+
+
+class StatsDelta:
+    """Accumulates per-bucket changes and writes them as one UPDATE (or INSERT) per bucket."""
+
+    def __init__(self):
+        self.buckets = defaultdict(lambda: [0] * len(VALUE_FIELDS))
+
+    def add(self, state, sign=1):
+        """`state` is (created_by_id, assigned_to_id, priority, status, card_type, created_at, resolved_at)."""
+        for key, values in contribution(*state):
+            totals = self.buckets[key]
+            for i, value in enumerate(values):
+                totals[i] += sign * value
+
+    def remove(self, state):
+        self.add(state, sign=-1)
+
+    def apply(self):
+        changed = [key for key, values in self.buckets.items() if any(values)]
+        # No savepoint: a ticket save already runs in a transaction, and a failure
+        # here has to undo the save as well.
+        with transaction.atomic(savepoint=False):
+            for key in changed:
+                self.apply_bucket(key, self.buckets[key])
+            if changed:
+                user_ids = {key[1] for key in changed}
+                transaction.on_commit(lambda: invalidate_dashboard_stats(user_ids))
+        self.buckets.clear()
+
+    def apply_bucket(self, key, values):
+        digest = bucket_digest(*key)
+        changes = {field: F(field) + value for field, value in zip(VALUE_FIELDS, values)}
+        if TicketStats.objects.filter(bucket=digest).update(**changes):
+            return
+        if values[0] <= 0:
+            # Nothing to take tickets away from: the bucket went with its user, who is being deleted.
+            return
+        scope, user_id, priority, status, card_type = key
+        try:
+            with transaction.atomic():
+                TicketStats.objects.create(
+                    bucket=digest, scope=scope, user_id=user_id, priority=priority, status=status, card_type=card_type,
+                    **dict(zip(VALUE_FIELDS, values)),
+                )
+        except IntegrityError:
+            # Another request created the bucket first.
+            TicketStats.objects.filter(bucket=digest).update(**changes)
+
+
+def _with_card_type(state, card_types):
+    """Swaps the card_id in a Ticket.STATS_FIELDS tuple for that card's type."""
+    created_by_id, assigned_to_id, priority, status, card_id, created_at, resolved_at = state
+    return (created_by_id, assigned_to_id, priority, status, card_types.get(card_id), created_at, resolved_at)
+
+
+def _card_types(ticket, card_ids):
+    card_ids = {card_id for card_id in card_ids if card_id is not None}
+    card_types = {}
+    if Ticket.card.is_cached(ticket) and ticket.card is not None and ticket.card.pk in card_ids:
+        card_types[ticket.card.pk] = ticket.card.card_type
+    missing = card_ids - set(card_types)
+    if missing:
+        card_types.update(Card.objects.filter(pk__in=missing).values_list('pk', 'card_type'))
+    return card_types
+
+
+def ticket_state(ticket):
+    return tuple(getattr(ticket, field) for field in Ticket.STATS_FIELDS)
+
+
+def remember_ticket_state(ticket):
+    """
+    Called before a save or delete, inside its transaction. Re-reads the stored
+    row under a row lock: a snapshot taken when the request loaded the ticket may
+    be out of date by now, and two concurrent saves working from the same
+    snapshot would both move the ticket out of the same bucket. Tickets the
+    view already loaded under a lock (TicketViewSet.get_object) keep their
+    snapshot, which is still current.
+    """
+    if ticket._state.adding or getattr(ticket, '_locked_for_update', False):
+        return
+    row = Ticket.objects.select_for_update().filter(pk=ticket.pk).values_list(*Ticket.STATS_FIELDS, *Ticket.SEARCH_FIELDS).first()
+    if row is None:
+        return
+    ticket._stats_state = row[:len(Ticket.STATS_FIELDS)]
+    ticket._search_state = row[len(Ticket.STATS_FIELDS):]
+
+
+def record_ticket_saved(ticket, created):
+    old = None if created else getattr(ticket, '_stats_state', None)
+    new = ticket_state(ticket)
+    if old == new:
+        return
+    card_types = _card_types(ticket, [new[4]] + ([old[4]] if old else []))
+    delta = StatsDelta()
+    if old:
+        delta.remove(_with_card_type(old, card_types))
+    delta.add(_with_card_type(new, card_types))
+    delta.apply()
+    ticket._stats_state = new
+
+
+def record_tickets_created(tickets):
+    """record_ticket_saved() for many new tickets at once, with one card lookup and one set of bucket updates."""
+    states = [ticket_state(ticket) for ticket in tickets]
+    card_ids = {state[4] for state in states if state[4] is not None}
+    card_types = dict(Card.objects.filter(pk__in=card_ids).values_list('pk', 'card_type')) if card_ids else {}
+    delta = StatsDelta()
+    for ticket, state in zip(tickets, states):
+        delta.add(_with_card_type(state, card_types))
+        ticket._stats_state = state
+    delta.apply()
+
+
+def record_state_changes(changes):
+    """
+    Moves tickets between buckets after a set-based UPDATE. `changes` holds
+    (old state, new state) pairs, each a tuple in STATE_LOOKUPS order.
+    """
+    delta = StatsDelta()
+    for old, new in changes:
+        if old != new:
+            delta.remove(old)
+            delta.add(new)
+    delta.apply()
+
+
+def record_ticket_deleted(ticket):
+    state = getattr(ticket, '_stats_state', None) or ticket_state(ticket)
+    delta = StatsDelta()
+    delta.remove(_with_card_type(state, _card_types(ticket, [state[4]])))
+    delta.apply()
+
+
+def record_card_type_changes(changes):
+    """Moves the tickets of re-typed cards between buckets. `changes` is {card_id: (old_type, new_type)}."""
+    changes = {card_id: types for card_id, types in changes.items() if types[0] != types[1]}
+    if not changes:
+        return
+    delta = StatsDelta()
+    for state in Ticket.objects.filter(card_id__in=list(changes)).values_list(*Ticket.STATS_FIELDS).iterator():
+        old_type, new_type = changes[state[4]]
+        delta.remove(_with_card_type(state, {state[4]: old_type}))
+        delta.add(_with_card_type(state, {state[4]: new_type}))
+    delta.apply()
+
+
+STATE_LOOKUPS = ['created_by_id', 'assigned_to_id', 'priority', 'status', 'card__card_type', 'created_at', 'resolved_at']
+
+
+def compute_ticket_stats():
+    """Recomputes every bucket from the Ticket table: {bucket key: [values]}."""
+    delta = StatsDelta()
+    for row in iter_keyset(Ticket.objects.order_by('pk'), STATE_LOOKUPS):
+        delta.add(tuple(row[lookup] for lookup in STATE_LOOKUPS))
+    return {key: values for key, values in delta.buckets.items() if any(values)}
+
+
+def stored_ticket_stats():
+    """The TicketStats table as {bucket key: [values]}, leaving out buckets that have emptied."""
+    stored = {}
+    columns = ['scope', 'user_id', 'priority', 'status', 'card_type'] + VALUE_FIELDS
+    for row in TicketStats.objects.values_list(*columns).iterator():
+        key, values = row[:5], list(row[5:])
+        if any(values):
+            stored[key] = values
+    return stored
+
+
+def rebuild_ticket_stats():
+    buckets = compute_ticket_stats()
+    with transaction.atomic():
+        user_ids = {key[1] for key in buckets} | set(TicketStats.objects.values_list('user_id', flat=True).distinct())
+        TicketStats.objects.all().delete()
+        TicketStats.objects.bulk_create(
+            [
+                TicketStats(
+                    bucket=bucket_digest(*key), scope=key[0], user_id=key[1], priority=key[2], status=key[3], card_type=key[4],
+                    **dict(zip(VALUE_FIELDS, values)),
+                )
+                for key, values in buckets.items()
+            ],
+            batch_size=1000,
+        )
+        transaction.on_commit(lambda: invalidate_dashboard_stats(user_ids))
+    return len(buckets)
+
+
+def verify_ticket_stats():
+    """Returns [(bucket key, stored values, expected values)] for every bucket that disagrees with the Ticket table."""
+    expected = compute_ticket_stats()
+    stored = stored_ticket_stats()
+    return [
+        (key, stored.get(key), expected.get(key))
+        for key in sorted(set(expected) | set(stored), key=repr)
+        if stored.get(key) != expected.get(key)
+    ]
@@ -4,9 +4,10 @@
 from django.urls import path
 from .views import (
     ZoneListView, StateListView, NodeTypeListView, LocationListView, 
-    CardTypeListView, SlotListView, CardAutofillView, FilteredCardDataView,
-    TicketViewSet, CommentViewSet, ActivityLogViewSet
+    CardTypeListView, SlotListView, CardHierarchyView, CardAutofillView, FilteredCardDataView,
+    TicketViewSet, CommentViewSet, ActivityLogViewSet, ExportJobViewSet
 )
+from accounts.permissions import IsAdminRole, IsTechnicianRole
 
 # This is a restoration of your original, working URL structure, plus the one required fix.
 # There are no routers. Every URL is manually and explicitly defined.
@@ -19,12 +20,17 @@ urlpatterns = [
     path('locations/', LocationListView.as_view(), name='location-list'),
     path('card-types/', CardTypeListView.as_view(), name='card-type-list'),
     path('slots/', SlotListView.as_view(), name='slot-list'),
+    path('card-hierarchy/', CardHierarchyView.as_view(), name='card-hierarchy'),
     path('card-autofill/', CardAutofillView.as_view(), name='card-autofill'),
     path('card-data/<str:field_name>/', FilteredCardDataView.as_view(), name='filtered-card-data'),
 
     # Custom Ticket Action URLs
     path('dashboard-stats/', TicketViewSet.as_view({'get': 'dashboard_stats'}), name='ticket-dashboard-stats'),
+    path('dashboard-stats/cache/', TicketViewSet.as_view({'get': 'dashboard_stats_cache'}, permission_classes=[IsAdminRole]), name='ticket-dashboard-stats-cache'),
     path('export-all/', TicketViewSet.as_view({'get': 'export_all'}), name='ticket-export-all'),
+    path('export-stream/', TicketViewSet.as_view({'get': 'export_stream'}), name='ticket-export-stream'),
+    path('bulk-create/', TicketViewSet.as_view({'post': 'bulk_create'}), name='ticket-bulk-create'),
+    path('bulk-update/', TicketViewSet.as_view({'post': 'bulk_update'}, permission_classes=[IsTechnicianRole | IsAdminRole]), name='ticket-bulk-update'),
 
     # Main Ticket CRUD URLs
     path('', TicketViewSet.as_view({'get': 'list', 'post': 'create'}), name='ticket-list'),
@@ -39,4 +45,9 @@ urlpatterns = [
     # Activity Log URLs
     path('activity-log/', ActivityLogViewSet.as_view({'get': 'list'}), name='activity-log-list'),
     path('activity-log/export/', ActivityLogViewSet.as_view({'get': 'export'}), name='activity-log-export'),
+
+    # Background Export Job URLs
+    path('export-jobs/', ExportJobViewSet.as_view({'get': 'list', 'post': 'create'}), name='export-job-list'),
+    path('export-jobs/<int:pk>/', ExportJobViewSet.as_view({'get': 'retrieve'}), name='export-job-detail'),
+    path('export-jobs/<int:pk>/download/', ExportJobViewSet.as_view({'get': 'download'}), name='export-job-download'),
 ]
\ No newline at end of file
@@ -4,12 +4,20 @@
 from rest_framework import viewsets, permissions, filters, generics, status, views
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from django.http import FileResponse
 from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from django.utils.decorators import method_decorator
+from django.urls import reverse
+from django.utils.functional import cached_property
+from django.views.decorators.http import condition
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Count, Avg, F, ExpressionWrapper, DurationField, Q
-from datetime import timedelta
-from rest_framework.pagination import PageNumberPagination
-from .models import Ticket, Comment, Card, ActivityLog
+from django.db import transaction
+from django.db.models import Count, IntegerField, OuterRef, Prefetch, Q, Subquery, prefetch_related_objects
+from django.db.models.functions import Coalesce
+import os
+from .models import Ticket, Comment, Card, ActivityLog, ExportJob
 from .serializers import (
     TicketListSerializer,
     TicketDetailSerializer, 
@@ -17,7 +25,12 @@ from .serializers import (
     CommentSerializer, 
     CardSerializer,
     StatusUpdateWithCommentSerializer,
-    ActivityLogSerializer
+    ActivityLogSerializer,
+    ExportJobSerializer,
+    BulkTicketCreateSerializer,
+    BulkTicketUpdateSerializer,
+    ticket_detail_fieldset,
+    ticket_detail_queryset,
 )
 from .filters import TicketFilter, ActivityLogFilter
 from accounts.models import User
@@ -26,61 +39,76 @@ from accounts.models import User
 from accounts.permissions import IsTechnicianRole, IsAdminRole
 from .permissions import IsAdminOrObserver
 from .activity_logger import log_activity
+from .card_hierarchy import HIERARCHY_LEVELS, get_card_hierarchy
+from .dashboard import dashboard_stats
+from .dashboard_cache import get_dashboard_stats, cache_counters
+from .pagination import StandardResultsSetPagination, TicketPagination, ActivityLogPagination, CommentPagination
+from .search import TicketSearchFilter
+from .lean_serializers import ticket_list_fieldset, ticket_list_format
+from .bulk_tickets import create_tickets, update_tickets
+from .exports import EXPORT_FORMATS, TICKET_EXPORT_COLUMNS, streaming_export_response
 
-class StandardResultsSetPagination(PageNumberPagination):
-    page_size = 10
-    page_size_query_param = 'page_size'
-    max_page_size = 100
+def cascade_params(request, levels):
+    """Reads the given hierarchy levels from the query string, or returns None if any is missing."""
+    values = [request.query_params.get(level) for level in levels]
+    return values if all(values) else None
 
 class ZoneListView(views.APIView):
     permission_classes = [permissions.IsAuthenticated]
     def get(self, request):
-        zones = Card.objects.values_list('zone', flat=True).distinct().order_by('zone')
-        return Response(zones)
+        return Response(get_card_hierarchy().children())
 
 class StateListView(views.APIView):
     permission_classes = [permissions.IsAuthenticated]
     def get(self, request):
         zone = request.query_params.get('zone')
-        if zone:
-            queryset = Card.objects.filter(zone=zone)
-        else:
-            queryset = Card.objects.all()
-        states = queryset.values_list('state', flat=True).distinct().order_by('state')
-        return Response(states)
+        return Response(get_card_hierarchy().states(zone))
 
 class NodeTypeListView(views.APIView):
     permission_classes = [permissions.IsAuthenticated]
     def get(self, request):
-        zone = request.query_params.get('zone')
-        state = request.query_params.get('state')
-        if not all([zone, state]): return Response([])
-        node_types = Card.objects.filter(zone=zone, state=state).values_list('node_type', flat=True).distinct().order_by('node_type')
-        return Response(node_types)
+        path = cascade_params(request, HIERARCHY_LEVELS[:2])
+        if not path: return Response([])
+        return Response(get_card_hierarchy().children(*path))
 
 class LocationListView(views.APIView):
     permission_classes = [permissions.IsAuthenticated]
     def get(self, request):
-        zone = request.query_params.get('zone'); state = request.query_params.get('state'); node_type = request.query_params.get('node_type')
-        if not all([zone, state, node_type]): return Response([])
-        locations = Card.objects.filter(zone=zone, state=state, node_type=node_type).values_list('location', flat=True).distinct().order_by('location')
-        return Response(locations)
+        path = cascade_params(request, HIERARCHY_LEVELS[:3])
+        if not path: return Response([])
+        return Response(get_card_hierarchy().children(*path))
 
 class CardTypeListView(views.APIView):
     permission_classes = [permissions.IsAuthenticated]
     def get(self, request):
-        zone = request.query_params.get('zone'); state = request.query_params.get('state'); node_type = request.query_params.get('node_type'); location = request.query_params.get('location')
-        if not all([zone, state, node_type, location]): return Response([])
-        card_types = Card.objects.filter(zone=zone, state=state, node_type=node_type, location=location).values_list('card_type', flat=True).distinct().order_by('card_type')
-        return Response(card_types)
+        path = cascade_params(request, HIERARCHY_LEVELS[:4])
+        if not path: return Response([])
+        return Response(get_card_hierarchy().children(*path))
 
 class SlotListView(views.APIView):
     permission_classes = [permissions.IsAuthenticated]
     def get(self, request):
-        zone = request.query_params.get('zone'); state = request.query_params.get('state'); node_type = request.query_params.get('node_type'); location = request.query_params.get('location'); card_type = request.query_params.get('card_type')
-        if not all([zone, state, node_type, location, card_type]): return Response([])
-        slots = Card.objects.filter(zone=zone, state=state, node_type=node_type, location=location, card_type=card_type).values_list('slot', flat=True).distinct().order_by('slot')
-        return Response(slots)
+        path = cascade_params(request, HIERARCHY_LEVELS[:5])
+        if not path: return Response([])
+        return Response(get_card_hierarchy().children(*path))
+
+def card_hierarchy_etag(request, *args, **kwargs):
+    return get_card_hierarchy().etag(request.query_params.get('zone'))
+
+class CardHierarchyView(views.APIView):
+    """
+    Returns the whole card hierarchy (or one zone of it) in a single response,
+    as {zone: {state: {node_type: {location: {card_type: {slot: card_id}}}}}}.
+    Clients should revalidate with If-None-Match to get a 304 when nothing changed,
+    and sort the keys themselves: JavaScript lists integer-like keys first.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    @method_decorator(condition(etag_func=card_hierarchy_etag))
+    def get(self, request):
+        response = Response(get_card_hierarchy().snapshot(request.query_params.get('zone')))
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
 
 class CardAutofillView(views.APIView):
     permission_classes = [permissions.IsAuthenticated]
@@ -111,14 +139,33 @@ class FilteredCardDataView(views.APIView):
         values = Card.objects.filter(**active_filters).values_list(field_name, flat=True).distinct().order_by(field_name)
         return Response(values)
 
+def comments_prefetch(limit=None):
+    # TicketDetailSerializer renders every comment with its author's username.
+    queryset = Comment.objects.select_related('author')
+    if limit is None:
+        return Prefetch('comments', queryset=queryset)
+    # A sliced prefetch has to go to an attribute of its own rather than the related manager's cache.
+    return Prefetch('comments', queryset=queryset.order_by(*CommentPagination.keyset_ordering)[:limit], to_attr='comments_page')
+
+def comments_count():
+    # A subquery rather than Count('comments'), which would GROUP BY every selected column.
+    counts = Comment.objects.filter(ticket=OuterRef('pk')).order_by().values('ticket').annotate(count=Count('pk')).values('count')
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
 class TicketViewSet(viewsets.ModelViewSet):
     queryset = Ticket.objects.select_related('created_by', 'assigned_to', 'card').order_by('-created_at')
+    # Actions that answer with a TicketDetailSerializer of the ticket they load, unchanged comments included.
+    DETAIL_ACTIONS = ['retrieve', 'update', 'partial_update', 'edit_timestamps']
+    # Actions that save or delete the ticket they load. They run in a transaction and
+    # load it with a row lock, so it is still the stored row when saved (see get_object).
+    LOCKING_ACTIONS = ['update', 'partial_update', 'destroy', 'edit_timestamps', 'update_status_with_comment']
+    # ?comments_page_size=N on retrieve renders only the first N comments, for long threads.
+    COMMENTS_PAGE_SIZE_PARAM = 'comments_page_size'
     
     permission_classes = [permissions.IsAuthenticated]
-    pagination_class = StandardResultsSetPagination
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    pagination_class = TicketPagination
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, TicketSearchFilter]
     filterset_class = TicketFilter
-    search_fields = ['ticket_id', 'card__node_name', 'status', 'priority', 'assigned_to__username', 'created_by__username']
     ordering_fields = ['created_at', 'priority']
     
     def get_queryset(self):
@@ -127,8 +174,101 @@ class TicketViewSet(viewsets.ModelViewSet):
         is_admin_or_observer = user.is_superuser or (hasattr(user, 'role') and user.role in [User.ADMIN, User.OBSERVER])
         if not is_admin_or_observer:
             queryset = queryset.filter(Q(created_by=user) | Q(assigned_to=user))
+        if self.action == 'retrieve':
+            queryset = ticket_detail_queryset(queryset, self.detail_fieldset)
+        if self.action in self.LOCKING_ACTIONS:
+            queryset = queryset.select_for_update(of=('self',))
+        if self.action in self.DETAIL_ACTIONS and (self.action != 'retrieve' or 'comments' in self.detail_fieldset.fields):
+            page_size = self.comments_page_size if self.action == 'retrieve' else None
+            if page_size is None:
+                queryset = queryset.prefetch_related(comments_prefetch())
+            else:
+                # One row past the page shows whether there are more.
+                queryset = queryset.prefetch_related(comments_prefetch(page_size + 1)).annotate(comments_count=comments_count())
         return queryset
-    
+
+    @cached_property
+    def comments_page_size(self):
+        value = self.request.query_params.get(self.COMMENTS_PAGE_SIZE_PARAM)
+        if value is None:
+            return None
+        try:
+            page_size = int(value)
+        except ValueError:
+            page_size = 0
+        if page_size < 1:
+            raise ValidationError({self.COMMENTS_PAGE_SIZE_PARAM: ["A positive integer is required."]})
+        return min(page_size, CommentPagination.max_page_size)
+
+    def retrieve(self, request, *args, **kwargs):
+        ticket = self.get_object()
+        serializer = self.get_serializer(ticket)
+        page_size = self.comments_page_size
+        if page_size is None or 'comments' not in serializer.fields:
+            return Response(serializer.data)
+
+        # The first page of comments; the rest of the thread is paged from the
+        # comments endpoint, starting after the last one shown here.
+        comments, ticket.comments_page = ticket.comments_page, ticket.comments_page[:page_size]
+        serializer.fields['comments'] = CommentSerializer(many=True, read_only=True, source='comments_page')
+        data = serializer.data
+        data['comments_count'] = ticket.comments_count
+        data['comments_next'] = None
+        if len(comments) > page_size:
+            path = f"{reverse('ticket-comments-list', kwargs={'ticket_pk': ticket.pk})}?page_size={page_size}"
+            data['comments_next'] = CommentPagination().continuation_link(request, path, comments[page_size - 1])
+        return Response(data)
+
+    def get_object(self):
+        ticket = super().get_object()
+        if self.action in self.LOCKING_ACTIONS:
+            # Concurrent writes to this ticket wait here until this one commits, so
+            # the state it was loaded with is what the save changes the summary and
+            # search document from; remember_ticket_state() need not read it again.
+            ticket._locked_for_update = True
+        return ticket
+
+    @transaction.atomic
+    def update(self, request, *args, **kwargs):
+        # UpdateModelMixin.update, without dropping the prefetched comments after the
+        # save: TicketDetailSerializer cannot change them, so they are still current.
+        partial = kwargs.pop('partial', False)
+        serializer = self.get_serializer(self.get_object(), data=request.data, partial=partial)
+        serializer.is_valid(raise_exception=True)
+        self.perform_update(serializer)
+        return Response(serializer.data)
+
+    @transaction.atomic
+    def destroy(self, request, *args, **kwargs):
+        return super().destroy(request, *args, **kwargs)
+
+    @cached_property
+    def detail_fieldset(self):
+        return ticket_detail_fieldset(self.request.query_params)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.action == 'retrieve':
+            context['fieldset'] = self.detail_fieldset
+        return context
+
+    def list(self, request, *args, **kwargs):
+        # Same output as TicketListSerializer, built from a values() projection and
+        # narrowed by ?fields= / ?expand= / ?compact= (see fieldsets.py).
+        list_format = ticket_list_format(ticket_list_fieldset(request.query_params))
+        rows = list_format.rows(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(rows)
+        if page is None:
+            return Response(self.list_data(*list_format.serialize(rows)))
+        results, included = list_format.serialize(page)
+        response = self.get_paginated_response(results)
+        if included is not None:
+            response.data['included'] = included
+        return response
+
+    def list_data(self, results, included):
+        return results if included is None else {'results': results, 'included': included}
+
     def get_serializer_class(self):
         if self.action == 'list':
             return TicketListSerializer
@@ -148,12 +288,15 @@ class TicketViewSet(viewsets.ModelViewSet):
         log_activity(user=self.request.user, request=self.request, action='TICKET_CREATED', target=ticket.ticket_id, details=f"Created new ticket with priority {ticket.priority}.")
 
     def perform_update(self, serializer):
-        original_ticket = self.get_object()
-        original_status = original_ticket.status
-        original_assignee = original_ticket.assigned_to
-        
-        new_assignee = serializer.validated_data.get('assigned_to', original_assignee)
-        if new_assignee != original_assignee:
+        # serializer.instance is the ticket get_object() loaded for this request and
+        # still holds the stored values, so changes are detected against it without a refetch.
+        ticket = serializer.instance
+        original_status = ticket.status
+        original_assignee_id = ticket.assigned_to_id
+
+        new_assignee = serializer.validated_data.get('assigned_to', ticket.assigned_to)
+        assignee_changed = 'assigned_to' in serializer.validated_data and (new_assignee.pk if new_assignee else None) != original_assignee_id
+        if assignee_changed:
             if new_assignee is not None:
                 serializer.instance.assigned_at = timezone.now()
             else:
@@ -168,89 +311,58 @@ class TicketViewSet(viewsets.ModelViewSet):
         if new_status != original_status:
             log_activity(user=self.request.user, request=self.request, action='STATUS_CHANGED', target=updated_ticket.ticket_id, details=f"Changed status from {original_status} to {new_status}.")
         
-        if new_assignee != original_assignee:
+        if assignee_changed:
             assignee_name = new_assignee.username if new_assignee else "Unassigned"
             log_activity(user=self.request.user, request=self.request, action='TICKET_ASSIGNED', target=updated_ticket.ticket_id, details=f"Assigned ticket to {assignee_name}.")
     
+    @action(detail=False, methods=['post'], url_path='bulk-create')
+    def bulk_create(self, request):
+        """
+        Files one ticket per card serial in a single request (see tickets/bulk_tickets.py).
+        Returns a result per item; 201 when at least one ticket was created, else 400.
+        """
+        serializer = BulkTicketCreateSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        results = create_tickets(request, serializer.validated_data['items'])
+        created = sum(1 for result in results if result['status'] == 'created')
+        return Response(
+            {'created': created, 'failed': len(results) - created, 'results': results},
+            status=status.HTTP_201_CREATED if created else status.HTTP_400_BAD_REQUEST,
+        )
+
+    @action(detail=False, methods=['post'], url_path='bulk-update', permission_classes=[IsTechnicianRole | IsAdminRole])
+    def bulk_update(self, request):
+        """
+        Changes the status (with a comment) and/or the assignee of many tickets at
+        once. Each ticket is checked against the same scope as a single update;
+        the ones outside it fail on their own. 200 when any ticket was updated, else 400.
+        """
+        serializer = BulkTicketUpdateSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        results = update_tickets(request, self.get_queryset(), serializer.validated_data)
+        updated = sum(1 for result in results if result['status'] == 'updated')
+        return Response(
+            {'updated': updated, 'failed': len(results) - updated, 'results': results},
+            status=status.HTTP_200_OK if updated else status.HTTP_400_BAD_REQUEST,
+        )
+
     @action(detail=False, methods=['get'], url_path='dashboard-stats')
     def dashboard_stats(self, request):
         user = self.request.user
-        base_queryset = Ticket.objects.all() 
         view_as = request.query_params.get('view_as')
-        if user.role in [User.ADMIN, User.OBSERVER]:
-            if view_as == 'client':
-                base_queryset = base_queryset.filter(created_by__role=User.CLIENT)
-            elif view_as == 'technician':
-                base_queryset = base_queryset.filter(assigned_to__role=User.TECHNICIAN)
-        elif user.role == User.CLIENT:
-             base_queryset = base_queryset.filter(created_by=user)
-        elif user.role == User.TECHNICIAN:
-            base_queryset = base_queryset.filter(assigned_to=user)
-        
-        response_data = {}
-        if user.role in [User.ADMIN, User.OBSERVER]:
-            response_data['total_users'] = User.objects.filter(is_active=True).count()
-        
-        in_progress_statuses = ['IN_PROGRESS', 'IN_TRANSIT', 'UNDER_REPAIR', 'ON_HOLD']
-        status_counts = base_queryset.aggregate(
-            open_tickets=Count('id', filter=Q(status='OPEN')),
-            in_progress_tickets=Count('id', filter=Q(status__in=in_progress_statuses)),
-            resolved_tickets=Count('id', filter=Q(status='RESOLVED')),
-            closed_tickets=Count('id', filter=Q(status='CLOSED')),
-            total_tickets=Count('id')
-        )
-        
-        now = timezone.now()
-        sla_complete_statuses = ['RESOLVED', 'CLOSED']
-        resolution_duration_expr = ExpressionWrapper(F('resolved_at') - F('created_at'), output_field=DurationField())
-        historical_sla_data = base_queryset.filter(status__in=sla_complete_statuses, resolved_at__isnull=False).values('priority').annotate(avg_resolution_duration=Avg(resolution_duration_expr))
-        historical_sla_dict = { item['priority']: item['avg_resolution_duration'].total_seconds() / (3600 * 24) if item['avg_resolution_duration'] else 0 for item in historical_sla_data }
-
-        open_age_duration_expr = ExpressionWrapper(now - F('created_at'), output_field=DurationField())
-        proactive_sla_data = base_queryset.filter(status='OPEN').values('priority').annotate(avg_open_age_duration=Avg(open_age_duration_expr))
-        proactive_sla_dict = { item['priority']: item['avg_open_age_duration'].total_seconds() / (3600 * 24) if item['avg_open_age_duration'] else 0 for item in proactive_sla_data }
-
-        sla_targets = { 'CRITICAL': 3, 'HIGH': 7, 'MEDIUM': 14, 'LOW': 21 }
-        open_breached_counts = base_queryset.filter(status='OPEN').annotate(
-            age=now - F('created_at')
-        ).aggregate(
-            CRITICAL=Count('id', filter=Q(priority='CRITICAL', age__gt=timedelta(days=sla_targets['CRITICAL']))),
-            HIGH=Count('id', filter=Q(priority='HIGH', age__gt=timedelta(days=sla_targets['HIGH']))),
-            MEDIUM=Count('id', filter=Q(priority='MEDIUM', age__gt=timedelta(days=sla_targets['MEDIUM']))),
-            LOW=Count('id', filter=Q(priority='LOW', age__gt=timedelta(days=sla_targets['LOW'])))
-        )
-        
-        all_priorities = ['CRITICAL', 'HIGH', 'MEDIUM', 'LOW']
-        by_priority_counts_qs = base_queryset.values('priority').annotate(count=Count('id'))
-        priority_counts_dict = {item['priority']: item['count'] for item in by_priority_counts_qs}
-
-        by_priority_combined = []
-        for priority in all_priorities:
-            by_priority_combined.append({
-                'priority': priority,
-                'count': priority_counts_dict.get(priority, 0),
-                'avg_resolution_days': historical_sla_dict.get(priority, 0),
-                'avg_open_age_days': proactive_sla_dict.get(priority, 0),
-                'sla_target_days': sla_targets.get(priority, 30),
-                'open_breached_count': open_breached_counts.get(priority, 0)
-            })
-
-        order_map = {'CRITICAL': 0, 'HIGH': 1, 'MEDIUM': 2, 'LOW': 3}
-        by_priority_combined.sort(key=lambda x: order_map.get(x['priority'], 4))
-        
-        by_status_counts = base_queryset.values('status').annotate(count=Count('id')).order_by('status')
-        by_category_counts = base_queryset.values('card__card_type').annotate(count=Count('id')).order_by('-count')
-        by_category_renamed = [{'card_category': item['card__card_type'], 'count': item['count']} for item in by_category_counts]
-
-        response_data.update({
-            'total_tickets': status_counts['total_tickets'], 'open_tickets': status_counts['open_tickets'], 'in_progress_tickets': status_counts['in_progress_tickets'],
-            'resolved_tickets': status_counts['resolved_tickets'], 'closed_tickets': status_counts['closed_tickets'], 'by_status': list(by_status_counts),
-            'by_priority': by_priority_combined,
-            'by_category': by_category_renamed,
-        })
-        return Response(response_data)
+        data, cached = get_dashboard_stats(user, view_as, lambda: dashboard_stats(user, view_as))
+        response = Response(data)
+        response['X-Dashboard-Cache'] = 'HIT' if cached else 'MISS'
+        return response
+
+    @action(detail=False, methods=['get'], url_path='dashboard-stats/cache', permission_classes=[IsAdminRole])
+    def dashboard_stats_cache(self, request):
+        return Response(cache_counters())
         
     @action(detail=True, methods=['patch'], url_path='edit-timestamps', permission_classes=[permissions.IsAdminUser])
+    @transaction.atomic
     def edit_timestamps(self, request, pk=None):
         ticket = self.get_object()
         serializer = self.get_serializer(ticket, data=request.data, partial=True)
@@ -261,24 +373,41 @@ class TicketViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['get'], url_path='export-all')
     def export_all(self, request):
+        list_format = ticket_list_format(ticket_list_fieldset(request.query_params))
         queryset = self.filter_queryset(self.get_queryset())
         log_activity(user=request.user, request=request, action='TICKET_EXPORT', details=f"Exported {queryset.count()} tickets.")
-        serializer = TicketListSerializer(queryset, many=True)
-        return Response(serializer.data)
+        return Response(self.list_data(*list_format.serialize(list_format.rows(queryset).iterator())))
+
+    @action(detail=False, methods=['get'], url_path='export-stream')
+    def export_stream(self, request):
+        """
+        Streams every ticket matching the list filters as CSV (default) or, with
+        ?export_format=ndjson, as newline-delimited JSON.
+        """
+        export_format = request.query_params.get('export_format', 'csv')
+        if export_format not in EXPORT_FORMATS:
+            return Response({'error': f"export_format must be one of: {', '.join(EXPORT_FORMATS)}."}, status=status.HTTP_400_BAD_REQUEST)
+        queryset = self.filter_queryset(self.get_queryset())
+        def log_export(count):
+            log_activity(user=request.user, request=request, action='TICKET_EXPORT', details=f"Exported {count} tickets as {export_format.upper()}.")
+        return streaming_export_response(queryset, TICKET_EXPORT_COLUMNS, export_format, 'tickets_export', on_finish=log_export)
 
     @action(detail=True, methods=['post'], url_path='update-status-with-comment', permission_classes=[IsTechnicianRole])
+    @transaction.atomic
     def update_status_with_comment(self, request, pk=None):
         ticket = self.get_object()
         serializer = StatusUpdateWithCommentSerializer(data=request.data, context={'request': request, 'ticket': ticket})
         if serializer.is_valid():
             serializer.save()
+            prefetch_related_objects([ticket], comments_prefetch())
             return Response(TicketDetailSerializer(ticket).data, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 class CommentViewSet(viewsets.ModelViewSet):
-    queryset = Comment.objects.order_by('created_at')
+    queryset = Comment.objects.select_related('author').order_by(*CommentPagination.keyset_ordering)
     serializer_class = CommentSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = CommentPagination
     def get_queryset(self):
         return super().get_queryset().filter(ticket_id=self.kwargs.get('ticket_pk'))
     def perform_create(self, serializer):
@@ -294,7 +423,7 @@ class ActivityLogViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = ActivityLog.objects.select_related('user').order_by('-timestamp')
     serializer_class = ActivityLogSerializer
     permission_classes = [IsAdminOrObserver]
-    pagination_class = StandardResultsSetPagination
+    pagination_class = ActivityLogPagination
     filter_backends = [DjangoFilterBackend]
     filterset_class = ActivityLogFilter
 
@@ -303,4 +432,31 @@ class ActivityLogViewSet(viewsets.ReadOnlyModelViewSet):
         queryset = self.filter_queryset(self.get_queryset())
         log_activity(user=request.user, request=request, action='ACTIVITY_LOG_EXPORT', details=f"Exported {queryset.count()} activity log entries.")
         serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
\ No newline at end of file
+        return Response(serializer.data)
+
+class ExportJobViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Queues large ticket and activity-log exports for the run_export_jobs worker,
+    reports their progress and serves the finished gzip files to their requester.
+    """
+    serializer_class = ExportJobSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = StandardResultsSetPagination
+
+    def get_queryset(self):
+        return ExportJob.objects.filter(requested_by=self.request.user).order_by('-created_at')
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        if serializer.validated_data['kind'] == ExportJob.ACTIVITY_LOG and request.user.role not in [User.ADMIN, User.OBSERVER]:
+            raise PermissionDenied("Only admins and observers can export the activity log.")
+        serializer.save(requested_by=request.user)
+        return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=True, methods=['get'])
+    def download(self, request, pk=None):
+        job = self.get_object()
+        if job.status != ExportJob.COMPLETED or not job.file:
+            return Response({'error': 'This export is not ready yet.'}, status=status.HTTP_409_CONFLICT)
+        return FileResponse(job.file.open('rb'), as_attachment=True, filename=os.path.basename(job.file.name), content_type='application/gzip')
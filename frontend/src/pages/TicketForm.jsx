@@ -72,69 +72,54 @@ function TicketForm() {
     queryKey: ["zones"],
     queryFn: () => api.get("/api/tickets/zones/").then((res) => res.data),
   });
-  const { data: states, isLoading: isLoadingStates } = useQuery({
-    queryKey: ["states", selectedZone],
+  // One request fetches the selected zone's whole card hierarchy; the
+  // browser revalidates it with its ETag, so repeat visits get a 304.
+  const { data: zoneHierarchy, isLoading: isLoadingHierarchy } = useQuery({
+    queryKey: ["cardHierarchy", selectedZone?.value],
     queryFn: () =>
       api
-        .get("/api/tickets/states/", { params: { zone: selectedZone?.value } })
-        .then((res) => res.data),
-    enabled: !!selectedZone,
-  });
-  const { data: nodeTypes, isLoading: isLoadingNodeTypes } = useQuery({
-    queryKey: ["nodeTypes", selectedState],
-    queryFn: () =>
-      api
-        .get("/api/tickets/node-types/", {
-          params: { zone: selectedZone?.value, state: selectedState?.value },
-        })
-        .then((res) => res.data),
-    enabled: !!selectedState,
-  });
-  const { data: locations, isLoading: isLoadingLocations } = useQuery({
-    queryKey: ["locations", selectedNodeType],
-    queryFn: () =>
-      api
-        .get("/api/tickets/locations/", {
-          params: {
-            zone: selectedZone?.value,
-            state: selectedState?.value,
-            node_type: selectedNodeType?.value,
-          },
+        .get("/api/tickets/card-hierarchy/", {
+          params: { zone: selectedZone?.value },
         })
-        .then((res) => res.data),
-    enabled: !!selectedNodeType,
-  });
-  const { data: cardTypes, isLoading: isLoadingCardTypes } = useQuery({
-    queryKey: ["cardTypes", selectedLocation],
-    queryFn: async () => {
-      const res = await api.get("/api/tickets/card-types/", {
-        params: {
-          zone: selectedZone?.value,
-          state: selectedState?.value,
-          node_type: selectedNodeType?.value,
-          location: selectedLocation?.value,
-        },
-      });
-      return ["Other", ...res.data];
-    },
-    enabled: !!selectedLocation,
-  });
-  const { data: slots, isLoading: isLoadingSlots } = useQuery({
-    queryKey: ["slots", selectedCardType],
-    queryFn: () =>
-      api
-        .get("/api/tickets/slots/", {
-          params: {
-            zone: selectedZone?.value,
-            state: selectedState?.value,
-            node_type: selectedNodeType?.value,
-            location: selectedLocation?.value,
-            card_type: selectedCardType?.value,
-          },
-        })
-        .then((res) => res.data),
-    enabled: !!selectedCardType && selectedCardType?.value !== "Other",
+        .then((res) => res.data[selectedZone?.value] || {}),
+    enabled: !!selectedZone,
   });
+  // Object.keys() lists integer-like keys (most slots) before the others,
+  // whatever order the server sent, so the options are sorted here.
+  const childrenOf = (...path) => {
+    let node = zoneHierarchy;
+    for (const value of path) {
+      if (!node || value === undefined) return [];
+      node = node[value];
+    }
+    return node
+      ? Object.keys(node).sort((a, b) =>
+          a.localeCompare(b, undefined, { numeric: true, sensitivity: "base" })
+        )
+      : [];
+  };
+  const states = childrenOf();
+  const nodeTypes = childrenOf(selectedState?.value);
+  const locations = childrenOf(selectedState?.value, selectedNodeType?.value);
+  const cardTypes = [
+    "Other",
+    ...childrenOf(
+      selectedState?.value,
+      selectedNodeType?.value,
+      selectedLocation?.value
+    ),
+  ];
+  const slots = childrenOf(
+    selectedState?.value,
+    selectedNodeType?.value,
+    selectedLocation?.value,
+    selectedCardType?.value
+  );
+  const isLoadingStates = isLoadingHierarchy;
+  const isLoadingNodeTypes = isLoadingHierarchy;
+  const isLoadingLocations = isLoadingHierarchy;
+  const isLoadingCardTypes = isLoadingHierarchy;
+  const isLoadingSlots = isLoadingHierarchy;
   const { isFetching: isAutofilling } = useQuery({
     queryKey: ["autofill", selectedSlot],
     queryFn: async () => {